@@ -9,26 +9,26 @@
 #Output:
 #- Anzeige des Histogramms im Plot-Fenster
 
-import geopandas as gpd
-import rasterio
+import os
+import sys
+
 import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from werkzeuge.gebaeude import lade_gebaeude_mit_risiko
+
 # Eingabedaten
 shapefile_path = "../data/shapefiles/buildings_unterfranken_clipped.shp"
 raster_path = "../data/raster/HSM_WoE_C.tif"
+staedte = ["Aschaffenburg", "Würzburg", "Schweinfurt"]
 
 # === Histogramm erstellen ===
 
-# 1. Shapefile laden und Risiko aus Raster extrahieren
-gdf = gpd.read_file(shapefile_path)
-
-with rasterio.open(raster_path) as src:
-    coords = [(geom.x, geom.y) for geom in gdf.geometry]
-    risiko_values = [val[0] if val else None for val in src.sample(coords)]
-
-gdf["Risiko"] = risiko_values
+# 1. Nur Gebäude der drei Städte laden (Filter beim Lesen) und Risiko aus Raster extrahieren
+gdf = lade_gebaeude_mit_risiko(shapefile_path, raster_path, spalten=["LocalityNa", "geb_bewohn"],
+                               auswahl={"LocalityNa": staedte})
 gdf = gdf.dropna(subset=["Risiko", "geb_bewohn"])
 gdf = gdf[(gdf["geb_bewohn"] > 0) & (gdf["geb_bewohn"] <= 200)]
 
@@ -42,8 +42,6 @@ labels_bewohner = ["1–2", "3–5", "6–10", "11–20", "21–50", "51–100",
 gdf["Bewohner_Klasse"] = pd.cut(gdf["geb_bewohn"], bins=bins_bewohner, labels=labels_bewohner, include_lowest=True)
 
 # 3. Heatmap-Erstellung
-staedte = ["Aschaffenburg", "Würzburg", "Schweinfurt"]
-
 for stadt in staedte:
     df_stadt = gdf[gdf["LocalityNa"] == stadt]
 
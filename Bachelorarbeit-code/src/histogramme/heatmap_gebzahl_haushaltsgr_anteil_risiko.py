@@ -9,46 +9,25 @@
 #- Heatmap-Plot im Plot-Fenster
 
 
-import geopandas as gpd
-import rasterio
+import os
+import sys
+
 import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
-from shapely.geometry import Point, MultiPoint
-
-# === 1.MultiPoints aufspalten ===
-
-def explode_multipoints(gdf: gpd.GeoDataFrame) -> gpd.GeoDataFrame:
-    """Zerlegt MultiPoint-Geometrien in einzelne Points."""
-    rows = []
-    for _, row in gdf.iterrows():
-        geom = row.geometry
-        if isinstance(geom, Point):
-            rows.append(row)
-        elif isinstance(geom, MultiPoint):
-            for pt in geom.geoms:
-                new_row = row.copy()
-                new_row.geometry = pt
-                rows.append(new_row)
-    return gpd.GeoDataFrame(rows, crs=gdf.crs)
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from werkzeuge.gebaeude import lade_gebaeude_mit_risiko
 
-# === 2. Histogramm erstellen ===
+# === 1. Histogramm erstellen ===
 
 def main():
     # 1. Daten laden
     shp_path = "data/shapefiles/buildings_unterfranken_clipped.shp"
     raster_path = "data/raster/HSM_WoE_C.tif"
 
-    gdf = gpd.read_file(shp_path)
-    gdf = explode_multipoints(gdf)
-
-    # 2. Hochwasserrisiko aus Raster extrahieren
-    with rasterio.open(raster_path) as src:
-        coords = [(geom.x, geom.y) for geom in gdf.geometry]
-        risiko_values = [val[0] if val else None for val in src.sample(coords)]
-
-    gdf["Risiko"] = risiko_values
+    # 2. Hochwasserrisiko aus Raster extrahieren (MultiPoints werden aufgespalten)
+    gdf = lade_gebaeude_mit_risiko(shp_path, raster_path)
 
     # 3. Daten bereinigen
     gdf = gdf.dropna(subset=["Risiko", "geb_bewohn"])
@@ -92,7 +71,7 @@ def main():
     plt.tight_layout()
     plt.show()
 
-# === 3. Skript-Einstiegspunkt ===
+# === 2. Skript-Einstiegspunkt ===
 
 if __name__ == "__main__":
     main()
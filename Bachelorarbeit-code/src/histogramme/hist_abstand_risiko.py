@@ -0,0 +1,107 @@
+
+#Erstellt Histogramme zum Abstand der Gebäude, Bewohner und Zensus-Einwohner zum nächsten
+#Rasterpixel mit sehr hohem Hochwasserrisiko (Abstandsbänder statt Risikoklasse des
+#eigenen Pixels).
+
+#Der Abstand wird einmal per Distanztransformation für das ganze Raster berechnet
+#(werkzeuge/abstand.py) und über den Pixelindex für alle Gebäude und Zellen ausgelesen.
+
+#Input:
+#- data/shapefiles/buildings_unterfranken_clipped.shp
+#- outputs/tables/unterfranken_ueber65_absolut.parquet (aus weitere_scripts/Anzahl_ueber_65.py)
+#- data/raster/HSM_WoE_C.tif
+
+#Output:
+#- outputs/tables/abstand_baender.csv
+#- Anzeige von zwei Histogrammen (absolut und prozentual je Abstandsband)
+
+import os
+import sys
+
+import pandas as pd
+import numpy as np
+import matplotlib.pyplot as plt
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from werkzeuge.abstand import ABSTAND_GRENZEN, abstand_codes, abstand_labels, oeffne_abstand
+from werkzeuge.gebaeude import lade_gebaeude_mit_risiko
+from werkzeuge.gitter import SCHLUESSEL_SPALTE, gitter_schluessel, zellmittelpunkte
+from werkzeuge.pixelindex import pixel_index, sammle
+from werkzeuge.raster_speicher import oeffne_raster
+from werkzeuge.tabellen import lade_tabelle
+
+# === INPUT SETUP ===
+buildings_path = "data/shapefiles/buildings_unterfranken_clipped.shp"
+tabellen_path = "outputs/tables/unterfranken_ueber65_absolut.parquet"
+raster_path = "data/raster/HSM_WoE_C.tif"
+output_dir = "outputs/tables"
+os.makedirs(output_dir, exist_ok=True)
+
+ziel_klassen = ("sehr hoch",)
+labels_abstand = abstand_labels(ABSTAND_GRENZEN)
+farben_abstand = plt.cm.RdYlGn(np.linspace(0.0, 1.0, len(labels_abstand)))
+
+# === 1. Abstandsraster (einmalig berechnet, danach memmap) ===
+raster = oeffne_raster(raster_path)
+abstand = oeffne_abstand(raster_path, ziel_klassen, ABSTAND_GRENZEN[-1])
+
+# === 2. Abstand je Gebäude ===
+gdf = lade_gebaeude_mit_risiko(buildings_path, raster_path, abstand=abstand)
+gdf = gdf.dropna(subset=["Abstand"])
+
+# === 3. Abstand je Zensuszelle (Zellmittelpunkt) ===
+df_zensus = lade_tabelle(tabellen_path)
+if SCHLUESSEL_SPALTE not in df_zensus.columns:
+    df_zensus[SCHLUESSEL_SPALTE] = gitter_schluessel(df_zensus["GITTER_ID_100m"])
+x_zellen, y_zellen = zellmittelpunkte(df_zensus[SCHLUESSEL_SPALTE].values)
+index = pixel_index(tabellen_path, raster, x_zellen, y_zellen, "EPSG:3035", name="zensus")
+df_zensus["Abstand"] = sammle(abstand, index)
+df_zensus = df_zensus.dropna(subset=["Abstand", "Einwohner"])
+
+# === 4. Summen je Abstandsband ===
+def summen_je_band(abstaende, gewichte=None):
+    codes = abstand_codes(abstaende, ABSTAND_GRENZEN)
+    return np.bincount(codes, weights=gewichte, minlength=len(labels_abstand))
+
+
+tabelle = pd.DataFrame({
+    "Gebaeude": summen_je_band(gdf["Abstand"].values),
+    "Bewohner": summen_je_band(gdf["Abstand"].values, gdf["geb_bewohn"].fillna(0).values),
+    "Einwohner": summen_je_band(df_zensus["Abstand"].values, df_zensus["Einwohner"].values),
+    "Ueber65": summen_je_band(df_zensus["Abstand"].values, df_zensus["Ueber65_Absolut"].fillna(0).values),
+}, index=pd.Index(labels_abstand, name="Abstand"))
+prozent = tabelle / tabelle.sum() * 100
+tabelle.join(prozent.add_suffix("_pct")).to_csv(os.path.join(output_dir, "abstand_baender.csv"), sep=";")
+print(tabelle.join(prozent.add_suffix("_pct").round(1)))
+
+# === 5. Histogramme ===
+gruppen = {
+    "Gebaeude": "Gebäude",
+    "Bewohner": "Bewohner (Gebäude)",
+    "Einwohner": "Einwohner (Zensus)",
+    "Ueber65": "Über 65-Jährige (Zensus)",
+}
+titel_ziel = " / ".join(ziel_klassen)
+
+
+def plot_baender(df, ylabel, titel):
+    x = np.arange(len(gruppen))
+    breite = 0.8 / len(labels_abstand)
+
+    fig, ax = plt.subplots(figsize=(12, 6))
+    for i, band in enumerate(labels_abstand):
+        ax.bar(x - 0.4 + (i + 0.5) * breite, df.loc[band, list(gruppen)], breite,
+               label=band, color=farben_abstand[i], edgecolor="black", linewidth=0.3)
+
+    ax.set_xticks(x)
+    ax.set_xticklabels(gruppen.values())
+    ax.set_ylabel(ylabel)
+    ax.set_title(titel)
+    ax.legend(title=f"Abstand zu '{titel_ziel}'", loc="upper left", bbox_to_anchor=(1.02, 1), frameon=True)
+    ax.grid(axis="y", linestyle="--", alpha=0.5)
+    plt.tight_layout(rect=[0, 0, 0.85, 1])
+    plt.show()
+
+
+plot_baender(tabelle, "Anzahl", f"Abstand zum nächsten Pixel mit Risiko '{titel_ziel}'")
+plot_baender(prozent, "Anteil in %", f"Verteilung nach Abstand zum nächsten Pixel mit Risiko '{titel_ziel}'")
@@ -2,98 +2,153 @@
 #Gestapeltes Balkendiagramm: Altersgruppen nach Hochwasserrisiko (prozentualer Anteil)
 
 #Input:
-#- data/excel/Alter_in_10er-Jahresgruppen_Unterfranken_polygon.xlsx
+#- data/excel/Alter_in_10er-Jahresgruppen_Unterfranken_polygon.xlsx (oder .parquet, wird in Chunks gelesen)
 #- data/raster/HSM_WoE_C.tif
+#- outputs/gitter/zellrisiko_100m.parquet (optional, aus main_zellrisiko.py: mittlerer WoE-Wert
+#  je Zelle statt des Werts am Zellmittelpunkt)
 
 #Output:
-#- Gestapeltes Balkendiagramm im Plot-Fenster
+#- Gestapeltes Balkendiagramm im Plot-Fenster (mit 95 %-Bootstrap-Konfidenzintervallen je Klasse)
+
+import os
+import sys
 
-import pandas as pd
 import numpy as np
-import rasterio
+import pandas as pd
 from pyproj import Transformer
 import matplotlib.pyplot as plt
 
-# === 1. Histogramm erstellen ===
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from werkzeuge.bootstrap import bootstrap_anteile
+from werkzeuge.gitter import schluessel_aus_koordinaten
+from werkzeuge.raster_speicher import oeffne_raster
+from werkzeuge.risiko import CODE_FEHLT, farben, labels_risiko, risiko_codes, schriftfarben
+from werkzeuge.tabellen import lies_in_chunks, parquet_spiegel
+from werkzeuge.zellrisiko import lade_zellrisiko, zellwerte
+
+# Neue Altersgruppen-Beschriftungen
+altersgruppen_umbenannt = {
+    "Unter10": "<10",
+    "a10bis19": "10-19",
+    "a20bis29": "20-29",
+    "a30bis39": "30-39",
+    "a40bis49": "40-49",
+    "a50bis59": "50-59",
+    "a60bis69": "60-69",
+    "a70bis79": "70-79",
+    "a80undaelter": ">80",
+}
+altersspaltengruppen = list(altersgruppen_umbenannt.keys())
+
+# Replikate für die Konfidenzintervalle (0 = ohne, Aggregation dann rein chunkweise)
+bootstrap_replikate = 1000
+
+# === 1. Aggregation ===
+
+def zellen_codes(chunk, raster, transformer, zellrisiko=None):
+    """Risiko-Codes je Zelle: Mittel aus der Zelltabelle (Join über den Schlüssel) oder Wert am Zellmittelpunkt."""
+    if zellrisiko is not None:
+        schluessel = schluessel_aus_koordinaten(chunk["x_mp_100m"].values, chunk["y_mp_100m"].values)
+        return risiko_codes(zellwerte(zellrisiko, schluessel))
+    x_raster, y_raster = transformer.transform(chunk["x_mp_100m"].values, chunk["y_mp_100m"].values)
+    return risiko_codes(raster.werte(x_raster, y_raster))
+
+
+def aggregiere_altersgruppen(tabellen_path, raster_path, chunk_size=200_000, zellrisiko=None):
+    """
+    Summiert die Altersgruppen je Risikoklasse im Breitformat.
+
+    Die Eingabe (Excel, Parquet oder CSV) wird in Chunks gelesen; pro Chunk
+    werden nur die Risiko-Codes bestimmt und die neun Altersspalten mit einem
+    groupby über die Codes summiert. Rückgabe: Prozentanteile (Altersgruppe x Klasse).
+    """
+    spalten = ["x_mp_100m", "y_mp_100m", "Insgesamt_Bevoelkerung"] + altersspaltengruppen
+    # Zeilen 0..4 = Risikoklassen, 5 = gültiger Wert außerhalb der Klassengrenzen
+    summen = pd.DataFrame(0.0, index=range(len(labels_risiko) + 1), columns=altersspaltengruppen)
+
+    # Raster als memmap (einmaliger Export nach .npy)
+    raster = oeffne_raster(raster_path)
+    transformer = Transformer.from_crs("EPSG:3035", raster.crs, always_xy=True)
+
+    for chunk in lies_in_chunks(tabellen_path, spalten, chunk_size):
+        chunk = chunk.apply(pd.to_numeric, errors="coerce").dropna()
+        if chunk.empty:
+            continue
+
+        codes = zellen_codes(chunk, raster, transformer, zellrisiko)
+        gueltig = codes != CODE_FEHLT
+
+        # Nur positive Anzahlen zählen
+        anzahlen = chunk.loc[gueltig, altersspaltengruppen].clip(lower=0)
+        summen = summen.add(anzahlen.groupby(codes[gueltig]).sum(), fill_value=0)
+
+    gesamt = summen.sum(axis=0)
+    gruppen = summen.loc[: len(labels_risiko) - 1].T
+    gruppen.columns = labels_risiko
+    prozent_df = (gruppen.T / gesamt).T * 100
+    return prozent_df.rename(index=altersgruppen_umbenannt)
+
+
+def lade_zellen(tabellen_path, raster_path, chunk_size=200_000, zellrisiko=None):
+    """
+    Risiko-Code und Altersgruppen-Anzahlen je Gitterzelle (für den Bootstrap).
+
+    Liest wie aggregiere_altersgruppen in Chunks, behält aber die Zellen
+    (int8-Codes und float32-Anzahlen) statt nur der Summen.
+    """
+    spalten = ["x_mp_100m", "y_mp_100m", "Insgesamt_Bevoelkerung"] + altersspaltengruppen
+    raster = oeffne_raster(raster_path)
+    transformer = Transformer.from_crs("EPSG:3035", raster.crs, always_xy=True)
+
+    codes, anzahlen = [], []
+    for chunk in lies_in_chunks(tabellen_path, spalten, chunk_size):
+        chunk = chunk.apply(pd.to_numeric, errors="coerce").dropna()
+        if chunk.empty:
+            continue
+
+        chunk_codes = zellen_codes(chunk, raster, transformer, zellrisiko)
+        gueltig = chunk_codes != CODE_FEHLT
+        codes.append(chunk_codes[gueltig])
+        anzahlen.append(chunk.loc[gueltig, altersspaltengruppen].clip(lower=0).to_numpy(dtype="float32"))
+
+    if not codes:
+        return np.empty(0, dtype="int8"), np.empty((0, len(altersspaltengruppen)), dtype="float32")
+    return np.concatenate(codes), np.concatenate(anzahlen)
+
+
+def konfidenz_altersgruppen(codes, anzahlen, replikate=bootstrap_replikate):
+    """Prozentanteile sowie untere/obere 95 %-Grenzen (jeweils Altersgruppe x Klasse) per Bootstrap."""
+    # Klasse len(labels_risiko) (außerhalb der Grenzen) zählt wie in aggregiere_altersgruppen zur Gesamtsumme
+    ki = bootstrap_anteile(codes, anzahlen, len(labels_risiko) + 1, replikate=replikate)
+    index = [altersgruppen_umbenannt[a] for a in altersspaltengruppen]
+    return tuple(
+        pd.DataFrame(ki[teil][: len(labels_risiko)].T, index=index, columns=labels_risiko)
+        for teil in ("anteil", "unten", "oben")
+    )
+
+# === 2. Histogramm erstellen ===
 
 def main():
-    # 1. Excel-Datei laden
+    # 1. Excel-Datei laden (einmalig als Parquet gespiegelt) und Raster
     excel_path = "data/excel/Alter_in_10er-Jahresgruppen_Unterfranken_polygon.xlsx"
-    df = pd.read_excel(excel_path)
-
-    # Neue Altersgruppen-Beschriftungen
-    altersgruppen_umbenannt = {
-        "Unter10": "<10",
-        "a10bis19": "10-19",
-        "a20bis29": "20-29",
-        "a30bis39": "30-39",
-        "a40bis49": "40-49",
-        "a50bis59": "50-59",
-        "a60bis69": "60-69",
-        "a70bis79": "70-79",
-        "a80undaelter": ">80",
-    }
-    altersspaltengruppen = list(altersgruppen_umbenannt.keys())
-
-    df = df[["x_mp_100m", "y_mp_100m", "Insgesamt_Bevoelkerung"] + altersspaltengruppen].dropna()
-
-    # 2. Raster öffnen und Risikowerte extrahieren
     raster_path = "data/raster/HSM_WoE_C.tif"
-    with rasterio.open(raster_path) as src:
-        raster_crs = src.crs
-        nodata = src.nodata
-
-        transformer = Transformer.from_crs("EPSG:3035", raster_crs, always_xy=True)
-        x_raster, y_raster = transformer.transform(df["x_mp_100m"].values, df["y_mp_100m"].values)
-        coords = list(zip(x_raster, y_raster))
-
-        risiko_values = []
-        for val in src.sample(coords):
-            risiko = val[0]
-            risiko_values.append(np.nan if nodata is not None and risiko == nodata else risiko)
-
-    df["Risiko"] = risiko_values
-
-    # 3. Risiko-Klassen zuweisen
-    bins_risiko = [-18.459, -10.999, -6.982, -2.62, 2.546, 10.81]
-    labels_risiko = ["sehr gering", "gering", "mittel", "hoch", "sehr hoch"]
-    farben = {
-        "sehr gering": "darkgreen",
-        "gering": "green",
-        "mittel": "gold",
-        "hoch": "orange",
-        "sehr hoch": "red",
-    }
-    schriftfarben = {
-        "sehr gering": "white",
-        "gering": "white",
-        "mittel": "black",
-        "hoch": "black",
-        "sehr hoch": "black",
-    }
-
-    df = df.dropna(subset=["Risiko"])
-    df["Risiko_Klasse"] = pd.cut(df["Risiko"], bins=bins_risiko, labels=labels_risiko, include_lowest=True)
-
-    # 4. Daten formatieren
-    df_melt = df.melt(
-        id_vars=["Risiko_Klasse"],
-        value_vars=altersspaltengruppen,
-        var_name="Altersgruppe",
-        value_name="Anzahl",
-    )
-    df_melt["Altersgruppe"] = df_melt["Altersgruppe"].map(altersgruppen_umbenannt)
-    df_melt = df_melt.dropna(subset=["Anzahl"])
-    df_melt = df_melt[df_melt["Anzahl"] > 0]
+    zellrisiko_path = "outputs/gitter/zellrisiko_100m.parquet"
+    tabellen_path = parquet_spiegel(excel_path)
+    zellrisiko = lade_zellrisiko(zellrisiko_path, raster_path)
 
-    # 5. Prozentwerte berechnen
-    gesamt = df_melt.groupby("Altersgruppe")["Anzahl"].sum()
-    gruppen = df_melt.groupby(["Altersgruppe", "Risiko_Klasse"])["Anzahl"].sum().unstack().reindex(columns=labels_risiko)
-    prozent_df = (gruppen.T / gesamt).T * 100
+    # 2.-5. Risikowerte extrahieren, Klassen zuweisen und Prozentwerte berechnen
+    sortierte_altersgruppen = ["<10", "10-19", "20-29", "30-39", "40-49", "50-59", "60-69", "70-79", ">80"]
+    if bootstrap_replikate:
+        codes, anzahlen = lade_zellen(tabellen_path, raster_path, zellrisiko=zellrisiko)
+        prozent_df, unten_df, oben_df = (
+            df.reindex(sortierte_altersgruppen) for df in konfidenz_altersgruppen(codes, anzahlen)
+        )
+    else:
+        prozent_df = aggregiere_altersgruppen(tabellen_path, raster_path, zellrisiko=zellrisiko).reindex(
+            sortierte_altersgruppen
+        )
 
     # 6. Diagramm erstellen
-    sortierte_altersgruppen = ["<10", "10-19", "20-29", "30-39", "40-49", "50-59", "60-69", "70-79", ">80"]
-    prozent_df = prozent_df.reindex(sortierte_altersgruppen)
 
     fig, ax = plt.subplots(figsize=(12, 6))
     prozent_df.plot(
@@ -119,6 +174,19 @@ def main():
                 )
                 y_offset += wert
 
+    # Konfidenzintervall jeder Klasse am oberen Rand ihres Segments
+    if bootstrap_replikate:
+        oberkante = prozent_df.fillna(0).cumsum(axis=1)
+        for i, gruppe in enumerate(prozent_df.index):
+            ax.errorbar(
+                np.full(len(labels_risiko), i), oberkante.loc[gruppe].values,
+                yerr=[
+                    (prozent_df.loc[gruppe] - unten_df.loc[gruppe]).values,
+                    (oben_df.loc[gruppe] - prozent_df.loc[gruppe]).values,
+                ],
+                fmt="none", ecolor="black", capsize=2, linewidth=0.8,
+            )
+
     ax.set_title("Altersgruppen nach Hochwasserrisiko (prozentual)", fontsize=14)
     ax.set_xlabel("Altersgruppe")
     ax.set_ylabel("Anteil in %")
@@ -129,7 +197,7 @@ def main():
     plt.tight_layout()
     plt.show()
 
-# === 2. Skript ausführen ===
+# === 3. Skript ausführen ===
 
 if __name__ == "__main__":
     main()
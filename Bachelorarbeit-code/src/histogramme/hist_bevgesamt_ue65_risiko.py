@@ -3,55 +3,59 @@
 #nach Hochwasserrisiko in Unterfranken.
 
 #Input:
-#- data/excel/unterfranken_ueber65_absolut.xlsx
+#- outputs/tables/unterfranken_ueber65_absolut.parquet (aus weitere_scripts/Anzahl_ueber_65.py)
 #- data/raster/HSM_WoE_C.tif 
+#- outputs/gitter/zellrisiko_100m.parquet (optional, aus main_zellrisiko.py: mittlerer WoE-Wert
+#  je Zelle statt des Werts am Zellmittelpunkt; nur wenn sie zum aktuellen Raster passt)
 
 #Output:
 #- Anzeige von zwei Histogrammen:
 #  1. absolute Anzahl (Gesamtbevölkerung und über 65-Jährige)
-#  2. Prozentuale Verteilung
+#  2. Prozentuale Verteilung mit 95 %-Bootstrap-Konfidenzintervallen
+
+import os
+import sys
 
 import pandas as pd
 import numpy as np
-import rasterio
 from pyproj import CRS, Transformer
 import matplotlib.pyplot as plt
 
-# === 1. Histogramme erstellen ===
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from werkzeuge.bootstrap import bootstrap_anteile
+from werkzeuge.gitter import SCHLUESSEL_SPALTE, gitter_schluessel, zellmittelpunkte
+from werkzeuge.raster_speicher import oeffne_raster
+from werkzeuge.tabellen import lade_tabelle
+from werkzeuge.zellrisiko import lade_zellrisiko, zellwerte
 
-def create_histograms(excel_path="data/excel/unterfranken_ueber65_absolut.xlsx",
-                      raster_path="data/raster/HSM_WoE_C.tif"):
-    # 1. Excel laden
-    df_all = pd.read_excel(excel_path)
-
-    # 2. Raster laden
-    with rasterio.open(raster_path) as src:
-        raster_crs = src.crs
-
-    # 3. CRS definieren
-    crs_excel = CRS.from_epsg(3035)  
-    crs_raster = raster_crs          
-
-    # 4. Transformer erstellen
-    transformer = Transformer.from_crs(crs_excel, crs_raster, always_xy=True)
-
-    # 5. Koordinaten transformieren 
-    x_coords = df_all["x_mp_100m_x"].values
-    y_coords = df_all["y_mp_100m_x"].values
-    x_raster, y_raster = transformer.transform(x_coords, y_coords)
-    coords = list(zip(x_raster, y_raster))
-
-    # 6. Rasterwerte auslesen
-    with rasterio.open(raster_path) as src:
-        nodata = src.nodata
-        risiko_values = []
-        for val in src.sample(coords):
-            risiko = val[0]
-            if nodata is not None and risiko == nodata:
-                risiko_values.append(np.nan)
-            else:
-                risiko_values.append(risiko)
+# === 1. Histogramme erstellen ===
 
+def create_histograms(excel_path="outputs/tables/unterfranken_ueber65_absolut.parquet",
+                      raster_path="data/raster/HSM_WoE_C.tif",
+                      zellrisiko_path="outputs/gitter/zellrisiko_100m.parquet",
+                      bootstrap_replikate=1000):
+    # 1. Tabelle laden (Parquet direkt, Excel über den Parquet-Spiegel)
+    df_all = lade_tabelle(excel_path)
+
+    # 2. Raster als memmap laden (einmaliger Export nach .npy)
+    raster = oeffne_raster(raster_path)
+
+    # 3. Gitter-Schlüssel der Zellen
+    if SCHLUESSEL_SPALTE not in df_all.columns:
+        df_all[SCHLUESSEL_SPALTE] = gitter_schluessel(df_all["GITTER_ID_100m"])
+
+    # 4. Rasterwerte je Zelle: Mittel aller Pixel der Zelle (Join über den Schlüssel)
+    zellrisiko = lade_zellrisiko(zellrisiko_path, raster_path)
+    if zellrisiko is not None:
+        risiko_values = zellwerte(zellrisiko, df_all[SCHLUESSEL_SPALTE].values)
+    else:
+        # 5. ohne passende Zelltabelle: Wert am Zellmittelpunkt (EPSG:3035 -> Raster-CRS, nodata -> NaN)
+        transformer = Transformer.from_crs(CRS.from_epsg(3035), raster.crs, always_xy=True)
+        x_coords, y_coords = zellmittelpunkte(df_all[SCHLUESSEL_SPALTE].values)
+        x_raster, y_raster = transformer.transform(x_coords, y_coords)
+        risiko_values = raster.werte(x_raster, y_raster)
+
+    # 6. Risikowerte übernehmen
     df_all["Risiko"] = risiko_values
 
     # 7. Gültige Zeilen filtern
@@ -89,13 +93,26 @@ def create_histograms(excel_path="data/excel/unterfranken_ueber65_absolut.xlsx",
     gesamt_prozent = (gesamt / gesamt.sum()) * 100
     ueber65_prozent = (ueber65 / ueber65.sum()) * 100
 
+    # Konfidenzintervalle: Bootstrap über die Gitterzellen
+    ki = bootstrap_anteile(
+        df_all["Risiko_Klasse"].cat.codes.values,
+        df_all[["Einwohner", "Ueber65_Absolut"]].values,
+        len(labels_risiko),
+        replikate=bootstrap_replikate,
+    )
+    fehler_gesamt = [ki["anteil"][:, 0] - ki["unten"][:, 0], ki["oben"][:, 0] - ki["anteil"][:, 0]]
+    fehler_ueber65 = [ki["anteil"][:, 1] - ki["unten"][:, 1], ki["oben"][:, 1] - ki["anteil"][:, 1]]
+
     fig, ax = plt.subplots(figsize=(10, 6))
-    ax.bar(x - breite/2, gesamt_prozent, breite, label='Gesamtbevölkerung', color='lightblue')
-    ax.bar(x + breite/2, ueber65_prozent, breite, label='Über 65-Jährige', color='salmon')
+    ax.bar(x - breite/2, gesamt_prozent, breite, label='Gesamtbevölkerung', color='lightblue',
+           yerr=fehler_gesamt, capsize=4)
+    ax.bar(x + breite/2, ueber65_prozent, breite, label='Über 65-Jährige', color='salmon',
+           yerr=fehler_ueber65, capsize=4)
 
     ax.set_xlabel("Hochwasserrisiko")
     ax.set_ylabel("Anteil in %")
-    ax.set_title("Prozentuale Verteilung der Gesamtbevölkerung und der über 65-jährigen nach Hochwasserrisiko")
+    ax.set_title("Prozentuale Verteilung der Gesamtbevölkerung und der über 65-jährigen nach Hochwasserrisiko\n"
+                 f"(Fehlerbalken: 95 %-Konfidenzintervall, Bootstrap mit {bootstrap_replikate} Replikaten)")
     ax.set_xticks(x)
     ax.set_xticklabels(labels_risiko)
     ax.legend()
@@ -103,8 +120,8 @@ def create_histograms(excel_path="data/excel/unterfranken_ueber65_absolut.xlsx",
 
     # 11. Prozentwerte über Balken anzeigen
     for i, (g, u) in enumerate(zip(gesamt_prozent, ueber65_prozent)):
-        ax.text(i - breite/2, g + 0.3, f"{g:.1f}%", ha='center', fontsize=9)
-        ax.text(i + breite/2, u + 0.3, f"{u:.1f}%", ha='center', fontsize=9)
+        ax.text(i - breite/2, ki["oben"][i, 0] + 0.3, f"{g:.1f}%", ha='center', fontsize=9)
+        ax.text(i + breite/2, ki["oben"][i, 1] + 0.3, f"{u:.1f}%", ha='center', fontsize=9)
 
     plt.tight_layout()
     plt.show()
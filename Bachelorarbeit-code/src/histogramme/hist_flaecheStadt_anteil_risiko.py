@@ -8,22 +8,27 @@
 # Output:
 # - Anzeige des Diagramms im Plot-Fenster
 
-import geopandas as gpd
+import os
+import sys
+
 import matplotlib.pyplot as plt
 import pandas as pd
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from werkzeuge.einlesen import lade_ebene
+
 # === Diagramm erstellen ===
 
-# 1. Daten laden
+# 1. Städte und Prozentspalten
 shp_path = "data/shapefiles/flaechen_gemeinden_risiko_unterfranken.shp"
-gdf = gpd.read_file(shp_path)
-
-# 2. Städte auswählen
 auswahl_staedte = ["Aschaffenburg", "Würzburg", "Schweinfurt"]
-gdf_auswahl = gdf[gdf["GEN"].isin(auswahl_staedte)].copy()
-
-# 3. Prozentspalten und Farben definieren
 labels_pct = ["s_ger_pct", "ger_pct", "mit_pct", "hoch_pct", "s_hoch_pct"]
+
+# 2. Nur die drei Städte und die benötigten Spalten lesen (Filter beim Lesen, ohne Geometrie)
+gdf_auswahl = lade_ebene(shp_path, spalten=["GEN"] + labels_pct, auswahl={"GEN": auswahl_staedte},
+                         geometrie=False)
+
+# 3. Farben definieren
 risiko_klassen = labels_pct.copy()
 
 farben = {
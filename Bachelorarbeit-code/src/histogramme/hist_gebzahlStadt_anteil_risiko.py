@@ -9,28 +9,22 @@
 # Output:
 # - Anzeige des Diagramms im Plot-Fenster
 
-import geopandas as gpd
-import rasterio
+import os
+import sys
+
 import pandas as pd
-import numpy as np
 import matplotlib.pyplot as plt
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from werkzeuge.gebaeude import lade_gebaeude_mit_risiko
+
 # === Diagramm erstellen ===
 
-# 1. Shapefile laden und Raster extrahieren
-gdf = gpd.read_file("data/shapefiles/buildings_unterfranken.shp")
+# 1. Nur Gebäude der drei Städte laden (Filter beim Lesen) und Raster extrahieren
 raster_path = "data/raster/HSM_WoE_C.tif"
-
-with rasterio.open(raster_path) as src:
-    # reprojizieren, falls nötig
-    if gdf.crs != src.crs:
-        gdf = gdf.to_crs(src.crs)
-
-    coords = [(geom.x, geom.y) for geom in gdf.geometry]
-    risiko_values = [val[0] if val[0] != src.nodata else np.nan for val in src.sample(coords)]
-
-# Risiko-Werte zum GeoDataFrame hinzufügen
-gdf["Risiko"] = risiko_values
+auswahl_staedte = ["Aschaffenburg", "Würzburg", "Schweinfurt"]
+gdf = lade_gebaeude_mit_risiko("data/shapefiles/buildings_unterfranken.shp", raster_path,
+                               spalten=["LocalityNa"], auswahl={"LocalityNa": auswahl_staedte})
 
 # 2. Risikoklassen zuordnen
 bins_risiko = [-18.459, -10.999, -6.982, -2.62, 2.546, 10.81]
@@ -56,18 +50,14 @@ schriftfarben = {
 }
 risiko_klassen = ["sehr gering", "gering", "mittel", "hoch", "sehr hoch"]
 
-# 4. Städte auswählen
-auswahl_staedte = ["Aschaffenburg", "Würzburg", "Schweinfurt"]
-gdf_auswahl = gdf[gdf['LocalityNa'].isin(auswahl_staedte)]
-
-# 5. Gruppieren & Prozentwerte berechnen
-gruppen = gdf_auswahl.groupby(["LocalityNa", "Risiko_Klasse"]).size().unstack(fill_value=0)
+# 4. Gruppieren & Prozentwerte berechnen
+gruppen = gdf.groupby(["LocalityNa", "Risiko_Klasse"]).size().unstack(fill_value=0)
 gruppen = gruppen[risiko_klassen]  
 
 prozent_df = (gruppen.T / gruppen.sum(axis=1)).T * 100
 prozent_df = prozent_df.loc[auswahl_staedte] 
 
-# 6. Balkendiagramm erstellen
+# 5. Balkendiagramm erstellen
 fig, ax = plt.subplots(figsize=(10, 6))
 
 bars = prozent_df.plot(
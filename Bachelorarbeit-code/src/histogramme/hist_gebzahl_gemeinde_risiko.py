@@ -5,53 +5,31 @@
 #Input:
 #- data/shapefiles/buildings_unterfranken_clipped.shp
 #- data/raster/HSM_WoE_C.tif
+#- data/shapefiles/VG5000_GEM.shp
 
 #Output:
 #- Anzeige der Histogramme im Plot-Fenster
 
 
-import geopandas as gpd
-import rasterio
+import os
+import sys
+
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
-from shapely.geometry import Point, MultiPoint
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from werkzeuge.gebaeude import lade_gebaeude_mit_risiko
+from werkzeuge.gemeinden import AGS_FEHLT, AGS_SPALTE, ergaenze_gemeinden
 
 # === Histogrammerstellung ===
 
-# 1. Shapefile laden
+# 1.-3. Shapefile laden, MultiPoints aufspalten und Risiko aus dem Raster extrahieren
 buildings_path = "data/shapefiles/buildings_unterfranken_clipped.shp"
-gdf = gpd.read_file(buildings_path)
-
-# 2. MultiPoints aufspalten
-def explode_multipoints(gdf):
-    rows = []
-    for _, row in gdf.iterrows():
-        geom = row.geometry
-        if isinstance(geom, Point):
-            rows.append(row)
-        elif isinstance(geom, MultiPoint):
-            for pt in geom.geoms:
-                new_row = row.copy()
-                new_row.geometry = pt
-                rows.append(new_row)
-    return gpd.GeoDataFrame(rows, crs=gdf.crs)
-
-gdf = explode_multipoints(gdf)
-
-# 3. Raster laden und Risiko extrahieren
 raster_path = "data/raster/HSM_WoE_C.tif"
-with rasterio.open(raster_path) as src:
-    if gdf.crs != src.crs:
-        gdf = gdf.to_crs(src.crs)
-    coords = [(geom.x, geom.y) for geom in gdf.geometry if geom is not None and geom.geom_type == "Point"]
-    risiko_values = [val[0] if val[0] != src.nodata else np.nan for val in src.sample(coords)]
-
-# 4. Risiko-Werte zuordnen
-gdf = gdf[gdf.geometry.notnull()]
-gdf = gdf[gdf.geometry.type == "Point"]
-gdf = gdf.iloc[:len(risiko_values)].copy()
-gdf["Risiko"] = risiko_values
+gdf = lade_gebaeude_mit_risiko(buildings_path, raster_path)
+
+# 4. Risikoklassen zuordnen
 
 bins_risiko = [-18.459, -10.999, -6.982, -2.62, 2.546, 10.81]
 labels_risiko = ["sehr gering", "gering", "mittel", "hoch", "sehr hoch"]
@@ -68,7 +46,12 @@ farben = {
     "sehr hoch": "red"
 }
 
-risiko_counts = gdf.groupby(["LocalityNa", "Risiko_Klasse"]).size().unstack(fill_value=0)
+# Gebäude räumlich ihrer Gemeinde (AGS) zuordnen und darüber gruppieren
+gdf, gemeinde_namen = ergaenze_gemeinden(gdf)
+gdf = gdf[gdf[AGS_SPALTE] != AGS_FEHLT]
+
+risiko_counts = gdf.groupby([AGS_SPALTE, "Risiko_Klasse"], observed=False).size().unstack(fill_value=0)
+risiko_counts.index = risiko_counts.index.map(gemeinde_namen).rename("GEN")
 for rk in relevante_klassen:
     if rk not in risiko_counts.columns:
         risiko_counts[rk] = 0
@@ -98,7 +81,7 @@ def plot_risiko_verteilung(risiko_df, sortierung, title_suffix):
     marker_staedte = ["Würzburg", "Schweinfurt", "Aschaffenburg"]
     for stadt in marker_staedte:
         try:
-            idx = risiko_df_sorted[risiko_df_sorted["LocalityNa"] == stadt].index[0]
+            idx = risiko_df_sorted[risiko_df_sorted["GEN"] == stadt].index[0]
             ax.axvline(x=idx, color="black", linestyle="--", linewidth=1)
             ax.text(
                 idx, 100, stadt,
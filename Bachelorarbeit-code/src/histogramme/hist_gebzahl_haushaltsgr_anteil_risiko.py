@@ -10,41 +10,22 @@
 #- Anzeige des Histogramms im Plot-Fenster 
 
 
-import geopandas as gpd
-import rasterio
+import os
+import sys
+
 import pandas as pd
 import matplotlib.pyplot as plt
-from shapely.geometry import Point, MultiPoint
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from werkzeuge.gebaeude import lade_gebaeude_mit_risiko
 
 # === 1. Histogrammerstellung ===
 
 def create_histogram(buildings_path="data/shapefiles/buildings_unterfranken_clipped.shp",
                      raster_path="data/raster/HSM_WoE_C.tif"):
 
-    # 1. Gebäudepunkte laden
-    gdf = gpd.read_file(buildings_path)
-
-    # 2. MultiPoints aufspalten 
-    def explode_multipoints(gdf):
-        rows = []
-        for idx, row in gdf.iterrows():
-            geom = row.geometry
-            if isinstance(geom, Point):
-                rows.append(row)
-            elif isinstance(geom, MultiPoint):
-                for pt in geom.geoms:
-                    new_row = row.copy()
-                    new_row.geometry = pt
-                    rows.append(new_row)
-        return gpd.GeoDataFrame(rows, crs=gdf.crs)
-
-    gdf = explode_multipoints(gdf)
-
-    # 3. Raster laden & Risiko-Werte extrahieren
-    with rasterio.open(raster_path) as src:
-        coords = [(geom.x, geom.y) for geom in gdf.geometry]
-        risiko_values = [val[0] if val else None for val in src.sample(coords)]
-    gdf["Risiko"] = risiko_values
+    # 1.-3. Gebäudepunkte laden, MultiPoints aufspalten und Risiko-Werte extrahieren
+    gdf = lade_gebaeude_mit_risiko(buildings_path, raster_path)
 
     # 4. Nur gültige Daten verwenden
     gdf = gdf.dropna(subset=["Risiko", "geb_bewohn"])
@@ -9,43 +9,24 @@
 #Output:
 #- Anzeige des Histogramms im Plot-Fenster
 
-import geopandas as gpd
-import rasterio
+import os
+import sys
+
 import matplotlib.pyplot as plt
 import pandas as pd
-from shapely.geometry import Point, MultiPoint
-
-# === 1.MultiPoints aufspalten ===
 
-def explode_multipoints(gdf):
-    rows = []
-    for _, row in gdf.iterrows():
-        geom = row.geometry
-        if isinstance(geom, Point):
-            rows.append(row)
-        elif isinstance(geom, MultiPoint):
-            for pt in geom.geoms:
-                new_row = row.copy()
-                new_row.geometry = pt
-                rows.append(new_row)
-    return gpd.GeoDataFrame(rows, crs=gdf.crs)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from werkzeuge.gebaeude import lade_gebaeude_mit_risiko
 
-# === 2. Histogramm erstellen ===
+# === 1. Histogramm erstellen ===
 
 def create_histogram():
     # 1. Gebäudepunkte laden 
     buildings_path = "data/shapefiles/buildings_unterfranken_clipped.shp"
-    gdf = gpd.read_file(buildings_path)
-    gdf = explode_multipoints(gdf)
-
-    # 2. Raster laden
     raster_path = "data/raster/HSM_WoE_C.tif"
-    with rasterio.open(raster_path) as src:
-        coords = [(geom.x, geom.y) for geom in gdf.geometry]
-        risiko_values = [val[0] if val else None for val in src.sample(coords)]
 
-    # 3. Risiko-Werte hinzufügen
-    gdf["Risiko"] = risiko_values
+    # 2.-3. MultiPoints aufspalten und Risiko-Werte aus dem Raster hinzufügen
+    gdf = lade_gebaeude_mit_risiko(buildings_path, raster_path)
     gdf = gdf.dropna(subset=["Risiko", "geb_bewohn"])
     gdf = gdf[gdf["geb_bewohn"] > 0]
 
@@ -99,7 +80,7 @@ def create_histogram():
     plt.tight_layout()
     plt.show()
 
-# === 3.Skript ausführen ===
+# === 2.Skript ausführen ===
 
 if __name__ == "__main__":
     create_histogram()
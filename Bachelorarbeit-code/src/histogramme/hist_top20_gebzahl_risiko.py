@@ -4,54 +4,29 @@
 #Input:
 #- data/shapefiles/buildings_unterfranken_clipped.shp   
 #- data/raster/HSM_WoE_C.tif                            
+#- data/shapefiles/VG5000_GEM.shp
 
 #Output:
 #- Anzeige des Plots im Fenster
 
-import geopandas as gpd
-import rasterio
+import os
+import sys
+
 import pandas as pd
-import numpy as np
 import matplotlib.pyplot as plt
-from shapely.geometry import Point, MultiPoint
-
-# === 1. MultiPoints aufspalten ===
-
-def explode_multipoints(gdf: gpd.GeoDataFrame) -> gpd.GeoDataFrame:
-    """Zerlegt MultiPoint-Geometrien in einzelne Punkte."""
-    rows = []
-    for _, row in gdf.iterrows():
-        geom = row.geometry
-        if isinstance(geom, Point):
-            rows.append(row)
-        elif isinstance(geom, MultiPoint):
-            for pt in geom.geoms:
-                new_row = row.copy()
-                new_row.geometry = pt
-                rows.append(new_row)
-    return gpd.GeoDataFrame(rows, crs=gdf.crs)
-
-# === 2. Diagramm erstellen ===
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from werkzeuge.gebaeude import lade_gebaeude_mit_risiko
+from werkzeuge.gemeinden import AGS_FEHLT, AGS_SPALTE, ergaenze_gemeinden
+
+# === 1. Diagramm erstellen ===
 
 # 1. Daten laden
 shapefile_path = "data/shapefiles/buildings_unterfranken_clipped.shp"
 raster_path = "data/raster/HSM_WoE_C.tif"
 
-gdf = gpd.read_file(shapefile_path)
-gdf = explode_multipoints(gdf)
-
-with rasterio.open(raster_path) as src:
-    # reprojizieren, falls nötig
-    if gdf.crs != src.crs:
-        gdf = gdf.to_crs(src.crs)
-
-    coords = [(geom.x, geom.y) for geom in gdf.geometry]
-    risiko_values = [
-        val[0] if val[0] != src.nodata else np.nan
-        for val in src.sample(coords)
-    ]
-
-gdf["Risiko"] = risiko_values
+# MultiPoints aufspalten und Risiko aus dem Raster extrahieren
+gdf = lade_gebaeude_mit_risiko(shapefile_path, raster_path)
 
 # 2. Risikoklassen bilden
 bins_risiko = [-18.459, -10.999, -6.982, -2.62, 2.546, 10.81]
@@ -82,12 +57,15 @@ schriftfarben = {
 }
 risiko_klassen = labels_risiko
 
-# 3. Top 20 Gemeinden berechnen
-top20_gemeinden = gdf["LocalityNa"].value_counts().head(20).index
-gdf_top = gdf[gdf["LocalityNa"].isin(top20_gemeinden)]
+# 3. Top 20 Gemeinden berechnen (Gebäude räumlich per AGS zugeordnet)
+gdf, gemeinde_namen = ergaenze_gemeinden(gdf)
+gdf = gdf[gdf[AGS_SPALTE] != AGS_FEHLT]
+
+top20_gemeinden = gdf[AGS_SPALTE].value_counts().head(20).index
+gdf_top = gdf[gdf[AGS_SPALTE].isin(top20_gemeinden)]
 
 gruppen = gdf_top.groupby(
-    ["LocalityNa", "Risiko_Klasse"]
+    [AGS_SPALTE, "Risiko_Klasse"], observed=False
 ).size().unstack(fill_value=0)
 
 gruppen = gruppen[risiko_klassen]  
@@ -96,6 +74,7 @@ prozent_df = (gruppen.T / gruppen.sum(axis=1)).T * 100
 # Sortieren nach Gesamtgebäudeanzahl
 gesamtanzahl = gruppen.sum(axis=1)
 prozent_df = prozent_df.loc[gesamtanzahl.sort_values(ascending=False).index]
+prozent_df.index = prozent_df.index.map(gemeinde_namen)
 
 # 4. Diagramm zeichnen
 fig, ax = plt.subplots(figsize=(14, 8))
@@ -8,52 +8,31 @@
 #Input:
 #- data/shapefiles/buildings_unterfranken_clipped.shp   
 #- data/raster/HSM_WoE_C.tif                            
+#- data/shapefiles/VG5000_GEM.shp
 
 #Output:
 #- Anzeige des Histogramms im Plot-Fenster
 
-import geopandas as gpd
-import rasterio
+import os
+import sys
+
 import pandas as pd
-import numpy as np
 import matplotlib.pyplot as plt
-from shapely.geometry import Point, MultiPoint
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from werkzeuge import gebaeude
+from werkzeuge.gemeinden import AGS_FEHLT, AGS_SPALTE, ergaenze_gemeinden
 
 # 1. Eingabedaten
 shapefile_path = "../data/shapefiles/buildings_unterfranken_clipped.shp"
 raster_path = "../data/raster/HSM_WoE_C.tif"
+gemeinden_path = "../data/shapefiles/VG5000_GEM.shp"
 
-# === 1. Multipoints aufspalten ===
-def explode_multipoints(gdf):
-    rows = []
-    for _, row in gdf.iterrows():
-        geom = row.geometry
-        if isinstance(geom, Point):
-            rows.append(row)
-        elif isinstance(geom, MultiPoint):
-            for pt in geom.geoms:
-                new_row = row.copy()
-                new_row.geometry = pt
-                rows.append(new_row)
-    return gpd.GeoDataFrame(rows, crs=gdf.crs)
-
-# === 2. Histogramm erstellen ===
-
-def lade_gebaeude_mit_risiko(shapefile_path, raster_path):
-    gdf = gpd.read_file(shapefile_path)
-    gdf = explode_multipoints(gdf)
-
-    with rasterio.open(raster_path) as src:
-        if gdf.crs != src.crs:
-            gdf = gdf.to_crs(src.crs)
-
-        coords = [(geom.x, geom.y) for geom in gdf.geometry]
-        risiko_values = [
-            val[0] if val[0] != src.nodata else np.nan
-            for val in src.sample(coords)
-        ]
-
-    gdf["Risiko"] = risiko_values
+# === 1. Histogramm erstellen ===
+
+def lade_gebaeude_mit_risiko(shapefile_path, raster_path, gemeinden_path=gemeinden_path):
+    # MultiPoints aufspalten und Risiko aus dem Raster extrahieren
+    gdf = gebaeude.lade_gebaeude_mit_risiko(shapefile_path, raster_path)
 
     # Risikoklassen definieren
     bins_risiko = [-18.459, -10.999, -6.982, -2.62, 2.546, 10.81]
@@ -63,16 +42,20 @@ def lade_gebaeude_mit_risiko(shapefile_path, raster_path):
     gdf["Risiko_Klasse"] = pd.cut(
         gdf["Risiko"], bins=bins_risiko, labels=labels_risiko, include_lowest=True
     )
-    return gdf
 
-def erstelle_plot(gdf, modus="hoch"):
+    # Gebäude räumlich ihrer Gemeinde (AGS) zuordnen
+    gdf, gemeinde_namen = ergaenze_gemeinden(gdf, gemeinden_path)
+    gdf = gdf[gdf[AGS_SPALTE] != AGS_FEHLT]
+    return gdf, gemeinde_namen
+
+def erstelle_plot(gdf, gemeinde_namen, modus="hoch"):
     """
     Diagramm erstellen.
     modus = "hoch" → Top 20 nach hohem Risiko
     modus = "niedrig" → Top 20 nach niedrigem Risiko
     """
     relevante_klassen = ["sehr gering", "gering", "mittel", "hoch", "sehr hoch"]
-    risiko_counts = gdf.groupby(["LocalityNa", "Risiko_Klasse"]).size().unstack(fill_value=0)
+    risiko_counts = gdf.groupby([AGS_SPALTE, "Risiko_Klasse"], observed=False).size().unstack(fill_value=0)
 
     for rk in relevante_klassen:
         if rk not in risiko_counts.columns:
@@ -93,6 +76,7 @@ def erstelle_plot(gdf, modus="hoch"):
 
     top20 = risiko_counts.sort_values(by="anteil", ascending=False).head(20)
     prozent_df = (top20[relevante_klassen].T / top20["gesamt"]).T * 100
+    prozent_df.index = prozent_df.index.map(gemeinde_namen)
 
     farben = {
         "sehr gering": "darkgreen",
@@ -144,12 +128,12 @@ def erstelle_plot(gdf, modus="hoch"):
     plt.tight_layout()
     plt.show()   
 
-# === 3. Skript ausführen ===
+# === 2. Skript ausführen ===
 if __name__ == "__main__":
-    gdf = lade_gebaeude_mit_risiko(shapefile_path, raster_path)
+    gdf, gemeinde_namen = lade_gebaeude_mit_risiko(shapefile_path, raster_path)
 
     # Diagramm-Variante 1: Top 20 hohes Risiko
-    erstelle_plot(gdf, modus="hoch")
+    erstelle_plot(gdf, gemeinde_namen, modus="hoch")
 
     # Diagramm-Variante 2: Top 20 niedriges Risiko
-    #erstelle_plot(gdf, modus="niedrig")
+    #erstelle_plot(gdf, gemeinde_namen, modus="niedrig")
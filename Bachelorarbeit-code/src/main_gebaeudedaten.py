@@ -8,10 +8,23 @@ import geopandas as gpd
 import glob
 from shapely.geometry import Point, box
 
+from werkzeuge.bewohner import STANDARD_SCHEMATA, schema_statistik, verteile_bewohner
+from werkzeuge.gebaeudetabelle import kompakte_tabelle, raeumlich_sortiert, speichere_kompakt
+from werkzeuge.gemeinden import AGS_SPALTE, gemeinde_codes, lade_gemeinden
+from werkzeuge.gitter import SCHLUESSEL_SPALTE, gitter_schluessel
+
 # === 1. Dateipfade ===
 input_gml_folder = os.path.join("..", "data", "gml")          # Eingügen der GML-Dateien von Zenodo
 output_folder = os.path.join("..", "output")                 # Ergebnisse werden hier gespeichert
 raster_file = os.path.join("..", "data", "csv", "unterfranken_polygon.csv")  # CSV Rasterpunkte
+gemeinden_file = os.path.join("..", "data", "shapefiles", "VG5000_GEM.shp")   # Gemeindegrenzen
+# Grundrisse (vor der Zentroid-Bildung) für die flächenbasierte Exposition (main_grundriss_exposition.py)
+grundrisse_file = os.path.join("..", "outputs", "shapefiles", "buildingsunterfranken_grundrisse.parquet")
+# Kompakte Gebäudetabelle (werkzeuge/gebaeudetabelle.py) mit denselben Spalten wie das Shapefile
+kompakt_file = os.path.join("..", "outputs", "shapefiles", "buildingsunterfranken.parquet")
+
+# Einwohnerverteilung zusätzlich nach allen Schemata aus werkzeuge/bewohner.py auswerten
+schemata_auswerten = True
 
 # Ordner erstellen, falls sie nicht existieren
 os.makedirs(output_folder, exist_ok=True)
@@ -73,10 +86,15 @@ gdf_res["volume"] = gdf_res["area"] * gdf_res["measuredHe"]
 
 # === 6. Reprojektion und Zentroid berechnen ===
 gdf_res = gdf_res.to_crs("EPSG:25832")
+os.makedirs(os.path.dirname(grundrisse_file), exist_ok=True)
+gdf_res[["gml_id", "geometry"]].to_parquet(grundrisse_file, index=False)
 gdf_res["geometry"] = gdf_res.centroid
 
 # === 7. Raster einlesen und auf EPSG:25832 bringen ===
 df_raster = pd.read_csv(raster_file, sep=";")
+# Gitter-ID als int64-Schlüssel, die String-Spalte wird nicht weiter benötigt
+df_raster[SCHLUESSEL_SPALTE] = gitter_schluessel(df_raster["GITTER_ID_100m"])
+df_raster = df_raster.drop(columns="GITTER_ID_100m")
 gdf_raster = gpd.GeoDataFrame(
     df_raster,
     geometry=[Point(x, y) for x, y in zip(df_raster["x_mp_100m"], df_raster["y_mp_100m"])],
@@ -95,24 +113,48 @@ gdf_raster["geometry"] = gdf_raster.geometry.apply(make_box)
 joined = gpd.sjoin(gdf_res, gdf_raster, how="left", predicate="within")
 
 # === 9. Volumensumme pro Rasterzelle berechnen ===
-sum_vol_per_raster = joined.groupby("GITTER_ID_100m")["volume"].sum().rename("sum_volume")
-joined = joined.join(sum_vol_per_raster, on="GITTER_ID_100m")
+sum_vol_per_raster = joined.groupby(SCHLUESSEL_SPALTE)["volume"].sum().rename("sum_volume")
+joined = joined.join(sum_vol_per_raster, on=SCHLUESSEL_SPALTE)
 
 # === 10. Einwohner auf Gebäude verteilen ===
 joined["geb_bewohner"] = (joined["volume"] / joined["sum_volume"]) * joined["Einwohner"]
 
-# === 11. Output speichern ===
+# === 11. Gemeinde (AGS) räumlich zuordnen ===
+gemeinden = lade_gemeinden(gemeinden_file, crs="EPSG:25832")
+joined[AGS_SPALTE] = gemeinde_codes(joined.geometry.x.values, joined.geometry.y.values, gemeinden)
+
+# === 12. Output speichern ===
 output_shapefiles_folder = os.path.join("..", "outputs", "shapefiles")
 os.makedirs(output_shapefiles_folder, exist_ok=True)
 
 output_shp = os.path.join(output_shapefiles_folder, "buildingsunterfranken.shp")
 final = joined[[
     "geometry", "gml_id", "creationDa", "Gemeindesc", "LocalityNa",
-    "Thoroughfa", "function", "volume", "geb_bewohner"
+    "Thoroughfa", "function", "volume", "geb_bewohner", SCHLUESSEL_SPALTE, AGS_SPALTE
 ]].copy()
 final = final.set_crs("EPSG:25832")
+# Entlang einer Hilbert-Kurve sortieren statt in Kachelreihenfolge der GMLs:
+# benachbarte Gebäude liegen dann auch in der Datei (und beim Rasterauslesen) beieinander
+final = raeumlich_sortiert(final)
 final.to_file(output_shp)
 
 
 print(f"Shapefile gespeichert: {output_shp}")
 
+# Spaltennamen wie im Shapefile (auf 10 Zeichen gekürzt), damit beide Quellen austauschbar sind
+speichere_kompakt(kompakte_tabelle(final.rename(columns={"geb_bewohner": "geb_bewohn"})), kompakt_file)
+print(f"Kompakte Tabelle gespeichert: {kompakt_file}")
+
+# === 13. Einwohnerverteilung nach mehreren Schemata ===
+# Nutzt denselben Join; alle Schemata werden in einem Durchlauf berechnet.
+if schemata_auswerten:
+    output_tables_folder = os.path.join("..", "outputs", "tables")
+    os.makedirs(output_tables_folder, exist_ok=True)
+
+    bewohner = verteile_bewohner(joined, SCHLUESSEL_SPALTE, STANDARD_SCHEMATA)
+    schemata = pd.concat([joined[["gml_id", SCHLUESSEL_SPALTE, AGS_SPALTE]], bewohner], axis=1)
+    schemata.to_parquet(os.path.join(output_tables_folder, "gebaeude_bewohner_schemata.parquet"), index=False)
+
+    statistik = schema_statistik(bewohner, referenz="volume")
+    statistik.to_csv(os.path.join(output_tables_folder, "gebaeude_bewohner_schemata.csv"), sep=";", index=False)
+    print(statistik)
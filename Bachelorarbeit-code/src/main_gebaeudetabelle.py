@@ -0,0 +1,57 @@
+# Wandelt das Gebäude-Shapefile in die kompakte Gebäudetabelle um
+# (werkzeuge/gebaeudetabelle.py): x/y als float32-Abstände zum Ursprung,
+# Textspalten als Kategorien, gml_id als Arrow-String, Kommazahlen als float32.
+# Die Zeilen werden entlang einer Hilbert-Kurve sortiert und in Zeilengruppen mit
+# bekannter Ausdehnung geschrieben (werkzeuge/raumordnung.py).
+#
+# Alle Auswertungen, die lade_gebaeude_mit_risiko nutzen, können statt des
+# Shapefiles die .parquet-Datei lesen; Koordinaten und Spaltennamen sind gleich.
+#
+# Ausgabe: outputs/shapefiles/buildingsunterfranken.parquet
+#
+# Aufruf (aus dem src-Ordner):
+#   python main_gebaeudetabelle.py --eingabe ../data/shapefiles/buildings_unterfranken_clipped.shp
+
+import argparse
+import os
+
+import numpy as np
+
+from werkzeuge.gebaeude import lade_gebaeude
+from werkzeuge.gebaeudetabelle import (
+    GEBAEUDE_CRS, kompakte_tabelle, koordinaten, speicherbedarf, speichere_kompakt,
+)
+from werkzeuge.pixelindex import transformiere_punkte
+
+# === 1. Dateipfade ===
+eingabe_datei = os.path.join("..", "data", "shapefiles", "buildings_unterfranken_clipped.shp")
+ausgabe_datei = os.path.join("..", "outputs", "shapefiles", "buildingsunterfranken.parquet")
+
+
+# === 2. Ablauf ===
+
+def main():
+    parser = argparse.ArgumentParser(description="Gebäude-Shapefile in die kompakte Gebäudetabelle umwandeln.")
+    parser.add_argument("--eingabe", default=eingabe_datei)
+    parser.add_argument("--ausgabe", default=ausgabe_datei)
+    args = parser.parse_args()
+
+    gdf = lade_gebaeude(args.eingabe)
+    tabelle = kompakte_tabelle(gdf)
+    os.makedirs(os.path.dirname(os.path.abspath(args.ausgabe)), exist_ok=True)
+    speichere_kompakt(tabelle, args.ausgabe)
+
+    # Kontrolle: Koordinaten der kompakten Tabelle gegen das Shapefile (im CRS der Tabelle)
+    x, y = transformiere_punkte(*koordinaten(gdf), GEBAEUDE_CRS)
+    x_k, y_k, _ = koordinaten(tabelle)
+    print(f"{len(tabelle)} Gebäude, größte Koordinatenabweichung: "
+          f"{max(np.abs(x_k - x).max(initial=0), np.abs(y_k - y).max(initial=0)):.4f} m")
+
+    vorher, nachher = speicherbedarf(gdf), speicherbedarf(tabelle)
+    print(f"Speicher GeoDataFrame: {vorher / 1e6:.1f} MB, kompakte Tabelle: {nachher / 1e6:.1f} MB "
+          f"(Faktor {vorher / nachher:.1f})")
+    print(f"Fertig! Ergebnis gespeichert in: {os.path.abspath(args.ausgabe)}")
+
+
+if __name__ == "__main__":
+    main()
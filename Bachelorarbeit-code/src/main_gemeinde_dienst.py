@@ -0,0 +1,119 @@
+# Lokaler HTTP/JSON-Dienst für die Kennzahlen je Gemeinde.
+#
+# Lädt outputs/tables/gemeinde_statistik.parquet (erstellt mit
+# weitere_scripts/Gemeinde_Statistik.py) einmal in den Speicher und beantwortet
+# Anfragen nach AGS oder Name, ohne ein Skript über das ganze Shapefile neu zu starten.
+# Läuft nur auf localhost und benötigt nur die Standardbibliothek (plus pandas zum Laden).
+#
+# Endpunkte:
+#   GET /gemeinden                                  alle AGS mit Namen
+#   GET /gemeinde/<AGS>                             alle Kennzahlen einer Gemeinde
+#   GET /gemeinde/<AGS>/anteile?gewicht=einwohner   Anteile je Klasse (flaeche|gebaeude|einwohner|ueber65)
+#   GET /suche?name=Würzburg                        Gemeinden nach Name (ohne Groß-/Kleinschreibung)
+#   GET /rangliste?gewicht=gebaeude&klassen=hoch,sehr_hoch&n=20
+#
+# Aufruf (aus dem src-Ordner):
+#   python main_gemeinde_dienst.py --port 8765
+#   curl "http://127.0.0.1:8765/suche?name=Schweinfurt"
+
+import argparse
+import os
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from werkzeuge.gemeindeabfrage import GemeindeAbfrage, KLASSEN, kodiere
+
+# === 1. Einstellungen ===
+statistik_datei = os.path.join("..", "outputs", "tables", "gemeinde_statistik.parquet")
+host = "127.0.0.1"
+port = 8765
+
+
+# === 2. Anfragen beantworten ===
+
+def beantworte(abfrage, pfad):
+    """Status und JSON-Bytes für einen Anfragepfad (mit Query-String)."""
+    url = urlsplit(pfad)
+    teile = [t for t in url.path.split("/") if t]
+    parameter = {k: v[-1] for k, v in parse_qs(url.query).items()}
+
+    try:
+        if teile == ["gemeinden"]:
+            return 200, abfrage.uebersicht()
+
+        if len(teile) in (2, 3) and teile[0] == "gemeinde":
+            if not teile[1].isdigit():
+                return 400, kodiere({"fehler": "AGS muss eine Zahl sein"})
+            if len(teile) == 2:
+                antwort = abfrage.gemeinde(teile[1])
+            elif teile[2] == "anteile":
+                antwort = abfrage.anteile(int(teile[1]), parameter.get("gewicht", "einwohner"))
+            else:
+                return 404, kodiere({"fehler": f"Unbekannter Pfad: {url.path}"})
+            if antwort is None:
+                return 404, kodiere({"fehler": f"AGS {teile[1]} nicht gefunden"})
+            return 200, antwort
+
+        if teile == ["suche"]:
+            name = parameter.get("name", "").strip()
+            if not name:
+                return 400, kodiere({"fehler": "Parameter 'name' fehlt oder ist leer"})
+            return 200, abfrage.suche(name)
+
+        if teile == ["rangliste"]:
+            n = parameter.get("n", "20")
+            if not n.isdigit() or int(n) <= 0:
+                return 400, kodiere({"fehler": "Parameter 'n' muss eine positive ganze Zahl sein"})
+            klassen = tuple(parameter.get("klassen", "hoch,sehr_hoch").split(","))
+            return 200, abfrage.rangliste(parameter.get("gewicht", "einwohner"), klassen, int(n))
+    except ValueError as e:
+        return 400, kodiere({"fehler": str(e), "klassen": KLASSEN})
+
+    return 404, kodiere({"fehler": f"Unbekannter Pfad: {url.path}"})
+
+
+def erstelle_handler(abfrage, protokoll=False):
+    class Handler(BaseHTTPRequestHandler):
+        # Keep-Alive: mehrere Anfragen über eine Verbindung, Antworten ohne Nagle-Verzögerung
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def do_GET(self):
+            status, antwort = beantworte(abfrage, self.path)
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(antwort)))
+            self.end_headers()
+            self.wfile.write(antwort)
+
+        def log_message(self, format, *args):
+            if protokoll:
+                super().log_message(format, *args)
+
+    return Handler
+
+
+# === 3. Ablauf ===
+
+def main():
+    parser = argparse.ArgumentParser(description="Lokaler JSON-Dienst für die Kennzahlen je Gemeinde.")
+    parser.add_argument("--tabelle", default=statistik_datei)
+    parser.add_argument("--host", default=host)
+    parser.add_argument("--port", type=int, default=port)
+    parser.add_argument("--cache", type=int, default=1024, help="Größe des LRU-Caches je Sicht")
+    parser.add_argument("--protokoll", action="store_true", help="Anfragen auf der Konsole ausgeben")
+    args = parser.parse_args()
+
+    abfrage = GemeindeAbfrage(args.tabelle, args.cache)
+    server = ThreadingHTTPServer((args.host, args.port), erstelle_handler(abfrage, args.protokoll))
+    print(f"{len(abfrage.datensaetze)} Gemeinden geladen. Dienst läuft auf http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+# Einwohner, Ü65, Gebäude und Anzahlen je Risikoklasse auf den Gitterstufen
+# 100 m, 1 km und 10 km (EPSG:3035).
+#
+# Die Werte werden einmal je 100-m-Zelle (Gitter-Schlüssel) gesammelt und dann
+# über die ganzzahlige Division des Schlüssels auf 1 km und 10 km summiert
+# (werkzeuge/gitterstufen.py), ohne räumliche Operationen. Karten und Dashboards
+# laden zuerst die groben Stufen und lesen die 100-m-Stufe nur für den benötigten
+# Ausschnitt (lade_stufe(..., innerhalb=("10km", schluessel))).
+#
+# Risikoklasse einer Zelle = Klasse des mittleren Rasterwerts der Zelle aus
+# main_zellrisiko.py (ohne diese Tabelle: Klasse des Rasterwerts am Zellmittelpunkt),
+# Risikoklasse eines Gebäudes = Klasse des Rasterwerts am Gebäudepunkt.
+#
+# Ausgabe (outputs/gitter): gitter_100m.parquet, gitter_1km.parquet, gitter_10km.parquet
+#
+# Aufruf (aus dem src-Ordner):
+#   python main_gitterstufen.py
+
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from werkzeuge.gebaeude import lade_gebaeude_mit_risiko
+from werkzeuge.gebaeudetabelle import koordinaten
+from werkzeuge.gitter import SCHLUESSEL_SPALTE, gitter_schluessel, schluessel_aus_koordinaten, zellmittelpunkte
+from werkzeuge.gitterstufen import alle_stufen, schreibe_stufen, verbinde, zell_summen
+from werkzeuge.pixelindex import transformiere_punkte
+from werkzeuge.raster_speicher import oeffne_raster
+from werkzeuge.risiko import labels_risiko, risiko_codes
+from werkzeuge.tabellen import lade_tabelle
+from werkzeuge.zellrisiko import lade_zellrisiko, zellwerte
+
+# === 1. Dateipfade ===
+zensus_datei = os.path.join("..", "data", "csv", "unterfranken_polygon.csv")
+ueber65_datei = os.path.join("..", "outputs", "tables", "unterfranken_ueber65_absolut.parquet")
+gebaeude_datei = os.path.join("..", "data", "shapefiles", "buildings_unterfranken_clipped.shp")
+raster_datei = os.path.join("..", "data", "raster", "HSM_WoE_C.tif")
+zellrisiko_datei = os.path.join("..", "outputs", "gitter", "zellrisiko_100m.parquet")
+output_folder = os.path.join("..", "outputs", "gitter")
+
+x_spalte = "x_mp_100m"
+y_spalte = "y_mp_100m"
+
+# Spaltennamen ohne Leerzeichen, z. B. "sehr hoch" -> "sehr_hoch"
+klassen = [label.replace(" ", "_") for label in labels_risiko]
+
+
+# === 2. Werte je Klasse ===
+
+def klassen_werte(praefix, codes, gewichte):
+    """Dict <praefix> und <praefix>_<Klasse> -> Gewicht je Eintrag (0 außerhalb der Klasse)."""
+    werte = {praefix: gewichte}
+    for i, klasse in enumerate(klassen):
+        werte[f"{praefix}_{klasse}"] = np.where(codes == i, gewichte, 0.0)
+    return werte
+
+
+def zellen_klassen(raster, schluessel, zellrisiko=None):
+    """Risikoklasse jeder 100-m-Zelle: aus dem Zellmittel (zellrisiko) oder am Mittelpunkt."""
+    if zellrisiko is not None:
+        return risiko_codes(zellwerte(zellrisiko, schluessel))
+    x, y = zellmittelpunkte(schluessel)
+    return risiko_codes(raster.werte(*transformiere_punkte(x, y, "EPSG:3035", raster.crs)))
+
+
+# === 3. Ablauf ===
+
+def main():
+    parser = argparse.ArgumentParser(description="Zellwerte auf 100 m, 1 km und 10 km zusammenfassen.")
+    parser.add_argument("--zensus", default=zensus_datei)
+    parser.add_argument("--ueber65", default=ueber65_datei, help="Tabelle mit Ueber65_Absolut (optional)")
+    parser.add_argument("--gebaeude", default=gebaeude_datei)
+    parser.add_argument("--raster", default=raster_datei)
+    parser.add_argument("--zellrisiko", default=zellrisiko_datei,
+                        help="Zelltabelle aus main_zellrisiko.py (optional)")
+    parser.add_argument("--ausgabe", default=output_folder)
+    args = parser.parse_args()
+    raster = oeffne_raster(args.raster)
+    zellrisiko = lade_zellrisiko(args.zellrisiko, args.raster)
+    tabellen = []
+
+    # 1. Einwohner je Zelle
+    zensus = pd.read_csv(args.zensus, sep=";", usecols=[x_spalte, y_spalte, "Einwohner"])
+    schluessel = schluessel_aus_koordinaten(zensus[x_spalte].to_numpy(), zensus[y_spalte].to_numpy())
+    einwohner = pd.to_numeric(zensus["Einwohner"], errors="coerce").fillna(0).clip(lower=0).to_numpy()
+    codes = zellen_klassen(raster, schluessel, zellrisiko)
+    tabellen.append(zell_summen(schluessel, klassen_werte("einwohner", codes, einwohner)))
+
+    # 2. Über 65-Jährige je Zelle
+    if args.ueber65 and os.path.exists(args.ueber65):
+        df = lade_tabelle(args.ueber65)
+        if SCHLUESSEL_SPALTE not in df.columns:
+            df[SCHLUESSEL_SPALTE] = gitter_schluessel(df["GITTER_ID_100m"])
+        schluessel = df[SCHLUESSEL_SPALTE].to_numpy()
+        ueber65 = pd.to_numeric(df["Ueber65_Absolut"], errors="coerce").fillna(0).clip(lower=0).to_numpy()
+        codes = zellen_klassen(raster, schluessel, zellrisiko)
+        tabellen.append(zell_summen(schluessel, klassen_werte("ueber65", codes, ueber65)))
+    else:
+        print(f"Keine Ü65-Tabelle gefunden ({args.ueber65}), Ü65-Spalten entfallen.")
+
+    # 3. Gebäude je Zelle
+    gdf = lade_gebaeude_mit_risiko(args.gebaeude, args.raster)
+    x, y = transformiere_punkte(*koordinaten(gdf), "EPSG:3035")
+    codes = risiko_codes(gdf["Risiko"].values)
+    tabellen.append(zell_summen(schluessel_aus_koordinaten(x, y), klassen_werte("gebaeude", codes, np.ones(len(gdf)))))
+
+    # 4. Stufen berechnen und speichern
+    stufen = alle_stufen(verbinde(*tabellen))
+    schreibe_stufen(stufen, args.ausgabe)
+    for name, tabelle in stufen.items():
+        print(f"{name}: {len(tabelle)} Zellen, {tabelle['einwohner'].sum():.0f} Einwohner, "
+              f"{tabelle['gebaeude'].sum():.0f} Gebäude")
+
+    print(f"Fertig! Ergebnisse gespeichert in: {os.path.abspath(args.ausgabe)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+# Hochwasserexposition je Gebäude aus dem ganzen Grundriss statt aus dem Zentroid.
+#
+# Liest die Grundrisse, die main_gebaeudedaten.py vor der Zentroid-Bildung speichert,
+# und berechnet je Gebäude den maximalen und den flächengewichteten mittleren
+# WoE-Wert sowie den Flächenanteil je Risikoklasse (werkzeuge/grundriss.py). Alle
+# Grundrisse werden stapelweise gegen die Rasterpixel verschnitten, ohne Schleife
+# über die Polygone.
+#
+# Die Auswertungen nutzen das Ergebnis über
+#   lade_gebaeude_mit_risiko(..., exposition=<Ausgabe>, modus="max" | "mittel")
+#
+# Ausgabe: outputs/shapefiles/buildingsunterfranken_exposition.parquet
+#          (gml_id, Risiko_max, Risiko_mittel, anteil_<Klasse>, flaeche_gueltig)
+#
+# Aufruf (aus dem src-Ordner):
+#   python main_grundriss_exposition.py
+
+import argparse
+import os
+import time
+
+import geopandas as gpd
+
+from werkzeuge.grundriss import SPALTE_FLAECHE, anteil_spalten, grundriss_exposition
+from werkzeuge.raster_speicher import oeffne_raster
+from werkzeuge.risiko import labels_risiko
+
+# === 1. Dateipfade ===
+grundrisse_datei = os.path.join("..", "outputs", "shapefiles", "buildingsunterfranken_grundrisse.parquet")
+raster_datei = os.path.join("..", "data", "raster", "HSM_WoE_C.tif")
+ausgabe_datei = os.path.join("..", "outputs", "shapefiles", "buildingsunterfranken_exposition.parquet")
+
+
+# === 2. Ablauf ===
+
+def main():
+    parser = argparse.ArgumentParser(description="Exposition je Gebäudegrundriss berechnen.")
+    parser.add_argument("--grundrisse", default=grundrisse_datei)
+    parser.add_argument("--raster", default=raster_datei)
+    parser.add_argument("--ausgabe", default=ausgabe_datei)
+    parser.add_argument("--batch", type=int, default=50_000, help="Gebäude je Stapel")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    raster = oeffne_raster(args.raster)
+    gdf = gpd.read_parquet(args.grundrisse).to_crs(raster.crs)
+    print(f"{len(gdf)} Grundrisse geladen")
+
+    exposition = grundriss_exposition(gdf.geometry.values, raster, batch_size=args.batch)
+    exposition.insert(0, "gml_id", gdf["gml_id"].to_numpy())
+    os.makedirs(os.path.dirname(os.path.abspath(args.ausgabe)), exist_ok=True)
+    exposition.to_parquet(args.ausgabe, index=False)
+
+    # Grundfläche je Risikoklasse (Summe über alle Gebäude)
+    flaechen = exposition[anteil_spalten(labels_risiko)].mul(exposition[SPALTE_FLAECHE], axis=0).sum()
+    flaechen.index = labels_risiko
+    print((flaechen / flaechen.sum() * 100).round(1).rename("Anteil der Grundfläche (%)"))
+    print(f"Fertig in {time.perf_counter() - start:.1f} s! Ergebnis gespeichert in: {os.path.abspath(args.ausgabe)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+# Lokaler Kartendienst für die Kachelpyramide aus main_kacheln.py.
+#
+# Liefert die Kartenansicht (viewer/kacheln.html), die Metadaten und die Kacheln
+# direkt aus der MBTiles-Datei. Die Kacheln liegen bereits gzip-komprimiert vor und
+# werden unverändert mit Content-Encoding: gzip gesendet; der Browser entpackt sie.
+# Läuft nur auf localhost und benötigt nur die Standardbibliothek.
+#
+# Endpunkte:
+#   GET /                     Kartenansicht
+#   GET /metadata             Metadaten (Zoomstufen, Ausdehnung, Klassen, Gemeinde-Kennzahlen)
+#   GET /kacheln/<z>/<x>/<y>  Kachel (204, wenn die Kachel leer ist)
+#
+# Aufruf (aus dem src-Ordner):
+#   python main_kachel_dienst.py --port 8766
+#   Browser: http://127.0.0.1:8766/
+
+import argparse
+import json
+import os
+import sqlite3
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+from werkzeuge.kacheln import lies_kachel, lies_metadaten
+
+# === 1. Einstellungen ===
+kachel_datei = os.path.join("..", "outputs", "kacheln", "unterfranken.mbtiles")
+viewer_datei = os.path.join(os.path.dirname(os.path.abspath(__file__)), "viewer", "kacheln.html")
+host = "127.0.0.1"
+port = 8766
+
+
+# === 2. Kachelquelle ===
+
+class KachelQuelle:
+    """Lesezugriff auf die MBTiles-Datei mit einer SQLite-Verbindung je Thread."""
+
+    def __init__(self, pfad):
+        self.uri = f"file:{os.path.abspath(pfad)}?mode=ro"
+        self.lokal = threading.local()
+        metadaten = {}
+        for name, wert in lies_metadaten(self._verbindung()).items():
+            try:
+                metadaten[name] = json.loads(wert)
+            except ValueError:
+                metadaten[name] = wert
+        self.metadaten_antwort = json.dumps(metadaten, ensure_ascii=False).encode("utf-8")
+
+    def _verbindung(self):
+        if not hasattr(self.lokal, "verbindung"):
+            self.lokal.verbindung = sqlite3.connect(self.uri, uri=True, check_same_thread=False)
+        return self.lokal.verbindung
+
+    def kachel(self, z, x, y):
+        return lies_kachel(self._verbindung(), z, x, y)
+
+
+# === 3. Anfragen beantworten ===
+
+def erstelle_handler(quelle, viewer, protokoll=False):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def sende(self, status, daten=b"", typ="application/json; charset=utf-8", gzip=False):
+            self.send_response(status)
+            self.send_header("Content-Type", typ)
+            self.send_header("Content-Length", str(len(daten)))
+            if gzip:
+                self.send_header("Content-Encoding", "gzip")
+                self.send_header("Cache-Control", "max-age=3600")
+            self.end_headers()
+            self.wfile.write(daten)
+
+        def do_GET(self):
+            teile = [t for t in urlsplit(self.path).path.split("/") if t]
+            if not teile:
+                self.sende(200, viewer, "text/html; charset=utf-8")
+            elif teile == ["metadata"]:
+                self.sende(200, quelle.metadaten_antwort)
+            elif len(teile) == 4 and teile[0] == "kacheln" and all(t.isdigit() for t in teile[1:]):
+                daten = quelle.kachel(*map(int, teile[1:]))
+                if daten is None:
+                    self.sende(204)
+                else:
+                    self.sende(200, daten, gzip=True)
+            else:
+                self.sende(404, json.dumps({"fehler": f"Unbekannter Pfad: {self.path}"}).encode("utf-8"))
+
+        def log_message(self, format, *args):
+            if protokoll:
+                super().log_message(format, *args)
+
+    return Handler
+
+
+# === 4. Ablauf ===
+
+def main():
+    parser = argparse.ArgumentParser(description="Lokaler Kartendienst für die Kachelpyramide.")
+    parser.add_argument("--kacheln", default=kachel_datei)
+    parser.add_argument("--host", default=host)
+    parser.add_argument("--port", type=int, default=port)
+    parser.add_argument("--protokoll", action="store_true", help="Anfragen auf der Konsole ausgeben")
+    args = parser.parse_args()
+
+    quelle = KachelQuelle(args.kacheln)
+    with open(viewer_datei, "rb") as f:
+        viewer = f.read()
+    server = ThreadingHTTPServer((args.host, args.port), erstelle_handler(quelle, viewer, args.protokoll))
+    print(f"Kartenansicht: http://{args.host}:{args.port}/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
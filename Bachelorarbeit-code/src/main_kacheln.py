@@ -0,0 +1,269 @@
+# Erstellt eine Kachelpyramide (eine MBTiles-Datei) für die interaktive Durchsicht der
+# Ergebnisse im Browser (main_kachel_dienst.py), statt die großen Shapefiles im
+# Desktop-GIS zu öffnen.
+#
+# Ebenen (werkzeuge/kacheln.py):
+# - Gebäude mit Risikoklasse, unterhalb der höchsten Zoomstufe je Pixel ausgedünnt
+# - Zensus-Gitterzellen aus main_gitterstufen.py (10 km / 1 km / 100 m je nach Zoom)
+# - Gemeinden, je Zoomstufe vereinfacht; Anteile je Risikoklasse aus
+#   weitere_scripts/Gemeinde_Statistik.py stehen in den Metadaten
+#
+# Die Kacheln werden blockweise in einem Prozesspool erzeugt; nur der Hauptprozess
+# schreibt in die SQLite-Datei.
+#
+# Aufruf (aus dem src-Ordner):
+#   python main_kacheln.py --zoom 7 14 --prozesse 4
+#   python main_kachel_dienst.py
+
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+import shapely
+
+from werkzeuge.gebaeude import lade_gebaeude_mit_risiko
+from werkzeuge.gebaeudetabelle import koordinaten
+from werkzeuge.gemeinden import AGS_SPALTE, gemeinde_namen, lade_gemeinden
+from werkzeuge.gitter import SCHLUESSEL_SPALTE, zell_indizes
+from werkzeuge.gitterstufen import STUFEN, lade_stufe
+from werkzeuge.kacheln import (
+    KACHEL_PIXEL, gitter_stufe, grad_aus_mercator, gruppiere_nach_kachel, kachel_grenzen,
+    kachel_groesse, kachel_indizes, kodiere_kachel, neue_mbtiles, polygon_ebene, punkte_ebene,
+    rechteck_kacheln, schliesse_mbtiles, schreibe_kacheln, zellen_ebene,
+)
+from werkzeuge.pixelindex import transformiere_punkte
+from werkzeuge.risiko import farben, labels_risiko, risiko_codes
+
+# === 1. Dateipfade ===
+gebaeude_datei = os.path.join("..", "data", "shapefiles", "buildings_unterfranken_clipped.shp")
+raster_datei = os.path.join("..", "data", "raster", "HSM_WoE_C.tif")
+gemeinden_datei = os.path.join("..", "data", "shapefiles", "VG5000_GEM.shp")
+statistik_datei = os.path.join("..", "outputs", "tables", "gemeinde_statistik.parquet")
+gitter_ordner = os.path.join("..", "outputs", "gitter")
+output_datei = os.path.join("..", "outputs", "kacheln", "unterfranken.mbtiles")
+
+MERCATOR = "EPSG:3857"
+# Kacheln je Auftrag an den Prozesspool
+BLOCK = 32
+
+# Spaltennamen ohne Leerzeichen, z. B. "sehr hoch" -> "sehr_hoch"
+klassen = [label.replace(" ", "_") for label in labels_risiko]
+
+
+# === 2. Quelldaten vorbereiten (Hauptprozess) ===
+
+def gitter_zellen(ordner, stufe):
+    """Eckpunkte (EPSG:3857) und Kennzahlen der bewohnten oder bebauten Zellen einer Gitterstufe."""
+    tabelle = lade_stufe(ordner, stufe)
+    tabelle = tabelle[(tabelle["einwohner"] > 0) | (tabelle["gebaeude"] > 0)]
+    groesse = STUFEN[stufe]
+    nord, ost = zell_indizes(tabelle[SCHLUESSEL_SPALTE].to_numpy())
+    ecken_x = (ost[:, None] + np.array([0, 1, 1, 0])) * groesse
+    ecken_y = (nord[:, None] + np.array([0, 0, 1, 1])) * groesse
+    ecken_x, ecken_y = transformiere_punkte(ecken_x.ravel(), ecken_y.ravel(), "EPSG:3035", MERCATOR)
+
+    einwohner_klassen = tabelle[[f"einwohner_{k}" for k in klassen]].to_numpy()
+    einwohner = tabelle["einwohner"].to_numpy()
+    with np.errstate(invalid="ignore", divide="ignore"):
+        hoch = einwohner_klassen[:, -2:].sum(axis=1) / einwohner * 100
+    return {
+        "ecken_x": ecken_x.reshape(-1, 4),
+        "ecken_y": ecken_y.reshape(-1, 4),
+        "werte": {
+            "e": np.round(einwohner).astype("int64"),
+            "g": tabelle["gebaeude"].to_numpy().astype("int64"),
+            # Klasse mit den meisten Einwohnern (-1: unbewohnt)
+            "k": np.where(einwohner_klassen.sum(axis=1) > 0, einwohner_klassen.argmax(axis=1), -1),
+            # Anteil Einwohner in "hoch" und "sehr hoch" (%)
+            "h": np.nan_to_num(np.round(hoch), nan=-1).astype("int64"),
+        },
+    }
+
+
+def gemeinde_metadaten(gemeinden, statistik_pfad):
+    """AGS -> Name und Anteile (%) je Risikoklasse für Fläche, Gebäude, Einwohner und Ü65."""
+    namen = gemeinde_namen(gemeinden)
+    if not os.path.exists(statistik_pfad):
+        return {int(ags): {"name": name} for ags, name in namen.items()}
+
+    statistik = pd.read_parquet(statistik_pfad).set_index(AGS_SPALTE)
+    metadaten = {}
+    for ags, zeile in statistik.iterrows():
+        eintrag = {"name": namen.get(ags, zeile["GEN"]),
+                   "flaeche": [round(float(zeile[f"flaeche_{k}_pct"]), 1) for k in klassen]}
+        for gewicht in ("gebaeude", "einwohner", "ueber65"):
+            gesamt = zeile[f"{gewicht}_gesamt"]
+            eintrag[gewicht] = [round(float(zeile[f"{gewicht}_{k}"] / gesamt * 100), 1) if gesamt else None
+                                for k in klassen]
+        eintrag["gebaeude_gesamt"] = int(zeile["gebaeude_gesamt"])
+        eintrag["einwohner_gesamt"] = round(float(zeile["einwohner_gesamt"]))
+        metadaten[int(ags)] = eintrag
+    return metadaten
+
+
+# === 3. Kacheln erzeugen (Worker) ===
+
+_quelle = {}
+_gemeinden_je_zoom = {}
+
+
+def starte_worker(quelle):
+    _quelle.update(quelle)
+
+
+def _gemeinden(z):
+    """Je Zoomstufe (halbes Bildpixel) vereinfachte Gemeindepolygone und ihr STRtree."""
+    if z not in _gemeinden_je_zoom:
+        toleranz = kachel_groesse(z) / KACHEL_PIXEL / 2
+        geometrien = shapely.simplify(_quelle["gemeinden_geometrie"], toleranz, preserve_topology=True)
+        _gemeinden_je_zoom[z] = (geometrien, shapely.STRtree(geometrien))
+    return _gemeinden_je_zoom[z]
+
+
+def erstelle_kacheln(z, auftrag):
+    """Kacheln eines Auftrags [(tx, ty, Gebäude-Indizes, Zell-Indizes), ...] -> [(z, tx, ty, Daten)]."""
+    geometrien, baum = _gemeinden(z)
+    zellen = _quelle["gitter"].get(gitter_stufe(z))
+    ergebnis = []
+    for tx, ty, gebaeude_idx, zellen_idx in auftrag:
+        ebenen = {}
+        if len(gebaeude_idx):
+            ebenen["gebaeude"] = punkte_ebene(
+                _quelle["gebaeude_x"][gebaeude_idx], _quelle["gebaeude_y"][gebaeude_idx],
+                _quelle["gebaeude_k"][gebaeude_idx], z, tx, ty, ausduennen=z < _quelle["max_zoom"],
+            )
+        if zellen is not None and len(zellen_idx):
+            ebenen["gitter"] = zellen_ebene(
+                zellen["ecken_x"][zellen_idx], zellen["ecken_y"][zellen_idx],
+                {name: werte[zellen_idx] for name, werte in zellen["werte"].items()}, z, tx, ty,
+            )
+        treffer = baum.query(shapely.box(*kachel_grenzen(z, tx, ty)), predicate="intersects")
+        if len(treffer):
+            treffer = np.sort(treffer)
+            ebenen["gemeinden"] = polygon_ebene(geometrien[treffer], _quelle["gemeinden_ags"][treffer], z, tx, ty)
+        daten = kodiere_kachel(ebenen)
+        if daten is not None:
+            ergebnis.append((z, tx, ty, daten))
+    return ergebnis
+
+
+# === 4. Aufträge je Zoomstufe ===
+
+def auftraege(quelle, z):
+    """Alle Kacheln der Zoomstufe mit den Indizes ihrer Gebäude und Zellen, in Blöcken."""
+    leer = np.array([], dtype="int64")
+    kacheln = {}
+
+    tx, ty = kachel_indizes(quelle["gebaeude_x"], quelle["gebaeude_y"], z)
+    for x, y, idx in gruppiere_nach_kachel(tx, ty):
+        kacheln[(x, y)] = [idx, leer]
+
+    zellen = quelle["gitter"].get(gitter_stufe(z))
+    if zellen is not None:
+        idx, tx, ty = rechteck_kacheln(zellen["ecken_x"].min(axis=1), zellen["ecken_y"].min(axis=1),
+                                       zellen["ecken_x"].max(axis=1), zellen["ecken_y"].max(axis=1), z)
+        for x, y, auswahl in gruppiere_nach_kachel(tx, ty):
+            kacheln.setdefault((x, y), [leer, leer])[1] = idx[auswahl]
+
+    grenzen = shapely.bounds(quelle["gemeinden_geometrie"])
+    _, tx, ty = rechteck_kacheln(*grenzen.T, z)
+    for x, y in set(zip(tx.tolist(), ty.tolist())):
+        kacheln.setdefault((x, y), [leer, leer])
+
+    liste = [(x, y, geb, zel) for (x, y), (geb, zel) in sorted(kacheln.items())]
+    return [liste[i:i + BLOCK] for i in range(0, len(liste), BLOCK)]
+
+
+
+# === 5. Ablauf ===
+
+def main():
+    parser = argparse.ArgumentParser(description="Kachelpyramide (MBTiles) für die Kartenansicht erstellen.")
+    parser.add_argument("--zoom", nargs=2, type=int, default=[7, 14], metavar=("MIN", "MAX"))
+    parser.add_argument("--gebaeude", default=gebaeude_datei)
+    parser.add_argument("--raster", default=raster_datei)
+    parser.add_argument("--gemeinden", default=gemeinden_datei)
+    parser.add_argument("--statistik", default=statistik_datei, help="gemeinde_statistik.parquet (optional)")
+    parser.add_argument("--gitter", default=gitter_ordner, help="Ausgabeordner von main_gitterstufen.py (optional)")
+    parser.add_argument("--ausgabe", default=output_datei)
+    parser.add_argument("--prozesse", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+    min_zoom, max_zoom = args.zoom
+    start = time.perf_counter()
+
+    # 1. Gebäude (nur mit gültiger Risikoklasse)
+    gdf = lade_gebaeude_mit_risiko(args.gebaeude, args.raster)
+    codes = risiko_codes(gdf["Risiko"].values)
+    gueltig = (codes >= 0) & (codes < len(labels_risiko))
+    x, y, crs = koordinaten(gdf)
+    x, y = transformiere_punkte(x[gueltig], y[gueltig], crs, MERCATOR)
+
+    # 2. Gitterzellen je Stufe
+    gitter = {}
+    for stufe in sorted({gitter_stufe(z) for z in range(min_zoom, max_zoom + 1)}):
+        if os.path.exists(os.path.join(args.gitter, f"gitter_{stufe}.parquet")):
+            gitter[stufe] = gitter_zellen(args.gitter, stufe)
+        else:
+            print(f"Gitterstufe {stufe} nicht gefunden (main_gitterstufen.py ausführen), Ebene entfällt.")
+
+    # 3. Gemeinden: ausgewertete Gemeinden bzw. alle im Gebiet der Gebäude
+    gemeinden = lade_gemeinden(args.gemeinden, crs=MERCATOR)
+    metadaten_gemeinden = gemeinde_metadaten(gemeinden, args.statistik)
+    if os.path.exists(args.statistik):
+        gemeinden = gemeinden[gemeinden[AGS_SPALTE].isin(list(metadaten_gemeinden))]
+    else:
+        gemeinden = gemeinden[gemeinden.intersects(shapely.box(x.min(), y.min(), x.max(), y.max()))]
+        metadaten_gemeinden = {ags: metadaten_gemeinden[ags] for ags in gemeinden[AGS_SPALTE].tolist()}
+
+    quelle = {
+        "gebaeude_x": x,
+        "gebaeude_y": y,
+        "gebaeude_k": codes[gueltig],
+        "gitter": gitter,
+        "gemeinden_geometrie": np.asarray(gemeinden.geometry.values),
+        "gemeinden_ags": gemeinden[AGS_SPALTE].to_numpy(),
+        "max_zoom": max_zoom,
+    }
+
+    # 4. Kacheln parallel erzeugen, im Hauptprozess speichern
+    os.makedirs(os.path.dirname(os.path.abspath(args.ausgabe)), exist_ok=True)
+    tmp = args.ausgabe + ".tmp"
+    verbindung = neue_mbtiles(tmp)
+    anzahl = 0
+    with ProcessPoolExecutor(max_workers=max(1, args.prozesse), initializer=starte_worker,
+                             initargs=(quelle,)) as pool:
+        laufend = [pool.submit(erstelle_kacheln, z, block)
+                   for z in range(min_zoom, max_zoom + 1) for block in auftraege(quelle, z)]
+        for auftrag in as_completed(laufend):
+            kacheln = auftrag.result()
+            schreibe_kacheln(verbindung, kacheln)
+            anzahl += len(kacheln)
+
+    # 5. Metadaten
+    xmin, ymin, xmax, ymax = shapely.total_bounds(quelle["gemeinden_geometrie"])
+    west, sued = grad_aus_mercator(xmin, ymin)
+    ost, nord = grad_aus_mercator(xmax, ymax)
+    schliesse_mbtiles(verbindung, {
+        "name": "Hochwasserrisiko Unterfranken",
+        "format": "json",
+        "compression": "gzip",
+        "type": "overlay",
+        "minzoom": str(min_zoom),
+        "maxzoom": str(max_zoom),
+        "bounds": f"{west:.6f},{sued:.6f},{ost:.6f},{nord:.6f}",
+        "center": f"{(west + ost) / 2:.6f},{(sued + nord) / 2:.6f},{min_zoom + 2}",
+        "klassen": labels_risiko,
+        "farben": [farben[k] for k in labels_risiko],
+        "gemeinden": metadaten_gemeinden,
+    })
+    os.replace(tmp, args.ausgabe)
+
+    print(f"{anzahl} Kacheln in {time.perf_counter() - start:.1f} s erstellt.")
+    print(f"Fertig! Kacheln gespeichert in: {os.path.abspath(args.ausgabe)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+# Gebäude, Einwohner und Ü65 je Risikoklasse innerhalb beliebiger Polygone
+# (z. B. geplante Rückhalteflächen oder Puffer um Gewässerabschnitte).
+#
+# Der Index aus Gebäudepunkten und Zensuszellen (werkzeuge/polygonabfrage.py)
+# wird einmal aufgebaut. Danach können beliebig viele Polygone abgefragt werden:
+# einzeln über --polygon oder zeilenweise über die Standardeingabe (--stdin), wobei
+# der Index zwischen den Abfragen im Speicher bleibt. Ausgabe ist je Polygon eine
+# JSON-Zeile mit den Klassensummen und Anteilen wie in den Histogrammen.
+#
+# Aufruf (aus dem src-Ordner):
+#   python main_polygon_abfrage.py --polygon "POLYGON ((566000 5515000, 570000 5515000, ...))"
+#   python main_polygon_abfrage.py --polygon rueckhalteflaeche.geojson --crs EPSG:4326
+#   python main_polygon_abfrage.py --stdin < polygone.wkt
+
+import argparse
+import json
+import os
+import sys
+import time
+
+from werkzeuge.polygonabfrage import PolygonAbfrage
+
+# === 1. Dateipfade ===
+gebaeude_datei = os.path.join("..", "data", "shapefiles", "buildings_unterfranken_clipped.shp")
+zensus_datei = os.path.join("..", "outputs", "tables", "unterfranken_ueber65_absolut.parquet")
+raster_datei = os.path.join("..", "data", "raster", "HSM_WoE_C.tif")
+
+
+# === 2. Ablauf ===
+
+def main():
+    parser = argparse.ArgumentParser(description="Exposition je Risikoklasse innerhalb von Polygonen.")
+    parser.add_argument("--polygon", nargs="*", default=[],
+                        help="WKT oder GeoJSON (Text oder Dateipfad), mehrere möglich")
+    parser.add_argument("--stdin", action="store_true", help="Ein Polygon (WKT/GeoJSON) je Zeile lesen")
+    parser.add_argument("--crs", default=None, help="CRS der Polygone (Standard: CRS der Gebäude)")
+    parser.add_argument("--gebaeude", default=gebaeude_datei)
+    parser.add_argument("--zensus", default=zensus_datei)
+    parser.add_argument("--raster", default=raster_datei)
+    args = parser.parse_args()
+    if not args.polygon and not args.stdin:
+        parser.error("--polygon oder --stdin angeben")
+
+    start = time.perf_counter()
+    abfrage = PolygonAbfrage(args.gebaeude, args.zensus, args.raster)
+    print(f"Index aufgebaut in {time.perf_counter() - start:.1f} s", file=sys.stderr)
+
+    polygone = args.polygon if not args.stdin else (zeile for zeile in sys.stdin if zeile.strip())
+    for polygon in polygone:
+        start = time.perf_counter()
+        try:
+            ergebnis = abfrage.abfrage(polygon, args.crs)
+        except Exception as e:
+            ergebnis = {"fehler": str(e)}
+        ergebnis["dauer_ms"] = round((time.perf_counter() - start) * 1000, 2)
+        print(json.dumps(ergebnis, ensure_ascii=False), flush=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+# Risikowert, Risikoklasse sowie Einwohner und Ü65 der 100-m-Zensuszelle für eine
+# Liste von Koordinaten (z. B. geokodierte Adressen).
+#
+# Die Eingabe-CSV wird in Blöcken gelesen, jeder Block wird mit einer Stapelabfrage
+# (werkzeuge/punktabfrage.py) ergänzt und sofort an die Ausgabe-CSV angehängt.
+# Alle Spalten der Eingabe bleiben erhalten. Mit "-" als Ein- oder Ausgabe wird
+# von der Standardeingabe gelesen bzw. auf die Standardausgabe geschrieben.
+#
+# Aufruf (aus dem src-Ordner):
+#   python main_punkt_abfrage.py --eingabe adressen.csv --ausgabe adressen_risiko.csv --x lon --y lat
+#   python main_punkt_abfrage.py --eingabe punkte.csv --crs EPSG:25832 --x x --y y --ausgabe - < ...
+
+import argparse
+import os
+import sys
+import time
+
+import pandas as pd
+
+from werkzeuge.punktabfrage import PunktAbfrage
+
+# === 1. Dateipfade ===
+zensus_datei = os.path.join("..", "outputs", "tables", "unterfranken_ueber65_absolut.parquet")
+raster_datei = os.path.join("..", "data", "raster", "HSM_WoE_C.tif")
+
+
+# === 2. Ablauf ===
+
+def main():
+    parser = argparse.ArgumentParser(description="Risiko und Zensuswerte für Koordinaten aus einer CSV.")
+    parser.add_argument("--eingabe", default="-", help="CSV mit Koordinaten ('-' = Standardeingabe)")
+    parser.add_argument("--ausgabe", default="-", help="Ergebnis-CSV ('-' = Standardausgabe)")
+    parser.add_argument("--x", default="x", help="Spalte mit x/Längengrad")
+    parser.add_argument("--y", default="y", help="Spalte mit y/Breitengrad")
+    parser.add_argument("--crs", default="EPSG:4326", help="CRS der Koordinaten")
+    parser.add_argument("--sep", default=";")
+    parser.add_argument("--block", type=int, default=1_000_000, help="Zeilen je Block")
+    parser.add_argument("--zensus", default=zensus_datei)
+    parser.add_argument("--raster", default=raster_datei)
+    args = parser.parse_args()
+
+    abfrage = PunktAbfrage(args.raster, args.zensus)
+    eingabe = sys.stdin if args.eingabe == "-" else args.eingabe
+    ausgabe = sys.stdout if args.ausgabe == "-" else open(args.ausgabe, "w", encoding="utf-8", newline="")
+
+    start = time.perf_counter()
+    anzahl = 0
+    try:
+        for block in pd.read_csv(eingabe, sep=args.sep, chunksize=args.block):
+            x = pd.to_numeric(block[args.x], errors="coerce").to_numpy(dtype="float64")
+            y = pd.to_numeric(block[args.y], errors="coerce").to_numpy(dtype="float64")
+            ergebnis = abfrage.abfrage(x, y, args.crs)
+            ergebnis.index = block.index
+            pd.concat([block, ergebnis], axis=1).to_csv(ausgabe, sep=args.sep, index=False, header=anzahl == 0)
+            anzahl += len(block)
+    finally:
+        if ausgabe is not sys.stdout:
+            ausgabe.close()
+    print(f"{anzahl} Punkte in {time.perf_counter() - start:.1f} s abgefragt.", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+# Auswertung des Zensus-Gitters für mehrere Regionen (z. B. alle sieben
+# bayerischen Regierungsbezirke) in einem Durchlauf.
+#
+# 1. Die bundesweite Zensus-CSV wird einmal in Chunks gelesen; jede Zeile wird über
+#    den Gitter-Schlüssel ihrer Region zugeordnet und in deren CSV geschrieben
+#    (gleiches Format wie unterfranken_polygon.csv).
+# 2. Die Regionen werden parallel in einem Prozesspool ausgewertet. Alle Worker
+#    lesen dasselbe Risikoraster als schreibgeschützte memmap.
+#
+# Die Ergebnisse einer Region sind identisch, egal ob sie allein oder zusammen
+# mit anderen Regionen berechnet wird.
+#
+# Aufruf (aus dem src-Ordner):
+#   python main_regionen.py --regionen Unterfranken Oberfranken --prozesse 4
+
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from pyproj import Transformer
+
+from werkzeuge.gitter import SCHLUESSEL_SPALTE, schluessel_aus_koordinaten
+from werkzeuge.raster_speicher import RasterSpeicher, exportiere_raster
+from werkzeuge.regionen import REGION_KEINE, baue_lookup, lade_regionen, region_ids
+from werkzeuge.risiko import CODE_AUSSERHALB, CODE_FEHLT, labels_risiko, risiko_codes
+
+# === 1. Dateipfade ===
+csv_datei = os.path.join("..", "data", "csv", "Zensus2022.csv")
+regionen_datei = os.path.join("..", "data", "shapefiles", "VG5000_RBZ.shp")
+raster_datei = os.path.join("..", "data", "raster", "HSM_WoE_C.tif")
+output_folder = os.path.join("..", "outputs", "regionen")
+chunk_size = 100_000  # Zeilen pro Chunk
+
+x_spalte = "x_mp_100m"
+y_spalte = "y_mp_100m"
+
+
+def region_ordner(ausgabe, name):
+    return os.path.join(ausgabe, name.replace(" ", "_").replace("/", "_"))
+
+
+# === 2. Zensus-CSV in einem Durchlauf auf die Regionen verteilen ===
+
+def verteile_zensus(csv_pfad, regionen, ausgabe):
+    """Schreibt die Zeilen der Zensus-CSV je Region nach <ausgabe>/<Region>/zensus_polygon.csv."""
+    lookup = baue_lookup(regionen)
+    pfade = {}
+    for name in regionen["name"]:
+        ordner = region_ordner(ausgabe, name)
+        os.makedirs(ordner, exist_ok=True)
+        pfade[name] = os.path.join(ordner, "zensus_polygon.csv")
+        if os.path.exists(pfade[name]):
+            os.remove(pfade[name])
+
+    for i, chunk in enumerate(pd.read_csv(csv_pfad, sep=";", chunksize=chunk_size)):
+        if x_spalte not in chunk.columns or y_spalte not in chunk.columns:
+            raise ValueError("Die CSV enthält nicht die erwarteten Spalten!")
+
+        x = chunk[x_spalte].to_numpy(dtype="float64")
+        y = chunk[y_spalte].to_numpy(dtype="float64")
+        ids = region_ids(schluessel_aus_koordinaten(x, y), x, y, lookup, regionen)
+
+        for region_idx in np.unique(ids[ids != REGION_KEINE]):
+            name = regionen["name"].iloc[region_idx]
+            chunk[ids == region_idx].to_csv(
+                pfade[name], sep=";", mode="a",
+                header=not os.path.exists(pfade[name]),
+                index=False,
+            )
+        print(f"Chunk {i + 1} verteilt.")
+    return pfade
+
+
+# === 3. Auswertung einer Region (läuft im Worker-Prozess) ===
+
+def werte_region_aus(name, zensus_pfad, npy_pfad, ausgabe):
+    """
+    Liest den Risikowert für jede Zelle der Region aus dem gemeinsamen memmap-Raster.
+
+    Schreibt risiko_zellen.parquet (Gitter-Schlüssel, Risiko, Klassen-Code) und
+    einwohner_je_klasse.csv in den Regionsordner.
+    """
+    ordner = region_ordner(ausgabe, name)
+    if not os.path.exists(zensus_pfad):
+        print(f"{name}: keine Zensus-Zellen gefunden.")
+        return name, 0
+
+    df = pd.read_csv(zensus_pfad, sep=";", usecols=[x_spalte, y_spalte, "Einwohner"])
+    x = df[x_spalte].to_numpy(dtype="float64")
+    y = df[y_spalte].to_numpy(dtype="float64")
+
+    raster = RasterSpeicher(npy_pfad)
+    transformer = Transformer.from_crs("EPSG:3035", raster.crs, always_xy=True)
+    risiko = raster.werte(*transformer.transform(x, y))
+    codes = risiko_codes(risiko)
+
+    zellen = pd.DataFrame({
+        SCHLUESSEL_SPALTE: schluessel_aus_koordinaten(x, y),
+        "Risiko": risiko.astype("float32"),
+        "Risiko_Klasse": codes,
+    })
+    zellen.to_parquet(os.path.join(ordner, "risiko_zellen.parquet"), index=False)
+
+    einwohner = pd.to_numeric(df["Einwohner"], errors="coerce").fillna(0).clip(lower=0).to_numpy()
+    gueltig = (codes != CODE_FEHLT) & (codes != CODE_AUSSERHALB)
+    summen = np.bincount(codes[gueltig], weights=einwohner[gueltig], minlength=len(labels_risiko))
+    pd.DataFrame({
+        "Risikoklasse": labels_risiko,
+        "Einwohner": summen,
+        "Anteil_pct": summen / summen.sum() * 100 if summen.sum() > 0 else np.nan,
+    }).to_csv(os.path.join(ordner, "einwohner_je_klasse.csv"), sep=";", index=False)
+
+    print(f"{name}: {len(df)} Zellen ausgewertet.")
+    return name, len(df)
+
+
+# === 4. Ablauf ===
+
+def main():
+    parser = argparse.ArgumentParser(description="Zensus-Auswertung für mehrere Regionen parallel.")
+    parser.add_argument("--regionen", nargs="*", help="Regionsnamen (Standard: alle im Layer)")
+    parser.add_argument("--regionen-datei", default=regionen_datei)
+    parser.add_argument("--name-spalte", default="GEN")
+    parser.add_argument("--csv", default=csv_datei)
+    parser.add_argument("--raster", default=raster_datei)
+    parser.add_argument("--ausgabe", default=output_folder)
+    parser.add_argument("--prozesse", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    # Raster einmalig exportieren, bevor die Worker starten
+    npy_pfad = exportiere_raster(args.raster)
+
+    regionen = lade_regionen(args.regionen_datei, args.regionen, args.name_spalte)
+    print(f"Regionen: {', '.join(regionen['name'])}")
+
+    pfade = verteile_zensus(args.csv, regionen, args.ausgabe)
+
+    with ProcessPoolExecutor(max_workers=max(1, args.prozesse)) as pool:
+        auftraege = [
+            pool.submit(werte_region_aus, name, pfad, npy_pfad, args.ausgabe)
+            for name, pfad in pfade.items()
+        ]
+        for auftrag in auftraege:
+            auftrag.result()
+
+    print(f"Fertig! Ergebnisse gespeichert in: {os.path.abspath(args.ausgabe)}")
+
+
+if __name__ == "__main__":
+    main()
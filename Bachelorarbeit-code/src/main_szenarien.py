@@ -0,0 +1,121 @@
+# Vergleich mehrerer Gefahrenraster (Szenarien) für Gebäude und Zensus-Zellen.
+#
+# Alle Raster werden in einem Durchlauf ausgelesen (werkzeuge/szenarien.py):
+# Koordinaten werden einmal je CRS transformiert, der Pixelindex einmal je
+# Rastergitter berechnet und gespeichert. Jedes weitere Raster kostet nur noch
+# einen Gather auf der memmap.
+#
+# Ausgabe (outputs/szenarien):
+# - gebaeude_szenarien.parquet: Szenario × Gebäude (objekt, Szenario, Risiko, Risiko_Klasse)
+# - zensus_szenarien.parquet:   Szenario × Zensus-Zelle (objekt = Gitter-Schlüssel)
+# - szenarien_klassen.csv:      Gebäude und Einwohner je Szenario und Risikoklasse
+#                               (nur Szenarien mit Klassengrenzen, siehe --klassen)
+#
+# Klassengrenzen je Szenario: "name=woe" für die WoE-Klassen, "name=g0,...,g5" für
+# eigene Grenzen (z. B. Wassertiefen in Metern). Szenarien ohne Angabe werden nur
+# ausgelesen, aber nicht klassifiziert.
+#
+# Aufruf (aus dem src-Ordner):
+#   python main_szenarien.py --raster WoE_C=../data/raster/HSM_WoE_C.tif HQ100=../data/raster/HQ100.tif
+#                            --klassen WoE_C=woe
+
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from werkzeuge.gebaeude import lade_gebaeude
+from werkzeuge.gebaeudetabelle import koordinaten
+from werkzeuge.gitter import SCHLUESSEL_SPALTE, schluessel_aus_koordinaten
+from werkzeuge.risiko import CODE_AUSSERHALB, CODE_FEHLT, labels_risiko
+from werkzeuge.szenarien import OBJEKT_SPALTE, SZENARIO_SPALTE, sample_szenarien, szenario_bins, szenarien_lang
+
+# === 1. Dateipfade ===
+gebaeude_datei = os.path.join("..", "data", "shapefiles", "buildings_unterfranken_clipped.shp")
+zensus_datei = os.path.join("..", "outputs", "tables", "unterfranken_polygon.csv")
+raster_datei = os.path.join("..", "data", "raster", "HSM_WoE_C.tif")
+# Name des Standard-Szenarios (Dateiname ohne Endung, siehe szenario_namen)
+standard_szenario = "HSM_WoE_C"
+output_folder = os.path.join("..", "outputs", "szenarien")
+
+x_spalte = "x_mp_100m"
+y_spalte = "y_mp_100m"
+
+
+# === 2. Zusammenfassung je Szenario und Klasse ===
+
+def klassen_summen(lang, gewichte, spalte, auswahl=None):
+    """
+    Summe der Gewichte je Szenario und Risikoklasse (ohne nodata/außerhalb).
+
+    auswahl: nur diese Szenarien (z. B. die mit Klassengrenzen), sonst alle.
+    """
+    szenarien = lang[SZENARIO_SPALTE].cat.categories
+    codes = lang["Risiko_Klasse"].to_numpy().astype("int64")
+    sz = lang[SZENARIO_SPALTE].cat.codes.to_numpy().astype("int64")
+    gewichte = np.tile(gewichte, len(szenarien))
+    gueltig = (codes != CODE_FEHLT) & (codes != CODE_AUSSERHALB)
+
+    anzahl = len(labels_risiko)
+    summen = np.bincount(
+        np.ravel_multi_index((sz[gueltig], codes[gueltig]), (len(szenarien), anzahl)),
+        weights=gewichte[gueltig],
+        minlength=len(szenarien) * anzahl,
+    )
+    tabelle = pd.DataFrame({
+        SZENARIO_SPALTE: np.repeat(szenarien, anzahl),
+        "Risikoklasse": np.tile(labels_risiko, len(szenarien)),
+        spalte: summen,
+    })
+    if auswahl is not None:
+        tabelle = tabelle[tabelle[SZENARIO_SPALTE].isin(auswahl)].reset_index(drop=True)
+    return tabelle
+
+
+# === 3. Ablauf ===
+
+def main():
+    parser = argparse.ArgumentParser(description="Mehrere Gefahrenraster für Gebäude und Zensus-Zellen auslesen.")
+    parser.add_argument("--raster", nargs="+", default=[raster_datei],
+                        help="Rasterpfade, optional als name=pfad")
+    parser.add_argument("--klassen", nargs="*", default=[f"{standard_szenario}=woe"],
+                        help="Klassengrenzen je Szenario: name=woe oder name=g0,g1,...,g5")
+    parser.add_argument("--gebaeude", default=gebaeude_datei)
+    parser.add_argument("--zensus", default=zensus_datei)
+    parser.add_argument("--ausgabe", default=output_folder)
+    args = parser.parse_args()
+    os.makedirs(args.ausgabe, exist_ok=True)
+    bins = szenario_bins(args.klassen)
+
+    # 1. Gebäude
+    gebaeude = lade_gebaeude(args.gebaeude)
+    breit = sample_szenarien(args.gebaeude, *koordinaten(gebaeude), args.raster, name="gebaeude")
+    ohne = [s for s in breit.columns if s not in bins]
+    if ohne:
+        print(f"Keine Klassengrenzen für {ohne}: nur Rasterwerte, keine Risikoklassen.")
+    geb_lang = szenarien_lang(breit, bins)
+    geb_lang.to_parquet(os.path.join(args.ausgabe, "gebaeude_szenarien.parquet"), index=False)
+    geb_summen = klassen_summen(geb_lang, np.ones(len(gebaeude)), "Gebaeude", list(bins))
+
+    # 2. Zensus-Zellen (EPSG:3035)
+    zensus = pd.read_csv(args.zensus, sep=";", usecols=[x_spalte, y_spalte, "Einwohner"])
+    x = zensus[x_spalte].to_numpy(dtype="float64")
+    y = zensus[y_spalte].to_numpy(dtype="float64")
+    breit = sample_szenarien(args.zensus, x, y, "EPSG:3035", args.raster, name="zensus")
+    zen_lang = szenarien_lang(breit, bins, objekt_ids=schluessel_aus_koordinaten(x, y))
+    zen_lang = zen_lang.rename(columns={OBJEKT_SPALTE: SCHLUESSEL_SPALTE})
+    zen_lang.to_parquet(os.path.join(args.ausgabe, "zensus_szenarien.parquet"), index=False)
+    einwohner = pd.to_numeric(zensus["Einwohner"], errors="coerce").fillna(0).clip(lower=0).to_numpy()
+    zen_summen = klassen_summen(zen_lang, einwohner, "Einwohner", list(bins))
+
+    # 3. Zusammenfassung
+    summen = geb_summen.merge(zen_summen, on=[SZENARIO_SPALTE, "Risikoklasse"])
+    summen.to_csv(os.path.join(args.ausgabe, "szenarien_klassen.csv"), sep=";", index=False)
+    print(summen.pivot(index="Risikoklasse", columns=SZENARIO_SPALTE, values="Einwohner").reindex(labels_risiko))
+
+    print(f"Fertig! Ergebnisse gespeichert in: {os.path.abspath(args.ausgabe)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+# Risikowerte je 100-m-Zensuszelle aus allen Rasterpixeln der Zelle.
+#
+# Bisher erhält jede Zelle den WoE-Wert an ihrem Mittelpunkt (x_mp_100m, y_mp_100m).
+# Ist das Raster feiner als 100 m, hängt das Ergebnis an einem einzelnen Pixel.
+# Hier wird das Raster einmal fensterweise auf das 100-m-Gitter reduziert
+# (werkzeuge/zellrisiko.py): mittlerer und maximaler Wert sowie Pixelanteil je
+# Risikoklasse. Die Tabelle wird über den Gitter-Schlüssel an die Zelltabellen
+# angehängt (hist_bevgesamt_ue65_risiko.py, hist_altersgruppe_risiko.py,
+# main_gitterstufen.py); fehlt sie oder wurde das Raster seither geändert (Pfad und
+# Änderungszeit stehen in den Parquet-Metadaten), wird wie bisher der Mittelpunkt verwendet.
+#
+# Ausgabe: outputs/gitter/zellrisiko_100m.parquet
+#          (gitter_key, Risiko_mittel, Risiko_max, anteil_<Klasse>, pixel)
+#
+# Aufruf (aus dem src-Ordner):
+#   python main_zellrisiko.py
+
+import argparse
+import os
+import time
+
+from werkzeuge.raster_speicher import oeffne_raster
+from werkzeuge.risiko import labels_risiko
+from werkzeuge.zellrisiko import SPALTE_MITTEL, anteil_spalten, speichere_zellrisiko, zell_risiko
+
+# === 1. Dateipfade ===
+raster_datei = os.path.join("..", "data", "raster", "HSM_WoE_C.tif")
+ausgabe_datei = os.path.join("..", "outputs", "gitter", "zellrisiko_100m.parquet")
+
+
+# === 2. Ablauf ===
+
+def main():
+    parser = argparse.ArgumentParser(description="Rasterwerte je 100-m-Zensuszelle zusammenfassen.")
+    parser.add_argument("--raster", default=raster_datei)
+    parser.add_argument("--ausgabe", default=ausgabe_datei)
+    parser.add_argument("--fenster", type=int, default=512, help="Pixelzeilen je Fenster")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    raster = oeffne_raster(args.raster)
+    zellen = zell_risiko(raster, fenster_pixel=args.fenster)
+    os.makedirs(os.path.dirname(os.path.abspath(args.ausgabe)), exist_ok=True)
+    speichere_zellrisiko(zellen, args.ausgabe, args.raster)
+
+    anteile = zellen[anteil_spalten(labels_risiko)].mean()
+    anteile.index = labels_risiko
+    print(f"{len(zellen)} Zellen, mittlerer WoE-Wert {zellen[SPALTE_MITTEL].mean():.2f}")
+    print((anteile * 100).round(1).rename("mittlerer Pixelanteil je Zelle (%)"))
+    print(f"Fertig in {time.perf_counter() - start:.1f} s! Ergebnis gespeichert in: {os.path.abspath(args.ausgabe)}")
+
+
+if __name__ == "__main__":
+    main()
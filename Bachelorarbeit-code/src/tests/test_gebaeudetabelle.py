@@ -0,0 +1,36 @@
+# Kompakte Gebäudetabelle: Schlüsselspalten bleiben über Speichern und Laden exakt.
+#
+# Aufruf (aus dem src-Ordner):
+#   python -m pytest tests
+
+import os
+import sys
+
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from werkzeuge.gebaeudetabelle import GEBAEUDE_CRS, kompakte_tabelle, lade_kompakt, speichere_kompakt
+from werkzeuge.gitter import SCHLUESSEL_SPALTE
+
+
+def test_schluessel_ueber_speichern_und_laden(tmp_path):
+    # wie nach dem Left-Join in main_gebaeudedaten.py: float64 mit NaN für Gebäude ohne Zelle
+    schluessel = [2463941171.0, 2463941181.0, np.nan]
+    gdf = gpd.GeoDataFrame(
+        {"gml_id": ["a", "b", "c"], SCHLUESSEL_SPALTE: schluessel, "AGS": [9663000, 9663000, 9679114]},
+        geometry=gpd.points_from_xy([567_000.0, 567_100.0, 575_000.0], [5_515_000.0, 5_515_000.0, 5_525_000.0]),
+        crs=GEBAEUDE_CRS,
+    )
+    tabelle = kompakte_tabelle(gdf)
+    assert tabelle[SCHLUESSEL_SPALTE].dtype == "Int64"
+    assert tabelle["AGS"].dtype == "Int32"
+
+    pfad = tmp_path / "gebaeude.parquet"
+    speichere_kompakt(tabelle, pfad)
+    geladen = lade_kompakt(pfad).set_index("gml_id").loc[["a", "b", "c"]]
+
+    assert geladen[SCHLUESSEL_SPALTE].iloc[:2].tolist() == [2463941171, 2463941181]
+    assert pd.isna(geladen[SCHLUESSEL_SPALTE].iloc[2])
+    assert geladen["AGS"].tolist() == [9663000, 9663000, 9679114]
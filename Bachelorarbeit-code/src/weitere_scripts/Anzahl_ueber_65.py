@@ -1,39 +1,58 @@
 import pandas as pd
 import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from werkzeuge.gitter import SCHLUESSEL_SPALTE, gitter_id, gitter_schluessel
+from werkzeuge.tabellen import lade_tabelle, speichere_zellen
 
 # === 1. Dateipfade ===
 input_path = "data/excel/Unterfranken_polygon.xlsx"
 output_folder = "outputs/tables"
 os.makedirs(output_folder, exist_ok=True)
-output_path = os.path.join(output_folder, "unterfranken_ueber65_absolut.xlsx")
+output_path = os.path.join(output_folder, "unterfranken_ueber65_absolut.parquet")
+
+# Zusätzlich als Excel speichern (langsam, nur bei Bedarf aktivieren)
+excel_export = False
+
+# === 2. Tabellen einlesen ===
+# Beim ersten Lauf wird jedes Arbeitsblatt in einen typisierten Parquet-Spiegel
+# umgewandelt, danach wird nur noch Parquet gelesen.
 
-# === 2. Excel-Dateien einlesen ===
 # Enthält Einwohnerzahlen pro 100m-Gitter
-einwohner_df = pd.read_excel(input_path, sheet_name="Unterfranken_Einwohner")
+einwohner_df = lade_tabelle(input_path, sheet_name="Unterfranken_Einwohner")
 
 # Enthält den Anteil der über 65-Jährigen pro 100m-Gitter
-anteil_df = pd.read_excel(input_path, sheet_name="ueber65")
+anteil_df = lade_tabelle(input_path, sheet_name="ueber65")
 
 # === 3. Daten bereinigen ===
-# Komma durch Punkt ersetzen und als float konvertieren
-anteil_df["AnteilUeber65"] = (
-    anteil_df["AnteilUeber65"]
-    .astype(str)
-    .str.replace(",", ".", regex=False)
-)
-anteil_df["AnteilUeber65"] = pd.to_numeric(anteil_df["AnteilUeber65"], errors="coerce")
+# Das Dezimalkomma in "AnteilUeber65" wird bereits beim Erstellen des Spiegels ersetzt
+# (werkzeuge/tabellen.py, KOMMA_SPALTEN).
+
+# Gitter-IDs in int64-Schlüssel umwandeln (schnellerer Join, weniger Speicher)
+einwohner_df[SCHLUESSEL_SPALTE] = gitter_schluessel(einwohner_df["GITTER_ID_100m"])
+anteil_df[SCHLUESSEL_SPALTE] = gitter_schluessel(anteil_df["GITTER_ID_100m"])
+einwohner_df = einwohner_df.drop(columns="GITTER_ID_100m")
+anteil_df = anteil_df[[SCHLUESSEL_SPALTE, "AnteilUeber65"]]
 
 # === 4. Tabellen zusammenführen ===
-merged = pd.merge(einwohner_df, anteil_df, on="GITTER_ID_100m")
+# Koordinaten kommen nur aus der Einwohner-Tabelle, dadurch keine _x/_y-Suffixe
+merged = pd.merge(einwohner_df, anteil_df, on=SCHLUESSEL_SPALTE)
 
 # === 5. Absolute Anzahl über 65 Jahre berechnen ===
 merged["Ueber65_Absolut"] = merged["Einwohner"] * (merged["AnteilUeber65"] / 100)
 
 # === 6. Ergebnis ausgeben ===
-print(
-    merged[["GITTER_ID_100m", "Einwohner", "AnteilUeber65", "Ueber65_Absolut"]].head()
-)
+vorschau = merged[[SCHLUESSEL_SPALTE, "Einwohner", "AnteilUeber65", "Ueber65_Absolut"]].head().copy()
+vorschau.insert(0, "GITTER_ID_100m", gitter_id(vorschau[SCHLUESSEL_SPALTE]))
+print(vorschau)
 
 # === 7. Ergebnis speichern ===
-merged.to_excel(output_path, index=False)
+# Nach Gitter-Schlüssel sortiert, mit Ausdehnung je Zeilengruppe (Ausschnitte über lade_tabelle(..., bbox=...))
+speichere_zellen(merged, output_path)
 print("Datei erfolgreich gespeichert:", output_path)
+
+if excel_export:
+    excel_path = os.path.splitext(output_path)[0] + ".xlsx"
+    merged.assign(GITTER_ID_100m=gitter_id(merged[SCHLUESSEL_SPALTE])).to_excel(excel_path, index=False)
+    print("Datei erfolgreich gespeichert:", excel_path)
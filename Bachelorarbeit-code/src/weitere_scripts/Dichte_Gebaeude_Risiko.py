@@ -0,0 +1,80 @@
+
+# Kerndichte der Bewohner je Risikoklasse als Ergänzung zu den Balken je Gemeinde.
+# Zeigt, wo sich Bewohner in gefährdeten Gebäuden innerhalb der Gemeinden häufen.
+#
+# Die Gebäudepunkte werden nach Risikoklasse mit np.bincount auf ein Gitter mit
+# zellgroesse Metern summiert (gewichtet mit geb_bewohn) und für jede Bandbreite
+# mit einem Gauß-Kern per FFT geglättet (werkzeuge/dichte.py).
+#
+# Input:
+# - data/shapefiles/buildings_unterfranken_clipped.shp
+# - data/raster/HSM_WoE_C.tif
+# - data/shapefiles/VG5000_GEM.shp
+#
+# Output:
+# - outputs/raster/dichte_bewohner_<Bandbreite>m.tif (Bewohner je km², ein Band je
+#   Risikoklasse, EPSG:3035)
+# - Karte der Dichte in den Klassen "hoch" und "sehr hoch" im Plot-Fenster
+
+import os
+import sys
+import time
+
+import matplotlib.pyplot as plt
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from werkzeuge.dichte import binne_punkte, gitter_ausdehnung, kerndichte, zeichne_dichte
+from werkzeuge.gebaeude import lade_gebaeude_mit_risiko
+from werkzeuge.gebaeudetabelle import koordinaten
+from werkzeuge.gemeinden import lade_gemeinden
+from werkzeuge.pixelindex import transformiere_punkte
+from werkzeuge.raster_speicher import schreibe_geotiff
+from werkzeuge.risiko import labels_risiko, risiko_codes
+
+# === INPUT SETUP ===
+shapefile_path = "data/shapefiles/buildings_unterfranken_clipped.shp"
+raster_path = "data/raster/HSM_WoE_C.tif"
+gemeinden_path = "data/shapefiles/VG5000_GEM.shp"
+raster_dir = "outputs/raster"
+os.makedirs(raster_dir, exist_ok=True)
+
+crs = "EPSG:3035"             # wie Zensusgitter und Hotspot-Raster
+zellgroesse = 50              # Gitterweite in Metern
+bandbreiten = [100, 250, 500] # Standardabweichung des Gauß-Kerns in Metern
+karten_bandbreite = 250
+karten_klassen = ["hoch", "sehr hoch"]
+
+# === 1. Gebäude mit Risikoklasse laden ===
+gdf = lade_gebaeude_mit_risiko(shapefile_path, raster_path)
+codes = risiko_codes(gdf["Risiko"].to_numpy())
+x, y = transformiere_punkte(*koordinaten(gdf), crs)
+
+# === 2. Bewohner je Zelle und Risikoklasse ===
+start = time.perf_counter()
+ausdehnung = gitter_ausdehnung(x, y, zellgroesse, rand=4 * max(bandbreiten))
+summen, transform = binne_punkte(x, y, gdf["geb_bewohn"].to_numpy(), codes, len(labels_risiko),
+                                 zellgroesse, ausdehnung)
+print(f"{len(gdf)} Gebäude auf {summen.shape[1]} x {summen.shape[2]} Zellen summiert")
+
+# === 3. Glätten und speichern ===
+for bandbreite in bandbreiten:
+    dichte = kerndichte(summen, bandbreite, zellgroesse)
+    pfad = os.path.join(raster_dir, f"dichte_bewohner_{bandbreite}m.tif")
+    schreibe_geotiff(pfad, dichte.astype("float32"), transform, crs, beschreibungen=labels_risiko)
+    print(f"Bandbreite {bandbreite} m gespeichert: {pfad}")
+print(f"Dauer: {time.perf_counter() - start:.1f} s")
+
+# === 4. Karte ===
+fig, ax = plt.subplots(figsize=(10, 10))
+bild, karten_crs = zeichne_dichte(
+    ax, os.path.join(raster_dir, f"dichte_bewohner_{karten_bandbreite}m.tif"), karten_klassen, schwelle=1.0
+)
+lade_gemeinden(gemeinden_path, crs=karten_crs).boundary.plot(ax=ax, color="grey", linewidth=0.3)
+ax.set_xlim(ausdehnung[0], ausdehnung[2])
+ax.set_ylim(ausdehnung[1], ausdehnung[3])
+ax.set_axis_off()
+fig.colorbar(bild, ax=ax, shrink=0.6, label="Bewohner je km²")
+ax.set_title(f"Dichte der Bewohner in Gebäuden mit Risiko {' / '.join(karten_klassen)}\n"
+             f"(Gauß-Kern, Bandbreite {karten_bandbreite} m)", fontsize=14)
+plt.tight_layout()
+plt.show()
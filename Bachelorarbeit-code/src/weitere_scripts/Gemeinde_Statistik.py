@@ -0,0 +1,110 @@
+
+# Erstellt eine Tabelle mit allen Kennzahlen je Gemeinde (AGS) für den lokalen
+# Abfragedienst (main_gemeinde_dienst.py):
+# - Flächenanteile je Risikoklasse (Zonenstatistik auf dem Raster)
+# - Anzahl Gebäude je Risikoklasse
+# - Einwohner und über 65-Jährige je Risikoklasse (Zensus-Gitterzellen)
+#
+# Input:
+# - data/shapefiles/buildings_unterfranken_clipped.shp
+# - outputs/tables/unterfranken_ueber65_absolut.parquet (aus weitere_scripts/Anzahl_ueber_65.py)
+# - data/raster/HSM_WoE_C.tif
+# - data/shapefiles/VG5000_GEM.shp
+#
+# Output:
+# - outputs/tables/gemeinde_statistik.parquet (eine Zeile je AGS)
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+from pyproj import Transformer
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from werkzeuge.gebaeude import lade_gebaeude_mit_risiko
+from werkzeuge.gebaeudetabelle import koordinaten
+from werkzeuge.gemeinden import AGS_FEHLT, AGS_SPALTE, gemeinde_codes, gemeinde_namen, lade_gemeinden
+from werkzeuge.gitter import SCHLUESSEL_SPALTE, gitter_schluessel, zellmittelpunkte
+from werkzeuge.raster_speicher import oeffne_raster
+from werkzeuge.risiko import CODE_AUSSERHALB, CODE_FEHLT, bins_risiko, labels_risiko, risiko_codes
+from werkzeuge.tabellen import lade_tabelle
+from werkzeuge.zonen import zonen_klassen_anteile
+
+# === INPUT SETUP ===
+shapefile_path = "data/shapefiles/buildings_unterfranken_clipped.shp"
+zensus_path = "outputs/tables/unterfranken_ueber65_absolut.parquet"
+raster_path = "data/raster/HSM_WoE_C.tif"
+gemeinden_path = "data/shapefiles/VG5000_GEM.shp"
+output_dir = "outputs/tables"
+os.makedirs(output_dir, exist_ok=True)
+output_path = os.path.join(output_dir, "gemeinde_statistik.parquet")
+
+# Spaltennamen ohne Leerzeichen, z. B. "sehr hoch" -> "sehr_hoch"
+klassen = [label.replace(" ", "_") for label in labels_risiko]
+
+
+def summen_je_gemeinde(ags, codes, gewichte, auswahl):
+    """Gewichtssumme je (AGS aus auswahl, Risikoklasse) per np.bincount, Form (Gemeinden, Klassen)."""
+    gueltig = (ags != AGS_FEHLT) & (codes != CODE_FEHLT) & (codes != CODE_AUSSERHALB) & np.isin(ags, auswahl)
+    idx = np.searchsorted(auswahl, ags[gueltig]) * len(labels_risiko) + codes[gueltig]
+    return np.bincount(
+        idx, weights=gewichte[gueltig], minlength=len(auswahl) * len(labels_risiko)
+    ).reshape(len(auswahl), len(labels_risiko))
+
+
+# === 1. Raster und Gemeinden ===
+raster = oeffne_raster(raster_path)
+gemeinden = lade_gemeinden(gemeinden_path)
+
+# === 2. Gebäude je Gemeinde und Klasse ===
+gdf = lade_gebaeude_mit_risiko(shapefile_path, raster_path)
+x_geb, y_geb, crs_geb = koordinaten(gdf)
+geb_ags = gemeinde_codes(x_geb, y_geb, gemeinden.to_crs(crs_geb))
+geb_codes = risiko_codes(gdf["Risiko"].values)
+
+# Ausgewertet werden die Gemeinden, in denen Gebäude liegen
+auswahl = np.unique(geb_ags[geb_ags != AGS_FEHLT])
+gebaeude = summen_je_gemeinde(geb_ags, geb_codes, np.ones(len(gdf)), auswahl)
+
+# === 3. Einwohner je Gemeinde und Klasse ===
+df = lade_tabelle(zensus_path)
+if SCHLUESSEL_SPALTE not in df.columns:
+    df[SCHLUESSEL_SPALTE] = gitter_schluessel(df["GITTER_ID_100m"])
+x, y = zellmittelpunkte(df[SCHLUESSEL_SPALTE].values)
+
+x_raster, y_raster = Transformer.from_crs("EPSG:3035", raster.crs, always_xy=True).transform(x, y)
+zen_codes = risiko_codes(raster.werte(x_raster, y_raster))
+x_gem, y_gem = Transformer.from_crs("EPSG:3035", gemeinden.crs, always_xy=True).transform(x, y)
+zen_ags = gemeinde_codes(x_gem, y_gem, gemeinden)
+
+einwohner = pd.to_numeric(df["Einwohner"], errors="coerce").fillna(0).clip(lower=0).to_numpy()
+ueber65 = pd.to_numeric(df["Ueber65_Absolut"], errors="coerce").fillna(0).clip(lower=0).to_numpy()
+einwohner_summen = summen_je_gemeinde(zen_ags, zen_codes, einwohner, auswahl)
+ueber65_summen = summen_je_gemeinde(zen_ags, zen_codes, ueber65, auswahl)
+
+# === 4. Flächenanteile je Gemeinde und Klasse ===
+# VG5000 kann mehrere Teilflächen je AGS enthalten -> zu einer Fläche je Gemeinde vereinigen
+polygone = gemeinden[[AGS_SPALTE, gemeinden.geometry.name]].dissolve(by=AGS_SPALTE).loc[auswahl]
+pixel = zonen_klassen_anteile(raster, polygone.to_crs(raster.crs).geometry.values, bins_risiko)
+with np.errstate(invalid="ignore", divide="ignore"):
+    flaeche_pct = pixel / pixel.sum(axis=1, keepdims=True) * 100
+
+# === 5. Tabelle zusammenstellen ===
+namen = gemeinde_namen(gemeinden)
+statistik = pd.DataFrame({AGS_SPALTE: auswahl.astype("int32"), "GEN": namen.reindex(auswahl).values})
+for i, klasse in enumerate(klassen):
+    statistik[f"flaeche_{klasse}_pct"] = flaeche_pct[:, i]
+for i, klasse in enumerate(klassen):
+    statistik[f"gebaeude_{klasse}"] = gebaeude[:, i].astype("int64")
+statistik["gebaeude_gesamt"] = gebaeude.sum(axis=1).astype("int64")
+for i, klasse in enumerate(klassen):
+    statistik[f"einwohner_{klasse}"] = einwohner_summen[:, i]
+statistik["einwohner_gesamt"] = einwohner_summen.sum(axis=1)
+for i, klasse in enumerate(klassen):
+    statistik[f"ueber65_{klasse}"] = ueber65_summen[:, i]
+statistik["ueber65_gesamt"] = ueber65_summen.sum(axis=1)
+
+# === 6. Ergebnis speichern ===
+statistik.to_parquet(output_path, index=False)
+print(f"{len(statistik)} Gemeinden gespeichert unter: {output_path}")
@@ -1,9 +1,11 @@
 import geopandas as gpd
-import rasterio
-import numpy as np
 import pandas as pd
-from rasterstats import zonal_stats
 import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from werkzeuge.raster_speicher import oeffne_raster
+from werkzeuge.zonen import zonen_klassen_anteile
 
 # === 1. Daten einlesen ===
 gdf_gemeinden = gpd.read_file("data/shapefiles/VG5000_GEM.shp")
@@ -33,64 +35,29 @@ gdf_uf_gemeinden["overlap_ratio"] = (
 # === 8. Gemeinden filtern (≥ 60% in Unterfranken) ===
 gdf_uf_gemeinden_filtered = gdf_uf_gemeinden[gdf_uf_gemeinden["overlap_ratio"] > 0.6].reset_index()
 
-# === 9. Raster einlesen ===
+# === 9. Raster als memmap öffnen (einmaliger Export nach .npy) ===
 raster_path = "data/raster/HSM_WoE_C.tif"
-raster = rasterio.open(raster_path)
-raster_array = raster.read(1)
+raster = oeffne_raster(raster_path)
 
 # === 10. Risiko-Klassen definieren ===
 bins_risiko = [-18.459, -10.999, -6.982, -2.62, 2.546, 10.81]
 labels_risiko = ["sehr gering", "gering", "mittel", "hoch", "sehr hoch"]
 
-# === 11. Klassifizierung der Rasterwerte ===
-raster_classified = np.digitize(raster_array, bins=bins_risiko)
-
-# === 12. Raster temporär speichern ===
-classified_tif_path = "output/raster_classified.tif"
-os.makedirs("output", exist_ok=True)
-
-with rasterio.open(
-    classified_tif_path,
-    "w",
-    driver="GTiff",
-    height=raster_classified.shape[0],
-    width=raster_classified.shape[1],
-    count=1,
-    dtype=raster_classified.dtype,
-    crs=raster.crs,
-    transform=raster.transform,
-    nodata=0,
-) as dst:
-    dst.write(raster_classified, 1)
-
-# === 13. Zonenstatistik ===
-stats = zonal_stats(
-    gdf_uf_gemeinden_filtered,
-    classified_tif_path,
-    stats="count",
-    categorical=True,
-    nodata=0,
-)
-df_stats = pd.DataFrame(stats)
-
-# === 14. Risiko-Spalten umbenennen ===
-label_map = {i + 1: labels_risiko[i] for i in range(len(labels_risiko))}
-df_stats.rename(columns=label_map, inplace=True)
-
-# Fehlende Klassen ergänzen
-for label in labels_risiko:
-    if label not in df_stats.columns:
-        df_stats[label] = 0
+# === 11. Zonenstatistik ===
+# Pixel je Klasse pro Gemeinde direkt aus der memmap (ohne klassifiziertes Zwischenraster)
+geometrien = gdf_uf_gemeinden_filtered.to_crs(raster.crs).geometry.values
+zaehlung = zonen_klassen_anteile(raster, geometrien, bins_risiko)
+df_stats = pd.DataFrame(zaehlung, columns=labels_risiko)
 
-# === 15. Mit Geometrien kombinieren ===
+# === 12. Mit Geometrien kombinieren ===
 result = pd.concat([gdf_uf_gemeinden_filtered[["GEN", "geometry"]], df_stats], axis=1)
 
-# === 16. Prozentanteile berechnen ===
+# === 13. Prozentanteile berechnen ===
 result["gesamt"] = result[labels_risiko].sum(axis=1)
 for label in labels_risiko:
     result[f"{label}_pct"] = (result[label] / result["gesamt"]) * 100
 
-# === 17. Spaltennamen anpassen ===
+# === 14. Spaltennamen anpassen ===
 result = result.rename(
     columns={
         "sehr gering_pct": "s_ger_pct",
@@ -101,7 +68,7 @@ result = result.rename(
     }
 )
 
-# === 18. Ergebnis speichern ===
+# === 15. Ergebnis speichern ===
 output_folder = "outputs/shapefiles"
 os.makedirs(output_folder, exist_ok=True)
 output_path = os.path.join(output_folder, "flaechen_gemeinden_risiko_unterfranken.shp")
@@ -0,0 +1,86 @@
+
+# Hotspot-Analyse (Getis-Ord Gi*) der Einwohner in den Risikoklassen "hoch" und
+# "sehr hoch" auf dem 100-m-Zensusgitter. Zeigt, wo sich gefährdete Einwohner
+# räumlich häufen, unabhängig von Gemeindegrenzen.
+#
+# Untersuchungsgebiet sind alle bewohnten 100-m-Zellen. Die Nachbarschaft ist ein
+# Kreis mit radius_zellen Zellen; die Signifikanz wird nach Benjamini-Hochberg
+# für die Anzahl der Zellen korrigiert.
+#
+# Input:
+# - outputs/gitter/gitter_100m.parquet (aus main_gitterstufen.py)
+# - data/shapefiles/VG5000_GEM.shp
+#
+# Output:
+# - outputs/raster/hotspots_gi_z.tif       (Gi*-z-Werte, EPSG:3035, 100 m)
+# - outputs/raster/hotspots_gi_klassen.tif (-3..3, Cold-/Hotspot mit 99/95/90 % Konfidenz)
+# - outputs/tables/hotspots_zellen.parquet (je bewohnter Zelle)
+# - outputs/tables/hotspots_cluster.csv    (zusammenhängende Hotspots ab 95 %)
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from werkzeuge.gemeinden import AGS_SPALTE, gemeinde_codes, gemeinde_namen, lade_gemeinden
+from werkzeuge.gitter import SCHLUESSEL_SPALTE, gitter_raster
+from werkzeuge.hotspots import cluster, gi_klassen, gi_stern, p_werte
+from werkzeuge.pixelindex import transformiere_punkte
+from werkzeuge.raster_speicher import schreibe_geotiff
+
+# === INPUT SETUP ===
+gitter_path = "outputs/gitter/gitter_100m.parquet"
+gemeinden_path = "data/shapefiles/VG5000_GEM.shp"
+raster_dir = "outputs/raster"
+tables_dir = "outputs/tables"
+os.makedirs(raster_dir, exist_ok=True)
+os.makedirs(tables_dir, exist_ok=True)
+
+radius_zellen = 5   # Nachbarschaftsradius (5 Zellen = 500 m)
+fdr = True          # Korrektur für multiples Testen (Benjamini-Hochberg)
+mindeststufe = 2    # Cluster aus Hotspot-Zellen ab 95 % Konfidenz
+
+# === 1. Einwohner in hoher Risikoklasse je Zelle ===
+zellen = pd.read_parquet(gitter_path)
+zellen = zellen[zellen["einwohner"] > 0].reset_index(drop=True)
+zellen["einwohner_risiko"] = zellen["einwohner_hoch"] + zellen["einwohner_sehr_hoch"]
+
+werte, (zeile, spalte), transform = gitter_raster(
+    zellen[SCHLUESSEL_SPALTE].to_numpy(), zellen["einwohner_risiko"].to_numpy(dtype="float64"), fuellwert=np.nan
+)
+maske = ~np.isnan(werte)
+
+# === 2. Gi* und Signifikanz ===
+z = gi_stern(werte, maske, radius_zellen)
+klassen = gi_klassen(z, fdr=fdr)
+
+zellen["gi_z"] = z[zeile, spalte]
+zellen["p"] = p_werte(zellen["gi_z"].to_numpy())
+zellen["gi_klasse"] = klassen[zeile, spalte]
+print(zellen["gi_klasse"].value_counts().sort_index().rename("Zellen je Gi-Klasse"))
+
+# === 3. Cluster ===
+labels, tabelle = cluster(klassen, werte, z, transform, mindeststufe=mindeststufe)
+zellen["cluster"] = labels[zeile, spalte]
+tabelle = tabelle.rename(columns={"summe": "einwohner_risiko"})
+einwohner = pd.Series(zellen["einwohner"].to_numpy()).groupby(zellen["cluster"].to_numpy()).sum()
+tabelle["einwohner"] = tabelle["cluster"].map(einwohner)
+
+# Gemeinde am Schwerpunkt des Clusters
+gemeinden = lade_gemeinden(gemeinden_path)
+x_gem, y_gem = transformiere_punkte(tabelle["x"].to_numpy(), tabelle["y"].to_numpy(), "EPSG:3035", gemeinden.crs)
+tabelle[AGS_SPALTE] = gemeinde_codes(x_gem, y_gem, gemeinden)
+tabelle["GEN"] = tabelle[AGS_SPALTE].map(gemeinde_namen(gemeinden))
+
+# === 4. Ergebnisse speichern ===
+schreibe_geotiff(os.path.join(raster_dir, "hotspots_gi_z.tif"), z.astype("float32"), transform, "EPSG:3035",
+                 nodata=np.nan)
+schreibe_geotiff(os.path.join(raster_dir, "hotspots_gi_klassen.tif"), np.where(maske, klassen, -128).astype("int8"),
+                 transform, "EPSG:3035", nodata=-128)
+zellen.to_parquet(os.path.join(tables_dir, "hotspots_zellen.parquet"), index=False)
+tabelle.to_csv(os.path.join(tables_dir, "hotspots_cluster.csv"), sep=";", index=False)
+
+print(tabelle.head(10).to_string(index=False))
+print(f"{len(tabelle)} Hotspot-Cluster gespeichert unter: {tables_dir}")
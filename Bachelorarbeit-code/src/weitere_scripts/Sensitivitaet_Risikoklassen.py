@@ -0,0 +1,134 @@
+
+# Sensitivität der Gebäude- und Bewohneranteile je Risikoklasse gegenüber den
+# Klassengrenzen (gesamt und je Gemeinde).
+#
+# Die Risikowerte werden einmal sortiert; jede Grenzvariante kostet danach nur
+# ein np.searchsorted auf den kumulierten Gewichten (werkzeuge/sensitivitaet.py).
+#
+# Input:
+# - data/shapefiles/buildings_unterfranken_clipped.shp
+# - data/raster/HSM_WoE_C.tif
+# - data/shapefiles/VG5000_GEM.shp
+#
+# Output:
+# - outputs/tables/sensitivitaet_grenzen.csv   (alle Grenzvarianten)
+# - outputs/tables/sensitivitaet_gesamt.csv    (Basis + 5/50/95 %-Quantile je Klasse)
+# - outputs/tables/sensitivitaet_gemeinden.csv (dasselbe je Gemeinde)
+# - Unsicherheitsband-Diagramme im Plot-Fenster
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import matplotlib.pyplot as plt
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from werkzeuge.gebaeude import lade_gebaeude_mit_risiko
+from werkzeuge.gemeinden import AGS_FEHLT, AGS_SPALTE, ergaenze_gemeinden
+from werkzeuge.risiko import bins_risiko, farben, labels_risiko
+from werkzeuge.sensitivitaet import (
+    GESAMT, band_tabelle, gesamt_anteile, klassen_anteile, sortiere_gewichtet,
+    verschobene_grenze, zufaellige_bins,
+)
+
+# === INPUT SETUP ===
+shapefile_path = "data/shapefiles/buildings_unterfranken_clipped.shp"
+raster_path = "data/raster/HSM_WoE_C.tif"
+output_dir = "outputs/tables"
+os.makedirs(output_dir, exist_ok=True)
+
+anzahl_varianten = 2000  # zufällige Grenzvarianten
+streuung = 1.0           # maximale Verschiebung der inneren Grenzen
+gewichtungen = {"Gebaeude": None, "Bewohner": "geb_bewohn"}
+
+# === 1. Gebäude mit Risiko und Gemeinde laden ===
+gdf = lade_gebaeude_mit_risiko(shapefile_path, raster_path)
+gdf = gdf.dropna(subset=["Risiko"])
+gdf, gemeinde_namen = ergaenze_gemeinden(gdf)
+gdf = gdf[gdf[AGS_SPALTE] != AGS_FEHLT]
+
+# === 2. Grenzvarianten ===
+# Zeile 0: Basis, danach zufällige Varianten und "hoch beginnt bei 0"
+zufall = zufaellige_bins(bins_risiko, streuung, anzahl_varianten)
+hoch_ab_0 = verschobene_grenze(bins_risiko, grenze=3, werte=(0.0,))
+varianten = np.vstack([zufall, hoch_ab_0])
+beschreibung = ["Basis"] + ["zufällig"] * anzahl_varianten + ["hoch ab 0"]
+
+pd.DataFrame(varianten, columns=[f"grenze_{i}" for i in range(varianten.shape[1])]).assign(
+    Beschreibung=beschreibung
+).rename_axis("Variante").to_csv(os.path.join(output_dir, "sensitivitaet_grenzen.csv"), sep=";")
+
+# === 3. Anteile für alle Varianten berechnen ===
+gesamt_tabellen = []
+gemeinde_tabellen = []
+for gewichtung, spalte in gewichtungen.items():
+    gewichte = None if spalte is None else pd.to_numeric(gdf[spalte], errors="coerce").fillna(0).clip(lower=0).values
+    sortiert = sortiere_gewichtet(gdf["Risiko"].values, gewichte, gdf[AGS_SPALTE].values)
+
+    anteile_gesamt = gesamt_anteile(sortiert, varianten)[None, :, :]
+    anteile_gemeinden = klassen_anteile(sortiert, varianten)
+
+    # Zufallsvarianten für die Bänder, "hoch ab 0" separat ausweisen
+    for anteile, gruppen, ziel in (
+        (anteile_gesamt, [GESAMT], gesamt_tabellen),
+        (anteile_gemeinden, pd.Series(sortiert["gruppen"]).map(gemeinde_namen).values, gemeinde_tabellen),
+    ):
+        tabelle = band_tabelle(anteile[:, : anzahl_varianten + 1, :], gruppen, labels_risiko)
+        tabelle["hoch_ab_0_pct"] = anteile[:, -1, :].ravel()
+        tabelle.insert(0, "Gewichtung", gewichtung)
+        ziel.append(tabelle)
+
+    if gewichtung == "Gebaeude":
+        gemeinde_anteile = anteile_gemeinden
+        gemeinde_gruppen = pd.Series(sortiert["gruppen"]).map(gemeinde_namen).values
+
+tabelle_gesamt = pd.concat(gesamt_tabellen, ignore_index=True)
+tabelle_gemeinden = pd.concat(gemeinde_tabellen, ignore_index=True)
+tabelle_gesamt.to_csv(os.path.join(output_dir, "sensitivitaet_gesamt.csv"), sep=";", index=False)
+tabelle_gemeinden.to_csv(os.path.join(output_dir, "sensitivitaet_gemeinden.csv"), sep=";", index=False)
+print(tabelle_gesamt)
+
+# === 4. Unsicherheitsband gesamt ===
+fig, axes = plt.subplots(1, len(gewichtungen), figsize=(14, 6), sharey=True)
+x = np.arange(len(labels_risiko))
+for ax, gewichtung in zip(axes, gewichtungen):
+    t = tabelle_gesamt[tabelle_gesamt["Gewichtung"] == gewichtung]
+    ax.bar(x, t["Basis_pct"], color=[farben[k] for k in labels_risiko], edgecolor="black")
+    ax.errorbar(
+        x, t["q50_pct"],
+        yerr=[t["q50_pct"] - t["q05_pct"], t["q95_pct"] - t["q50_pct"]],
+        fmt="o", color="black", capsize=6, label="Median, 5–95 % der Varianten",
+    )
+    ax.scatter(x, t["hoch_ab_0_pct"], marker="x", color="blue", zorder=3, label="hoch ab 0")
+    ax.set_xticks(x)
+    ax.set_xticklabels(labels_risiko)
+    ax.set_title(f"{gewichtung}")
+    ax.grid(axis="y", linestyle="--", alpha=0.5)
+axes[0].set_ylabel("Anteil in %")
+axes[0].legend(loc="upper left")
+fig.suptitle(f"Sensitivität der Klassenanteile gegenüber den Klassengrenzen (±{streuung}, {anzahl_varianten} Varianten)")
+plt.tight_layout()
+plt.show()
+
+# === 5. Unsicherheitsband je Gemeinde (Anteil "hoch" + "sehr hoch") ===
+hoch = [labels_risiko.index("hoch"), labels_risiko.index("sehr hoch")]
+hoch_anteile = gemeinde_anteile[:, : anzahl_varianten + 1, hoch].sum(axis=2)
+t = pd.DataFrame({
+    "Basis_pct": hoch_anteile[:, 0],
+    "q05_pct": np.nanquantile(hoch_anteile, 0.05, axis=1),
+    "q95_pct": np.nanquantile(hoch_anteile, 0.95, axis=1),
+}, index=gemeinde_gruppen).dropna().sort_values("Basis_pct", ascending=False)
+
+fig, ax = plt.subplots(figsize=(18, 8))
+x = np.arange(len(t))
+ax.fill_between(x, t["q05_pct"], t["q95_pct"], color="orange", alpha=0.4, label="5–95 % der Varianten")
+ax.plot(x, t["Basis_pct"], color="red", linewidth=1, label="Basis")
+ax.set_xlim(0, max(len(x) - 1, 1))
+ax.set_xlabel("Gemeinden (sortiert nach Anteil hoch + sehr hoch)")
+ax.set_ylabel("Anteil der Gebäude in %")
+ax.set_title("Anteil der Gebäude mit hohem oder sehr hohem Risiko je Gemeinde – Sensitivität der Klassengrenzen")
+ax.legend(loc="upper right")
+ax.grid(axis="y", linestyle="--", alpha=0.5)
+plt.tight_layout()
+plt.show()
@@ -1,8 +1,14 @@
 import geopandas as gpd
-import rasterio
 import pandas as pd
-import numpy as np
 import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from werkzeuge.gebaeude import lade_gebaeude_mit_risiko
+from werkzeuge.gebaeudetabelle import koordinaten
+from werkzeuge.gemeinden import AGS_FEHLT, AGS_SPALTE, ergaenze_gemeinden, gemeinde_schwerpunkte
+from werkzeuge.pixelindex import transformiere_punkte
+from werkzeuge.raster_speicher import oeffne_raster
 
 # === INPUT SETUP ===
 shapefile_path = "data/shapefiles/buildings_unterfranken.shp"
@@ -13,20 +19,8 @@ os.makedirs(output_dir, exist_ok=True)
 # Ausgabeordner für Ergebnisse
 output_shapefile = os.path.join(output_dir, "top20_gemeinden_unterfranken_risiko.shp")
 
-# === 1. Datei einlesen ===
-gdf = gpd.read_file(shapefile_path)
-
-# === 2. Raster einlesen und Risiko extrahieren
-with rasterio.open(raster_path) as src:
-    # reprojizieren, falls nötig
-    if gdf.crs != src.crs:
-        gdf = gdf.to_crs(src.crs)
-
-    coords = [(geom.x, geom.y) for geom in gdf.geometry]
-    risiko_values = [val[0] if val[0] != src.nodata else np.nan for val in src.sample(coords)]
-
-# Risiko-Werte zum GeoDataFrame hinzufügen
-gdf["Risiko"] = risiko_values
+# === 1.-2. Datei einlesen und Risiko aus dem Raster extrahieren ===
+gdf = lade_gebaeude_mit_risiko(shapefile_path, raster_path)
 
 # === 3. Risikoklassen zuordnen ===
 bins_risiko = [-18.459, -10.999, -6.982, -2.62, 2.546, 10.81]
@@ -36,8 +30,12 @@ gdf = gdf.dropna(subset=["Risiko"])  # nur gültige Werte behalten
 gdf["Risiko_Klasse"] = pd.cut(gdf["Risiko"], bins=bins_risiko, labels=labels_risiko, include_lowest=True)
 
 # === 4. Risikostatistik pro Gemeinde berechnen ===
+# Gebäude räumlich ihrer Gemeinde (AGS aus VG5000_GEM) zuordnen
+gdf, gemeinde_namen = ergaenze_gemeinden(gdf)
+gdf = gdf[gdf[AGS_SPALTE] != AGS_FEHLT]
+
 # Gebäude pro Gemeinde + Risiko-Klasse zählen
-risiko_counts = gdf.groupby(["LocalityNa", "Risiko_Klasse"]).size().unstack(fill_value=0)
+risiko_counts = gdf.groupby([AGS_SPALTE, "Risiko_Klasse"], observed=False).size().unstack(fill_value=0)
 
 # fehlende Klassen ergänzen
 for rk in labels_risiko:
@@ -64,19 +62,28 @@ gemeinden_hoch = top20_hoch.index.tolist()
 gemeinden_niedrig = top20_niedrig.index.tolist()
 
 # nur gültige Gebäude behalten
-gdf_valid = gdf.dropna(subset=["Risiko_Klasse", "LocalityNa"])
-
-# Schwerpunktpunkte pro Gemeinde
-gemeinde_dissolved = gdf_valid.dissolve(by="LocalityNa", as_index=False)
-gemeinde_centroids = gemeinde_dissolved.centroid
+gdf_valid = gdf.dropna(subset=["Risiko_Klasse"])
+# Schwerpunkte wie bisher im CRS des Rasters (auch das Ausgabe-Shapefile)
+crs_raster = oeffne_raster(raster_path).crs
+x_valid, y_valid = transformiere_punkte(*koordinaten(gdf_valid), crs_raster)
+
+# Schwerpunktpunkte nur für die ausgewählten Gemeinden
+# (Mittelwert der Gebäudekoordinaten, entspricht dem Zentroid nach dissolve)
+schwerpunkte = gemeinde_schwerpunkte(
+    gdf_valid[AGS_SPALTE].values,
+    x_valid,
+    y_valid,
+    gemeinden_hoch + gemeinden_niedrig,
+)
 gemeinde_punkte = gpd.GeoDataFrame({
-    "LocalityNa": gemeinde_dissolved["LocalityNa"],
-    "geometry": gemeinde_centroids
-}, crs=gdf.crs)
+    AGS_SPALTE: schwerpunkte[AGS_SPALTE],
+    "GEN": schwerpunkte[AGS_SPALTE].map(gemeinde_namen),
+    "geometry": gpd.points_from_xy(schwerpunkte["x"], schwerpunkte["y"])
+}, crs=crs_raster)
 
 # Top-Gemeinden herausfiltern
-punkte_hoch = gemeinde_punkte[gemeinde_punkte["LocalityNa"].isin(gemeinden_hoch)]
-punkte_niedrig = gemeinde_punkte[gemeinde_punkte["LocalityNa"].isin(gemeinden_niedrig)]
+punkte_hoch = gemeinde_punkte[gemeinde_punkte[AGS_SPALTE].isin(gemeinden_hoch)]
+punkte_niedrig = gemeinde_punkte[gemeinde_punkte[AGS_SPALTE].isin(gemeinden_niedrig)]
 
 # Risikogruppen kennzeichnen
 punkte_hoch["risikogruppe"] = "hoch"
@@ -84,7 +91,7 @@ punkte_niedrig["risikogruppe"] = "niedrig"
 
 # Kombination
 punkte_gesamt = pd.concat([punkte_hoch, punkte_niedrig])
-punkte_gesamt = gpd.GeoDataFrame(punkte_gesamt, geometry="geometry", crs=gdf.crs)
+punkte_gesamt = gpd.GeoDataFrame(punkte_gesamt, geometry="geometry", crs=crs_raster)
 
 # === 6. Ergebnis speichern ===
 punkte_gesamt.to_file(output_shapefile, driver="ESRI Shapefile")
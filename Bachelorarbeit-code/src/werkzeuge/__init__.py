@@ -0,0 +1,4 @@
+# Gemeinsame Hilfsfunktionen für die Skripte in histogramme/ und weitere_scripts/.
+#
+# Die Skripte binden das Paket über den src-Ordner ein:
+#   sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
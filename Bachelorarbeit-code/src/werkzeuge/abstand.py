@@ -0,0 +1,115 @@
+# Abstand jedes Rasterpixels zum nächsten Pixel einer Risikoklasse (z. B. "sehr hoch").
+#
+# Die euklidische Distanztransformation (scipy.ndimage.distance_transform_edt) läuft
+# einmal über das klassifizierte Raster, fensterweise mit einem Überlappungsrand
+# (halo) von max_abstand: Liegt das nächste Zielpixel höchstens max_abstand entfernt,
+# liegt es innerhalb des erweiterten Fensters und der Abstand ist exakt. Größere
+# Abstände werden als inf gespeichert. Das Ergebnis ist eine float32-memmap auf
+# demselben Gitter wie das Risikoraster, Gebäude und Zensuszellen werden also über
+# den vorhandenen Pixelindex (werkzeuge/pixelindex.py) ausgelesen.
+
+import json
+import os
+
+import numpy as np
+from scipy import ndimage
+
+from werkzeuge.raster_speicher import RasterSpeicher, oeffne_raster
+from werkzeuge.risiko import CODE_FEHLT, bins_risiko, labels_risiko, risiko_codes
+
+# Grenzen der Abstandsbänder in Metern (letztes Band: ab der letzten Grenze)
+ABSTAND_GRENZEN = [0, 50, 200, 500, 1000, 2000]
+
+
+# === 1. Abstandsbänder ===
+
+def abstand_labels(grenzen=ABSTAND_GRENZEN):
+    """Beschriftungen der Abstandsbänder, z. B. "0–50 m", ..., "≥ 2000 m"."""
+    labels = [f"{unten}–{oben} m" for unten, oben in zip(grenzen[:-1], grenzen[1:])]
+    return labels + [f"≥ {grenzen[-1]} m"]
+
+
+def abstand_codes(abstand, grenzen=ABSTAND_GRENZEN):
+    """Band 0..len(grenzen)-1 je Abstand (Intervalle links geschlossen), NaN -> CODE_FEHLT."""
+    abstand = np.asarray(abstand, dtype="float64")
+    codes = np.searchsorted(np.asarray(grenzen, dtype="float64")[1:], abstand, side="right")
+    codes[np.isnan(abstand)] = CODE_FEHLT
+    return codes.astype("int8")
+
+
+# === 2. Distanztransformation ===
+
+def _abstand_pfad(raster, klassen, max_abstand):
+    name = "_".join(k.replace(" ", "_") for k in klassen)
+    return os.path.splitext(raster.pfad)[0] + f"__abstand_{name}_{max_abstand:g}m.npy"
+
+
+def abstand_raster(raster, klassen=("sehr hoch",), max_abstand=ABSTAND_GRENZEN[-1], fenster=2048,
+                   bins=bins_risiko):
+    """
+    Schreibt den Abstand in Metern zum nächsten Pixel der Klassen als .npy neben das Raster.
+
+    Pixel ohne Rasterwert erhalten NaN, Pixel ohne Zielpixel im Umkreis von max_abstand
+    inf. Ein vorhandenes Ergebnis wird nur neu berechnet, wenn sich das Raster oder
+    die Parameter geändert haben. Rückgabe: Pfad der .npy-Datei.
+    """
+    npy_pfad = _abstand_pfad(raster, klassen, max_abstand)
+    meta_pfad = npy_pfad + ".json"
+    parameter = {
+        "quelle_mtime_ns": os.stat(raster.pfad).st_mtime_ns,
+        "klassen": list(klassen),
+        "max_abstand": max_abstand,
+        "bins": list(bins),
+    }
+    if os.path.exists(npy_pfad) and os.path.exists(meta_pfad):
+        with open(meta_pfad, encoding="utf-8") as f:
+            meta = json.load(f)
+        if all(meta.get(k) == v for k, v in parameter.items()):
+            return npy_pfad
+
+    ziel_codes = [labels_risiko.index(k) for k in klassen]
+    pixel_y, pixel_x = abs(raster.transform.e), abs(raster.transform.a)
+    halo = int(np.ceil(max_abstand / min(pixel_x, pixel_y)))
+    hoehe, breite = raster.shape
+
+    tmp = npy_pfad + ".tmp.npy"
+    ergebnis = np.lib.format.open_memmap(tmp, mode="w+", dtype="float32", shape=(hoehe, breite))
+    for zeile0 in range(0, hoehe, fenster):
+        for spalte0 in range(0, breite, fenster):
+            zeile1, spalte1 = min(zeile0 + fenster, hoehe), min(spalte0 + fenster, breite)
+            # Fenster mit Überlappungsrand
+            z0, s0 = max(zeile0 - halo, 0), max(spalte0 - halo, 0)
+            z1, s1 = min(zeile1 + halo, hoehe), min(spalte1 + halo, breite)
+            werte = raster.daten[z0:z1, s0:s1].astype("float64")
+            if raster.nodata is not None:
+                werte[werte == raster.nodata] = np.nan
+            treffer = np.isin(risiko_codes(werte, bins), ziel_codes)
+
+            innen = (slice(zeile0 - z0, zeile1 - z0), slice(spalte0 - s0, spalte1 - s0))
+            if treffer.any():
+                abstand = ndimage.distance_transform_edt(~treffer, sampling=(pixel_y, pixel_x))[innen]
+                abstand[abstand > max_abstand] = np.inf
+            else:
+                abstand = np.full(werte[innen].shape, np.inf)
+            abstand[np.isnan(werte[innen])] = np.nan
+            ergebnis[zeile0:zeile1, spalte0:spalte1] = abstand
+    ergebnis.flush()
+    del ergebnis
+    os.replace(tmp, npy_pfad)
+
+    meta = {
+        "transform": list(raster.transform)[:6],
+        "crs": raster.crs,
+        "nodata": None,
+        "quelle": os.path.abspath(raster.pfad),
+        **parameter,
+    }
+    with open(meta_pfad, "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+    print(f"Abstandsraster gespeichert: {npy_pfad}")
+    return npy_pfad
+
+
+def oeffne_abstand(tif_pfad, klassen=("sehr hoch",), max_abstand=ABSTAND_GRENZEN[-1]):
+    """Öffnet das Abstandsraster zum Risikoraster als RasterSpeicher und berechnet es bei Bedarf."""
+    return RasterSpeicher(abstand_raster(oeffne_raster(tif_pfad), klassen, max_abstand))
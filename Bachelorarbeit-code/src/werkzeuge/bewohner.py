@@ -0,0 +1,137 @@
+# Verteilung der Zensus-Einwohner einer Gitterzelle auf ihre Gebäude nach
+# mehreren Gewichtungsschemata in einem Durchlauf.
+#
+# Jedes Schema liefert ein Gewicht je Gebäude (Volumen, Geschossfläche mit
+# globaler oder gemeindeweiser Stockwerkshöhe, gekappte Höhen ...). Alle Gewichte
+# stehen in einer Matrix (Gebäude × Schemata); die Zellsummen entstehen mit einem
+# einzigen np.bincount über Zelle und Schema.
+
+import numpy as np
+import pandas as pd
+
+from werkzeuge.gemeinden import AGS_SPALTE
+
+# Präfix der Ergebnisspalten
+SPALTEN_PRAEFIX = "geb_bewohner_"
+
+# Name -> Einstellungen
+#   gewicht:        "volume" (Grundfläche × Höhe) oder "floorArea" (Grundfläche × Stockwerke)
+#   stockwerkhoehe: "global" oder "gemeinde" (Mittel der Gebäude mit Höhe und Stockwerken je AGS)
+#   max_hoehe:      Höhen oberhalb dieses Werts (m) werden gekappt
+STANDARD_SCHEMATA = {
+    "volume": {"gewicht": "volume"},
+    "floorArea": {"gewicht": "floorArea", "stockwerkhoehe": "global"},
+    "floorArea_gem": {"gewicht": "floorArea", "stockwerkhoehe": "gemeinde"},
+    "volume_max30": {"gewicht": "volume", "max_hoehe": 30.0},
+    "floorArea_max30": {"gewicht": "floorArea", "stockwerkhoehe": "global", "max_hoehe": 30.0},
+}
+
+
+# === 1. Stockwerkshöhen ===
+
+def stockwerkhoehen(df, art="global"):
+    """
+    Mittlere Stockwerkshöhe je Gebäude (measuredHe / storeysAbo).
+
+    "global": ein Mittelwert über alle Gebäude mit Höhe und Stockwerken.
+    "gemeinde": Mittelwert je AGS, Gemeinden ohne solche Gebäude erhalten den globalen Wert.
+    """
+    hoehe = df["measuredHe"].to_numpy(dtype="float64")
+    stockwerke = df["storeysAbo"].to_numpy(dtype="float64")
+    gueltig = ~np.isnan(hoehe) & ~np.isnan(stockwerke) & (stockwerke > 0)
+    je_stockwerk = hoehe[gueltig] / stockwerke[gueltig]
+    global_mittel = je_stockwerk.mean()
+
+    if art == "global":
+        return np.full(len(df), global_mittel)
+    if art != "gemeinde":
+        raise ValueError(f"Unbekannte Stockwerkshöhe: {art}")
+
+    ags = df[AGS_SPALTE].to_numpy()
+    mittel = pd.Series(je_stockwerk).groupby(ags[gueltig]).mean()
+    return pd.Series(ags).map(mittel).fillna(global_mittel).to_numpy()
+
+
+# === 2. Gewichte aller Schemata ===
+
+def schema_gewichte(df, schemata=STANDARD_SCHEMATA):
+    """Gewichtsmatrix (Gebäude × Schemata) aus Grundfläche, Höhe und Stockwerken."""
+    flaeche = df["area"].to_numpy(dtype="float64")
+    hoehe_roh = df["measuredHe"].to_numpy(dtype="float64")
+    stockwerke_roh = df["storeysAbo"].to_numpy(dtype="float64")
+    hoehen_cache = {}
+
+    gewichte = np.empty((len(df), len(schemata)))
+    for i, einstellung in enumerate(schemata.values()):
+        hoehe = hoehe_roh
+        if einstellung.get("max_hoehe") is not None:
+            hoehe = np.minimum(hoehe, einstellung["max_hoehe"])
+
+        if einstellung["gewicht"] == "volume":
+            gewichte[:, i] = flaeche * hoehe
+        elif einstellung["gewicht"] == "floorArea":
+            art = einstellung.get("stockwerkhoehe", "global")
+            if art not in hoehen_cache:
+                hoehen_cache[art] = stockwerkhoehen(df, art)
+            stockwerke = np.round(np.where(np.isnan(stockwerke_roh), hoehe / hoehen_cache[art], stockwerke_roh))
+            if einstellung.get("max_hoehe") is not None:
+                stockwerke = np.minimum(stockwerke, np.round(einstellung["max_hoehe"] / hoehen_cache[art]))
+            gewichte[:, i] = flaeche * stockwerke
+        else:
+            raise ValueError(f"Unbekanntes Gewicht: {einstellung['gewicht']}")
+    return gewichte
+
+
+# === 3. Einwohner verteilen ===
+
+def verteile_bewohner(df, zellen_spalte, schemata=STANDARD_SCHEMATA):
+    """
+    Einwohner der Zelle anteilig nach jedem Schema auf die Gebäude verteilen.
+
+    Entspricht je Schema (gewicht / Zellsumme der Gewichte) * Einwohner wie in
+    main_gebaeudedaten.py. Gebäude ohne Zelle oder ohne Gewicht erhalten NaN.
+    Liefert einen DataFrame mit den Spalten geb_bewohner_<Schema>.
+    """
+    gewichte = schema_gewichte(df, schemata)
+    anzahl_schemata = gewichte.shape[1]
+    zellen, _ = pd.factorize(df[zellen_spalte])
+    anzahl_zellen = max(zellen.max() + 1, 1) if len(zellen) else 1
+
+    gueltig = (zellen >= 0)[:, None] & ~np.isnan(gewichte)
+    index = zellen[:, None] * anzahl_schemata + np.arange(anzahl_schemata)[None, :]
+    summen = np.bincount(
+        index[gueltig], weights=gewichte[gueltig], minlength=anzahl_zellen * anzahl_schemata
+    ).reshape(anzahl_zellen, anzahl_schemata)
+
+    einwohner = pd.to_numeric(df["Einwohner"], errors="coerce").to_numpy(dtype="float64")
+    with np.errstate(invalid="ignore", divide="ignore"):
+        bewohner = gewichte / summen[np.maximum(zellen, 0)] * einwohner[:, None]
+    bewohner[~gueltig] = np.nan
+
+    return pd.DataFrame(
+        bewohner, index=df.index, columns=[SPALTEN_PRAEFIX + name for name in schemata]
+    )
+
+
+# === 4. Kennzahlen je Schema ===
+
+def schema_statistik(bewohner, referenz="volume"):
+    """Kennzahlen je Schema sowie die Abweichung zum Referenzschema."""
+    ref = bewohner[SPALTEN_PRAEFIX + referenz]
+    zeilen = []
+    for spalte in bewohner.columns:
+        werte = bewohner[spalte]
+        beide = werte.notna() & ref.notna()
+        zeilen.append({
+            "Schema": spalte[len(SPALTEN_PRAEFIX):],
+            "Gebaeude": int(werte.notna().sum()),
+            "Bewohner_summe": werte.sum(),
+            "Mittel": werte.mean(),
+            "Median": werte.median(),
+            "P95": werte.quantile(0.95),
+            "Max": werte.max(),
+            f"MAE_zu_{referenz}": (werte[beide] - ref[beide]).abs().mean(),
+            f"Anteil_abw_10pct_zu_{referenz}": ((werte[beide] - ref[beide]).abs() > 0.1 * ref[beide]).mean(),
+            f"Korrelation_zu_{referenz}": werte[beide].corr(ref[beide]),
+        })
+    return pd.DataFrame(zeilen)
@@ -0,0 +1,76 @@
+# Bootstrap-Konfidenzintervalle für Klassenanteile (z. B. Einwohner je Risikoklasse).
+#
+# Resampling der Zellen (oder Gebäude) mit Zurücklegen: Jedes Replikat zieht n
+# Indizes, die Ziehungshäufigkeiten (multinomiale Gewichte) entstehen mit einem
+# np.bincount über alle Replikate eines Blocks. Die Klassensummen aller Replikate
+# des Blocks sind dann je Klasse ein Matrixprodukt Häufigkeiten × Gewichte.
+# Die Replikate werden blockweise verarbeitet, damit der Speicher begrenzt bleibt.
+
+import numpy as np
+
+
+# === 1. Klassensummen ===
+
+def _klassen_summen(haeufigkeit, gewichte, grenzen):
+    """
+    Gewichtete Summen je Klasse und Gruppe für jede Zeile von haeufigkeit, Form (..., Klassen, Gruppen).
+
+    Die Zellen sind nach Klasse sortiert; Klasse k umfasst die Zellen grenzen[k]:grenzen[k + 1].
+    """
+    return np.stack([
+        haeufigkeit[..., a:b] @ gewichte[a:b] for a, b in zip(grenzen[:-1], grenzen[1:])
+    ], axis=-2)
+
+
+def _anteile(summen):
+    """Summen (..., Klassen, Gruppen) -> Anteile in % je Gruppe."""
+    gesamt = summen.sum(axis=-2, keepdims=True)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(gesamt > 0, summen / gesamt * 100, np.nan)
+
+
+# === 2. Bootstrap ===
+
+def bootstrap_anteile(codes, gewichte, anzahl_klassen, replikate=1000, konfidenz=0.95,
+                      max_elemente=4_000_000, seed=0):
+    """
+    Klassenanteile mit Bootstrap-Konfidenzintervall.
+
+    codes: Klassen-Code je Zelle (0..anzahl_klassen-1, andere Codes werden ignoriert).
+    gewichte: Array (n,) oder (n, Gruppen), z. B. Einwohner und Ü65 oder Altersgruppen.
+    Die Anteile beziehen sich je Gruppe auf die Summe über alle anzahl_klassen Klassen.
+    max_elemente begrenzt die Größe eines Replikat-Blocks (Replikate × Zellen).
+
+    Rückgabe: Dict mit "anteil", "unten", "oben" (jeweils Klassen × Gruppen, in %).
+    """
+    codes = np.asarray(codes)
+    gewichte = np.asarray(gewichte, dtype="float64")
+    if gewichte.ndim == 1:
+        gewichte = gewichte[:, None]
+    gewichte = np.nan_to_num(gewichte)
+
+    # Nur Zellen mit gültiger Klasse werden gezogen, sortiert nach Klasse
+    gueltig = (codes >= 0) & (codes < anzahl_klassen)
+    reihenfolge = np.argsort(codes[gueltig], kind="stable")
+    codes, gewichte = codes[gueltig][reihenfolge], gewichte[gueltig][reihenfolge]
+    grenzen = np.searchsorted(codes, np.arange(anzahl_klassen + 1))
+    n = len(codes)
+    rng = np.random.default_rng(seed)
+
+    block = max(1, min(replikate, max_elemente // max(n, 1)))
+    ergebnisse = []
+    for start in range(0, replikate, block):
+        anzahl = min(block, replikate - start)
+        gezogen = rng.integers(0, n, size=(anzahl, n))
+        gezogen += (np.arange(anzahl) * n)[:, None]
+        haeufigkeit = np.bincount(gezogen.ravel(), minlength=anzahl * n).reshape(anzahl, n).astype("float64")
+        ergebnisse.append(_anteile(_klassen_summen(haeufigkeit, gewichte, grenzen)))
+    verteilung = np.concatenate(ergebnisse)  # (Replikate, Klassen, Gruppen)
+
+    alpha = (1 - konfidenz) / 2
+    unten, oben = np.nanquantile(verteilung, [alpha, 1 - alpha], axis=0)
+    return {
+        "anteil": _anteile(_klassen_summen(np.ones(n), gewichte, grenzen)),
+        "unten": unten,
+        "oben": oben,
+    }
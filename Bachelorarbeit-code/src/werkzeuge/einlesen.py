@@ -0,0 +1,79 @@
+# Einlesen von Vektordaten mit Auswahl direkt beim Lesen.
+#
+# Statt eine ganze Ebene zu laden und danach z. B. auf drei Städte zu filtern, werden
+# Attributfilter, Ausschnitt (bbox) und Spaltenauswahl an die Leseschicht übergeben:
+# - Shapefile/GeoPackage: OGR-SQL-where, bbox und columns (pyogrio)
+# - Parquet: filters (pyarrow, überspringt Zeilengruppen anhand der Statistiken) und columns
+#
+# auswahl ist ein Dict Spalte -> zulässige Werte, z. B. {"GEN": ["Würzburg", "Schweinfurt"]};
+# mehrere Spalten werden mit UND verknüpft.
+
+import geopandas as gpd
+import pandas as pd
+import pyogrio
+
+from werkzeuge.raumordnung import transformiere_bbox
+
+
+# === 1. Filter übersetzen ===
+
+def _sql_wert(wert):
+    if isinstance(wert, str):
+        return "'" + wert.replace("'", "''") + "'"
+    return repr(wert)
+
+
+def sql_where(auswahl):
+    """OGR-SQL-Bedingung zu einer Auswahl, z. B. "GEN" IN ('Würzburg', 'Schweinfurt')."""
+    if not auswahl:
+        return None
+    return " AND ".join(
+        f'"{spalte}" IN ({", ".join(_sql_wert(w) for w in werte)})' for spalte, werte in auswahl.items()
+    )
+
+
+def parquet_filter(auswahl):
+    """pyarrow-Filter zu einer Auswahl, z. B. [("GEN", "in", ["Würzburg", "Schweinfurt"])]."""
+    if not auswahl:
+        return None
+    return [(spalte, "in", list(werte)) for spalte, werte in auswahl.items()]
+
+
+def mit_auswahl_spalten(spalten, auswahl, *weitere):
+    """Spaltenauswahl um die Filterspalten (und weitere) ergänzt; None bleibt None (alle Spalten)."""
+    if spalten is None:
+        return None
+    ergebnis = list(spalten)
+    for spalte in [*(auswahl or {}), *weitere]:
+        if spalte not in ergebnis:
+            ergebnis.append(spalte)
+    return ergebnis
+
+
+# === 2. Ebene lesen ===
+
+def lade_ebene(pfad, spalten=None, auswahl=None, bbox=None, crs=None, geometrie=True):
+    """
+    Liest eine Vektorebene mit Spaltenauswahl, Attributfilter und Ausschnitt.
+
+    bbox (xmin, ymin, xmax, ymax) im CRS crs (Standard: CRS der Ebene); es zählen alle
+    Objekte, deren Ausdehnung die bbox schneidet. Mit geometrie=False kommt eine
+    DataFrame ohne Geometrie zurück (nur Attribute werden gelesen).
+    """
+    spalten = mit_auswahl_spalten(spalten, auswahl)
+    if str(pfad).endswith(".parquet"):
+        lesen = None if spalten is None else spalten + ["geometry"]
+        gdf = gpd.read_parquet(pfad, columns=lesen, filters=parquet_filter(auswahl))
+        if bbox is not None:
+            if crs is not None:
+                bbox = transformiere_bbox(bbox, crs, gdf.crs)
+            gdf = gdf.cx[bbox[0]:bbox[2], bbox[1]:bbox[3]]
+        gdf = gdf.reset_index(drop=True)
+        return gdf if geometrie else pd.DataFrame(gdf.drop(columns=gdf.geometry.name))
+
+    if bbox is not None and crs is not None:
+        bbox = transformiere_bbox(bbox, crs, pyogrio.read_info(pfad)["crs"])
+    return gpd.read_file(
+        pfad, engine="pyogrio", columns=spalten, where=sql_where(auswahl),
+        bbox=None if bbox is None else tuple(bbox), ignore_geometry=not geometrie,
+    )
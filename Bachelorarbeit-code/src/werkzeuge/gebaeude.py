@@ -0,0 +1,96 @@
+# Laden der Gebäudepunkte mit Risikowert aus dem Hochwasserraster.
+#
+# Die Gebäude kommen als Punkt-GeoDataFrame (Shapefile) oder als kompakte Tabelle
+# (.parquet aus main_gebaeudetabelle.py, werkzeuge/gebaeudetabelle.py); alle
+# Funktionen arbeiten mit beiden.
+
+import pandas as pd
+
+from werkzeuge.gebaeudetabelle import GEBAEUDE_CRS, ist_kompakt, kompakte_tabelle, koordinaten, lade_kompakt
+from werkzeuge.grundriss import SPALTE_MAX, SPALTE_MITTEL
+from werkzeuge.einlesen import lade_ebene, mit_auswahl_spalten
+from werkzeuge.pixelindex import pixel_index, sammle, transformiere_punkte
+from werkzeuge.raster_speicher import oeffne_raster
+
+# Risikowert je Gebäude: Zentroid oder Kennwert des Grundrisses
+MODI = {"punkt": "Risiko", "max": SPALTE_MAX, "mittel": SPALTE_MITTEL}
+
+
+# === 1. MultiPoints aufspalten ===
+
+def explode_multipoints(gdf):
+    """Zerlegt MultiPoint-Geometrien in einzelne Punkte, andere Geometrien entfallen."""
+    gdf = gdf[gdf.geometry.notna()].explode(index_parts=False)
+    return gdf[gdf.geometry.geom_type == "Point"]
+
+
+def lade_gebaeude(pfad, kompakt=False, spalten=None, auswahl=None, bbox=None, crs=None):
+    """
+    Gebäudepunkte aus einem Shapefile (GeoDataFrame) oder einer kompakten Tabelle (.parquet).
+
+    spalten, auswahl (Spalte -> Werte) und bbox (im CRS crs, Standard: CRS der Datei)
+    werden beim Lesen angewendet (werkzeuge/einlesen.py), es wird also nur gelesen,
+    was gebraucht wird.
+    """
+    if str(pfad).endswith(".parquet"):
+        return lade_kompakt(pfad, spalten, bbox, crs or GEBAEUDE_CRS, auswahl)
+    gdf = explode_multipoints(lade_ebene(pfad, spalten, auswahl, bbox, crs))
+    return kompakte_tabelle(gdf) if kompakt else gdf
+
+
+# === 2. Gebäude mit Risikowert ===
+
+def lade_gebaeude_mit_risiko(shapefile_path, raster_path, abstand=None, exposition=None, modus="punkt",
+                             kompakt=False, spalten=None, auswahl=None, bbox=None, crs=None):
+    """
+    Lädt die Gebäudepunkte und ergänzt die Spalte "Risiko" (nodata -> NaN).
+
+    Das Raster wird als memmap gelesen; die Pixelzuordnung der Gebäude wird
+    je Rastergitter einmal gespeichert (werkzeuge/pixelindex.py), sodass
+    weitere Läufe nur noch einen NumPy-Gather benötigen. Mit abstand (Abstandsraster
+    auf demselben Gitter, werkzeuge/abstand.py) kommt die Spalte "Abstand" hinzu.
+
+    Mit exposition (Parquet aus main_grundriss_exposition.py) werden die Kennwerte
+    der Grundrisse über gml_id ergänzt; modus="max" oder "mittel" ersetzt dann
+    "Risiko" durch den maximalen bzw. flächengewichteten mittleren Wert des
+    Grundrisses (der Wert am Zentroid bleibt als "Risiko_punkt" erhalten).
+
+    Mit kompakt=True (oder einer .parquet-Datei als Quelle) kommt statt der
+    GeoDataFrame die kompakte Tabelle zurück, die Rasterwerte dann als float32.
+
+    spalten, auswahl und bbox schränken das Einlesen ein (siehe lade_gebaeude), z. B.
+    spalten=["LocalityNa"], auswahl={"LocalityNa": ["Würzburg"]}. Für solche Teilmengen
+    wird der Pixelindex direkt berechnet statt gespeichert.
+    """
+    spalten = mit_auswahl_spalten(spalten, None, *(["gml_id"] if exposition is not None else []))
+    gdf = lade_gebaeude(shapefile_path, kompakt, spalten, auswahl, bbox, crs)
+    raster = oeffne_raster(raster_path)
+    x, y, gdf_crs = koordinaten(gdf)
+    if auswahl is None and bbox is None:
+        index = pixel_index(shapefile_path, raster, x, y, gdf_crs, name="gebaeude")
+    else:
+        index = raster.zeilen_spalten(*transformiere_punkte(x, y, gdf_crs, raster.crs))
+    dtype = "float32" if ist_kompakt(gdf) else "float64"
+    gdf["Risiko"] = sammle(raster, index).astype(dtype)
+    if abstand is not None:
+        gdf["Abstand"] = sammle(abstand, index).astype(dtype)
+    if exposition is not None:
+        gdf = ergaenze_exposition(gdf, exposition, modus)
+    return gdf
+
+
+# === 3. Exposition der Grundrisse ===
+
+def ergaenze_exposition(gdf, exposition_path, modus="max"):
+    """Ergänzt die Grundriss-Kennwerte über gml_id und wählt die Spalte für "Risiko" (punkt, max, mittel)."""
+    if modus not in MODI:
+        raise ValueError(f"Unbekannter Modus: {modus} (erlaubt: {', '.join(MODI)})")
+    if "gml_id" not in gdf.columns:
+        raise KeyError("Spalte 'gml_id' nicht gefunden, Grundrisse können nicht zugeordnet werden!")
+    # je gml_id nur eine Zeile, sonst würden Gebäude beim Zusammenführen vervielfacht
+    exposition = pd.read_parquet(exposition_path).drop_duplicates("gml_id")
+    gdf = gdf.merge(exposition, on="gml_id", how="left", validate="many_to_one")
+    if modus != "punkt":
+        gdf["Risiko_punkt"] = gdf["Risiko"]
+        gdf["Risiko"] = gdf[MODI[modus]].astype(gdf["Risiko_punkt"].dtype)
+    return gdf
@@ -0,0 +1,160 @@
+# Kompakte Gebäudetabelle: flache Spalten statt GeoDataFrame mit Punktobjekten.
+#
+# Eine GeoDataFrame der Gebäudepunkte hält je Gebäude ein shapely-Punktobjekt,
+# Python-Strings in den Textspalten und float64-Zahlen. Die kompakte Tabelle ist ein
+# DataFrame aus NumPy-/Arrow-Spalten:
+# - x, y: float32-Abstände zu einem festen Ursprung in EPSG:25832 (auf unter 1 cm
+#   genau im Umkreis von 130 km; absolute UTM-Koordinaten wären in float32 nur auf
+#   etwa 0,5 m genau)
+# - Textspalten (LocalityNa, Thoroughfa, function, ...) als Kategorien (int-Codes)
+# - gml_id als Arrow-String ohne Python-Objekt je Zeile
+# - Kommazahlen als float32; Schlüssel (gitter_key, AGS) als ganze Zahlen mit fehlenden
+#   Werten (Int64/Int32), da float32 die zehnstelligen Gitter-Schlüssel runden würde
+# - nicht benötigte Spalten (creationDa) entfallen
+#
+# Die Auswertungen lesen Koordinaten über koordinaten(), das für GeoDataFrames und
+# kompakte Tabellen dasselbe liefert.
+#
+# Gespeichert wird die Tabelle entlang einer Hilbert-Kurve sortiert, mit der
+# Ausdehnung jeder Zeilengruppe in den Metadaten (werkzeuge/raumordnung.py);
+# lade_kompakt(..., bbox=...) liest dann nur die betroffenen Zeilengruppen.
+
+import sys
+
+import geopandas as gpd
+import pandas as pd
+import pyarrow.parquet as pq
+
+from werkzeuge.einlesen import mit_auswahl_spalten, parquet_filter
+from werkzeuge.gitter import SCHLUESSEL_SPALTE
+from werkzeuge.pixelindex import transformiere_punkte
+from werkzeuge.raumordnung import (
+    in_bbox, lade_zeilengruppen, raeumliche_reihenfolge, schreibe_zeilengruppen, transformiere_bbox,
+)
+
+GEBAEUDE_CRS = "EPSG:25832"
+# Mitte von Unterfranken (gerundet)
+URSPRUNG = (570_000.0, 5_520_000.0)
+
+X_SPALTE = "x"
+Y_SPALTE = "y"
+
+# Eindeutige Kennungen bleiben Text (Kategorien würden nichts sparen)
+TEXT_SPALTEN = ("gml_id",)
+UNGENUTZTE_SPALTEN = ("creationDa",)
+# Schlüsselspalten mit ihrem ganzzahligen Typ; nach einem Left-Join (Gebäude ohne Zelle)
+# kommen sie als float64 mit NaN an. "AGS" wie werkzeuge.gemeinden.AGS_SPALTE
+# (gemeinden.py importiert dieses Modul).
+SCHLUESSEL_SPALTEN = {SCHLUESSEL_SPALTE: "Int64", "AGS": "Int32"}
+
+
+# === 1. Umwandeln ===
+
+def ist_kompakt(tabelle):
+    """True für eine kompakte Gebäudetabelle (keine GeoDataFrame, Spalten x und y)."""
+    return not isinstance(tabelle, gpd.GeoDataFrame) and {X_SPALTE, Y_SPALTE} <= set(tabelle.columns)
+
+
+def kompakte_tabelle(gdf):
+    """Wandelt eine Punkt-GeoDataFrame in die kompakte Tabelle um."""
+    x, y = transformiere_punkte(gdf.geometry.x.values, gdf.geometry.y.values, gdf.crs, GEBAEUDE_CRS)
+    tabelle = pd.DataFrame({
+        X_SPALTE: (x - URSPRUNG[0]).astype("float32"),
+        Y_SPALTE: (y - URSPRUNG[1]).astype("float32"),
+    })
+    for spalte in gdf.columns:
+        if spalte == gdf.geometry.name or spalte in UNGENUTZTE_SPALTEN:
+            continue
+        werte = gdf[spalte].reset_index(drop=True)
+        if spalte in TEXT_SPALTEN:
+            werte = werte.astype("string[pyarrow]")
+        elif spalte in SCHLUESSEL_SPALTEN:
+            werte = werte.astype(SCHLUESSEL_SPALTEN[spalte])
+        elif pd.api.types.is_float_dtype(werte):
+            werte = werte.astype("float32")
+        elif pd.api.types.is_string_dtype(werte) or werte.dtype == object:
+            werte = werte.astype("category")
+        tabelle[spalte] = werte
+    return tabelle
+
+
+def koordinaten(tabelle):
+    """Koordinaten (x, y als float64) und CRS einer GeoDataFrame oder kompakten Tabelle."""
+    if isinstance(tabelle, gpd.GeoDataFrame):
+        return tabelle.geometry.x.values, tabelle.geometry.y.values, tabelle.crs
+    x = tabelle[X_SPALTE].to_numpy(dtype="float64") + URSPRUNG[0]
+    y = tabelle[Y_SPALTE].to_numpy(dtype="float64") + URSPRUNG[1]
+    return x, y, GEBAEUDE_CRS
+
+
+def als_geodataframe(tabelle):
+    """Kompakte Tabelle zurück in eine Punkt-GeoDataFrame (z. B. zum Schreiben von Shapefiles)."""
+    x, y, crs = koordinaten(tabelle)
+    return gpd.GeoDataFrame(tabelle.drop(columns=[X_SPALTE, Y_SPALTE]), geometry=gpd.points_from_xy(x, y),
+                            crs=crs)
+
+
+# === 2. Speichern und Laden ===
+
+def raeumlich_sortiert(tabelle):
+    """Gebäude entlang der Hilbert-Kurve sortiert (GeoDataFrame oder kompakte Tabelle)."""
+    x, y, _ = koordinaten(tabelle)
+    return tabelle.iloc[raeumliche_reihenfolge(x, y)].reset_index(drop=True)
+
+
+def speichere_kompakt(tabelle, pfad):
+    """
+    Schreibt die kompakte Tabelle räumlich sortiert als Parquet.
+
+    CRS und Ursprung stehen in den Metadaten, ebenso die Ausdehnung jeder Zeilengruppe.
+    """
+    tabelle = raeumlich_sortiert(tabelle)
+    x, y, crs = koordinaten(tabelle)
+    metadaten = {
+        b"gebaeude_crs": GEBAEUDE_CRS.encode(),
+        b"gebaeude_ursprung": ",".join(str(u) for u in URSPRUNG).encode(),
+    }
+    schreibe_zeilengruppen(tabelle, pfad, x, y, crs, metadaten)
+
+
+def lade_kompakt(pfad, spalten=None, bbox=None, crs=GEBAEUDE_CRS, auswahl=None):
+    """
+    Lädt eine kompakte Tabelle (optional nur einzelne Spalten, x und y immer).
+
+    bbox (xmin, ymin, xmax, ymax) im CRS crs: nur Gebäude darin; gelesen werden
+    nur die Zeilengruppen, die die bbox schneiden. auswahl (Spalte -> Werte, z. B.
+    {"LocalityNa": ["Würzburg"]}) wird als Parquet-Filter beim Lesen angewendet.
+    """
+    metadaten = pq.read_schema(pfad).metadata or {}
+    ursprung = metadaten.get(b"gebaeude_ursprung", b"").decode()
+    if metadaten.get(b"gebaeude_crs", b"").decode() != GEBAEUDE_CRS or \
+            tuple(float(u) for u in ursprung.split(",") if u) != URSPRUNG:
+        raise ValueError(f"{pfad} ist keine kompakte Gebäudetabelle mit CRS {GEBAEUDE_CRS} und Ursprung {URSPRUNG}.")
+    if spalten is not None:
+        spalten = mit_auswahl_spalten([X_SPALTE, Y_SPALTE], auswahl, *spalten)
+    if bbox is None:
+        return pd.read_parquet(pfad, columns=spalten, filters=parquet_filter(auswahl))
+    bbox = transformiere_bbox(bbox, crs, GEBAEUDE_CRS)
+    tabelle = lade_zeilengruppen(pfad, bbox, spalten=spalten)
+    x, y, _ = koordinaten(tabelle)
+    maske = in_bbox(x, y, bbox)
+    for spalte, werte in (auswahl or {}).items():
+        maske &= tabelle[spalte].isin(werte).to_numpy()
+    return tabelle[maske].reset_index(drop=True)
+
+
+# === 3. Speicherbedarf ===
+
+def speicherbedarf(tabelle):
+    """
+    Speicherbedarf in Bytes (pandas memory_usage(deep=True)).
+
+    Bei GeoDataFrames zählen die Geometrien mit der Größe der Python-Objekte; der
+    Speicher der GEOS-Geometrien selbst ist darin noch nicht enthalten.
+    """
+    if isinstance(tabelle, gpd.GeoDataFrame):
+        geometrie = tabelle.geometry.name
+        rest = tabelle.drop(columns=geometrie)
+        objekte = sum(sys.getsizeof(g) for g in tabelle.geometry.values) + 8 * len(tabelle)
+        return int(pd.DataFrame(rest).memory_usage(deep=True).sum()) + objekte
+    return int(tabelle.memory_usage(deep=True).sum())
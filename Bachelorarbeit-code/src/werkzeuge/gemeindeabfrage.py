@@ -0,0 +1,131 @@
+# Abfragen auf der vorberechneten Gemeinde-Statistik (weitere_scripts/Gemeinde_Statistik.py).
+#
+# Die Tabelle wird einmal geladen; jede Gemeinde liegt danach als fertig kodierte
+# JSON-Antwort im Speicher. Abgeleitete Sichten (Anteile je Gewichtung, Ranglisten,
+# Namenssuche) werden bei der ersten Anfrage berechnet und in einem LRU-Cache gehalten.
+
+import json
+import re
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from werkzeuge.gemeinden import AGS_SPALTE
+from werkzeuge.risiko import labels_risiko
+
+statistik_path = "outputs/tables/gemeinde_statistik.parquet"
+
+KLASSEN = [label.replace(" ", "_") for label in labels_risiko]
+GEWICHTE = ("flaeche", "gebaeude", "einwohner", "ueber65")
+
+# Zusatz "(AGS)" bei gleichnamigen Gemeinden, siehe gemeinde_namen()
+_AGS_ZUSATZ = re.compile(r"\s*\(\d{8}\)$")
+
+
+def kodiere(daten):
+    """JSON-Antwort als UTF-8-Bytes."""
+    return json.dumps(daten, ensure_ascii=False).encode("utf-8")
+
+
+def _normalisiere(name):
+    return _AGS_ZUSATZ.sub("", str(name)).strip().casefold()
+
+
+def _wert(wert):
+    """NumPy-Werte in JSON-taugliche Python-Werte umwandeln (NaN -> None)."""
+    if isinstance(wert, (np.floating, float)):
+        return None if np.isnan(wert) else float(wert)
+    if isinstance(wert, np.integer):
+        return int(wert)
+    return wert
+
+
+class GemeindeAbfrage:
+    """Gemeinde-Kennzahlen im Speicher mit Abfragen nach AGS, Name und Rangliste."""
+
+    def __init__(self, pfad=statistik_path, cache_groesse=1024):
+        self.tabelle = pd.read_parquet(pfad)
+        self.tabelle[AGS_SPALTE] = self.tabelle[AGS_SPALTE].astype("int64")
+
+        self.datensaetze = {}
+        self.antworten = {}
+        self.namen = {}
+        for zeile in self.tabelle.to_dict(orient="records"):
+            datensatz = {spalte: _wert(wert) for spalte, wert in zeile.items()}
+            ags = datensatz[AGS_SPALTE]
+            self.datensaetze[ags] = datensatz
+            self.antworten[ags] = kodiere(datensatz)
+            self.namen.setdefault(_normalisiere(datensatz["GEN"]), []).append(ags)
+
+        self.uebersicht_antwort = kodiere(
+            [{AGS_SPALTE: ags, "GEN": d["GEN"]} for ags, d in self.datensaetze.items()]
+        )
+
+        # Abgeleitete Sichten mit LRU-Cache (je Instanz)
+        self.anteile = lru_cache(maxsize=cache_groesse)(self._anteile)
+        self.suche = lru_cache(maxsize=cache_groesse)(self._suche)
+        self.rangliste = lru_cache(maxsize=cache_groesse)(self._rangliste)
+
+    # === 1. Einzelne Gemeinde ===
+
+    def gemeinde(self, ags):
+        """Vorkodierte JSON-Antwort der Gemeinde oder None."""
+        return self.antworten.get(int(ags))
+
+    def _anteile(self, ags, gewicht):
+        """Anteile (%) je Risikoklasse für eine Gewichtung, als JSON-Bytes."""
+        datensatz = self.datensaetze.get(int(ags))
+        if datensatz is None:
+            return None
+        if gewicht not in GEWICHTE:
+            raise ValueError(f"Unbekannte Gewichtung: {gewicht}")
+
+        if gewicht == "flaeche":
+            anteile = {k: datensatz[f"flaeche_{k}_pct"] for k in KLASSEN}
+        else:
+            gesamt = datensatz[f"{gewicht}_gesamt"]
+            anteile = {
+                k: (datensatz[f"{gewicht}_{k}"] / gesamt * 100 if gesamt else None) for k in KLASSEN
+            }
+        return kodiere({AGS_SPALTE: datensatz[AGS_SPALTE], "GEN": datensatz["GEN"],
+                        "gewicht": gewicht, "anteile_pct": anteile})
+
+    # === 2. Namenssuche ===
+
+    def _suche(self, name):
+        """Gemeinden mit diesem Namen (ohne Groß-/Kleinschreibung), sonst Namensanfang."""
+        schluessel = _normalisiere(name)
+        if not schluessel:
+            # ein leerer Name wäre Anfang jedes Namens und lieferte die ganze Tabelle
+            raise ValueError("Leerer Name")
+        treffer = self.namen.get(schluessel)
+        if treffer is None:
+            treffer = [ags for n, liste in self.namen.items() if n.startswith(schluessel) for ags in liste]
+        return kodiere([self.datensaetze[ags] for ags in sorted(treffer)])
+
+    # === 3. Rangliste ===
+
+    def _rangliste(self, gewicht, klassen, n):
+        """Die n Gemeinden mit dem höchsten Anteil der angegebenen Klassen (Tupel) für eine Gewichtung."""
+        if gewicht not in GEWICHTE:
+            raise ValueError(f"Unbekannte Gewichtung: {gewicht}")
+        unbekannt = set(klassen) - set(KLASSEN)
+        if unbekannt:
+            raise ValueError(f"Unbekannte Klassen: {', '.join(sorted(unbekannt))}")
+
+        t = self.tabelle
+        if gewicht == "flaeche":
+            anteil = t[[f"flaeche_{k}_pct" for k in klassen]].sum(axis=1)
+        else:
+            gesamt = t[f"{gewicht}_gesamt"].where(t[f"{gewicht}_gesamt"] > 0)
+            anteil = t[[f"{gewicht}_{k}" for k in klassen]].sum(axis=1) / gesamt * 100
+        top = anteil.dropna().sort_values(ascending=False).head(n)
+        return kodiere([
+            {AGS_SPALTE: int(t.at[i, AGS_SPALTE]), "GEN": t.at[i, "GEN"], "anteil_pct": float(wert)}
+            for i, wert in top.items()
+        ])
+
+    def uebersicht(self):
+        """Alle Gemeinden (AGS und Name) als JSON-Bytes."""
+        return self.uebersicht_antwort
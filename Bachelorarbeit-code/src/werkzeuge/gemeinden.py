@@ -0,0 +1,108 @@
+# Räumliche Zuordnung von Punkten (Gebäude, Gitterzellen) zu Gemeinden aus VG5000_GEM.
+#
+# Statt über das Freitextfeld "LocalityNa" wird jeder Punkt per Punkt-in-Polygon-Test
+# der Gemeinde zugeordnet, in der er liegt. Ergebnis ist der Amtliche Gemeindeschlüssel
+# (AGS) als int32-Spalte, sodass alle Auswertungen pro Gemeinde über einen
+# ganzzahligen Schlüssel gruppieren.
+
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import shapely
+
+from werkzeuge.gebaeudetabelle import koordinaten
+
+gemeinden_path = "data/shapefiles/VG5000_GEM.shp"
+
+# Name der Schlüsselspalte und Wert für Punkte außerhalb aller Gemeinden
+AGS_SPALTE = "AGS"
+AGS_FEHLT = 0
+
+
+# === 1. Gemeinden laden ===
+
+def lade_gemeinden(pfad=gemeinden_path, crs=None):
+    """Lädt die Gemeindepolygone mit AGS (int32) und GEN, optional reprojiziert."""
+    gdf = gpd.read_file(pfad, columns=["AGS", "GEN"])
+    if crs is not None and gdf.crs != crs:
+        gdf = gdf.to_crs(crs)
+    gdf[AGS_SPALTE] = gdf["AGS"].astype("int32")
+    return gdf
+
+
+def gemeinde_namen(gemeinden):
+    """
+    Zuordnung AGS -> Gemeindename.
+
+    Gleichnamige Gemeinden erhalten den AGS als Zusatz, damit die
+    Beschriftungen in den Diagrammen eindeutig bleiben.
+    """
+    namen = gemeinden.drop_duplicates(AGS_SPALTE).set_index(AGS_SPALTE)["GEN"]
+    doppelt = namen.duplicated(keep=False)
+    namen[doppelt] = [f"{gen} ({ags:08d})" for ags, gen in namen[doppelt].items()]
+    return namen
+
+
+# === 2. Punkt-in-Polygon-Zuordnung ===
+
+def gemeinde_codes(x, y, gemeinden, batch_size=1_000_000):
+    """
+    Ordnet Koordinaten (im CRS der Gemeinden) dem AGS der umgebenden Gemeinde zu.
+
+    Die Polygone werden einmal vorbereitet (shapely.prepare) und in einem STRtree
+    indiziert; die Punkte werden blockweise mit einer einzigen Baumabfrage
+    geprüft. Punkte außerhalb aller Gemeinden erhalten AGS_FEHLT.
+    """
+    x = np.asarray(x, dtype="float64")
+    y = np.asarray(y, dtype="float64")
+    polygone = np.asarray(gemeinden.geometry.values)
+    shapely.prepare(polygone)
+    baum = shapely.STRtree(polygone)
+    ags = gemeinden[AGS_SPALTE].to_numpy(dtype="int32")
+
+    codes = np.full(len(x), AGS_FEHLT, dtype="int32")
+    for start in range(0, len(x), batch_size):
+        punkte = shapely.points(x[start:start + batch_size], y[start:start + batch_size])
+        punkt_idx, polygon_idx = baum.query(punkte, predicate="intersects")
+        codes[start + punkt_idx] = ags[polygon_idx]
+    return codes
+
+
+def gemeinde_schwerpunkte(ags, x, y, auswahl):
+    """
+    Mittlere Koordinate der Punkte je Gemeinde, nur für die ausgewählten AGS.
+
+    Entspricht dem Zentroid der zusammengefassten MultiPoints (dissolve + centroid),
+    wird aber mit np.bincount über die Gemeinde-Indizes berechnet.
+    Rückgabe: DataFrame mit den Spalten AGS, x, y.
+    """
+    auswahl = np.unique(np.asarray(auswahl, dtype="int32"))
+    ags = np.asarray(ags)
+    maske = np.isin(ags, auswahl)
+    idx = np.searchsorted(auswahl, ags[maske])
+
+    anzahl = np.bincount(idx, minlength=len(auswahl))
+    summe_x = np.bincount(idx, weights=np.asarray(x, dtype="float64")[maske], minlength=len(auswahl))
+    summe_y = np.bincount(idx, weights=np.asarray(y, dtype="float64")[maske], minlength=len(auswahl))
+    vorhanden = anzahl > 0
+    return pd.DataFrame({
+        AGS_SPALTE: auswahl[vorhanden],
+        "x": summe_x[vorhanden] / anzahl[vorhanden],
+        "y": summe_y[vorhanden] / anzahl[vorhanden],
+    })
+
+
+def ergaenze_gemeinden(gdf, pfad=gemeinden_path):
+    """
+    Ergänzt eine Punkt-GeoDataFrame oder kompakte Gebäudetabelle um die Spalte AGS
+    (falls noch nicht vorhanden).
+
+    Rückgabe: die Tabelle und die Zuordnung AGS -> Gemeindename.
+    """
+    x, y, crs = koordinaten(gdf)
+    gemeinden = lade_gemeinden(pfad, crs=crs)
+    if AGS_SPALTE not in gdf.columns:
+        gdf = gdf.copy()
+        gdf[AGS_SPALTE] = gemeinde_codes(x, y, gemeinden)
+    gdf[AGS_SPALTE] = gdf[AGS_SPALTE].fillna(AGS_FEHLT).astype("int32")
+    return gdf, gemeinde_namen(gemeinden)
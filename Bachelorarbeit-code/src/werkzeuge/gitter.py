@@ -0,0 +1,129 @@
+# Ganzzahlige Schlüssel für die Zensus-Gitterzellen (EPSG:3035).
+#
+# Eine Gitter-ID wie "CRS3035RES100mN2691700E4341100" wird in einen int64-Schlüssel
+# umgewandelt. Dafür werden die Ziffern von Nord- und Ostwert (in Einheiten der
+# Zellgröße) abwechselnd verschränkt: ... n1 e1 n0 e0. Dadurch ergibt die ganzzahlige
+# Division durch 100 direkt den Schlüssel der übergeordneten 10-fach gröberen Zelle
+# (100 m -> 1 km -> 10 km), und benachbarte Zellen liegen im Schlüssel nah beieinander.
+
+import numpy as np
+import pandas as pd
+from affine import Affine
+
+# Name der Schlüsselspalte (max. 10 Zeichen wegen Shapefile)
+SCHLUESSEL_SPALTE = "gitter_key"
+
+# Ziffern je Achse in Zellgrößen-Einheiten (reicht für ganz Europa in EPSG:3035)
+STELLEN = 6
+
+
+# === 1. Verschränken / Entschränken ===
+
+def _verschraenke(n, e):
+    n = np.asarray(n, dtype="int64")
+    e = np.asarray(e, dtype="int64")
+    schluessel = np.zeros(np.broadcast(n, e).shape, dtype="int64")
+    faktor = 1
+    for _ in range(STELLEN):
+        schluessel += (e % 10) * faktor + (n % 10) * faktor * 10
+        n = n // 10
+        e = e // 10
+        faktor *= 100
+    return schluessel
+
+
+def _entschraenke(schluessel):
+    schluessel = np.asarray(schluessel, dtype="int64")
+    n = np.zeros(schluessel.shape, dtype="int64")
+    e = np.zeros(schluessel.shape, dtype="int64")
+    faktor = 1
+    for _ in range(STELLEN):
+        e += (schluessel % 10) * faktor
+        n += (schluessel // 10 % 10) * faktor
+        schluessel = schluessel // 100
+        faktor *= 10
+    return n, e
+
+
+def zell_schluessel(nord, ost):
+    """Schlüssel aus Nord-/Ostindex der Zelle (Koordinate geteilt durch Zellgröße)."""
+    return _verschraenke(nord, ost)
+
+
+def zell_indizes(schluessel):
+    """Nord- und Ostindex (int64) der Zellen zu den Schlüsseln."""
+    return _entschraenke(schluessel)
+
+
+# === 2. Umwandlung Gitter-ID <-> Schlüssel ===
+
+def gitter_schluessel(gitter_ids, aufloesung=100):
+    """Wandelt Gitter-IDs (CRS3035RES100mN...E...) in int64-Schlüssel um."""
+    teile = pd.Series(gitter_ids).astype(str).str.extract(r"N(\d+)E(\d+)")
+    if teile.isna().any().any():
+        raise ValueError("Ungültige Gitter-ID gefunden (erwartet: CRS3035RES100mN...E...).")
+    nord = teile[0].astype("int64").to_numpy()
+    ost = teile[1].astype("int64").to_numpy()
+    return _verschraenke(nord // aufloesung, ost // aufloesung)
+
+
+def gitter_id(schluessel, aufloesung=100):
+    """Wandelt int64-Schlüssel zurück in Gitter-IDs."""
+    n, e = _entschraenke(schluessel)
+    return [
+        f"CRS3035RES{aufloesung}mN{nord}E{ost}"
+        for nord, ost in zip(n * aufloesung, e * aufloesung)
+    ]
+
+
+# === 3. Umwandlung Koordinaten <-> Schlüssel ===
+
+def schluessel_aus_koordinaten(x, y, aufloesung=100):
+    """Schlüssel der Zelle, in der die EPSG:3035-Koordinaten liegen."""
+    ost = np.floor(np.asarray(x, dtype="float64") / aufloesung).astype("int64")
+    nord = np.floor(np.asarray(y, dtype="float64") / aufloesung).astype("int64")
+    return _verschraenke(nord, ost)
+
+
+def zellmittelpunkte(schluessel, aufloesung=100):
+    """Mittelpunkte (x, y) der Zellen in EPSG:3035."""
+    n, e = _entschraenke(schluessel)
+    return e * aufloesung + aufloesung / 2, n * aufloesung + aufloesung / 2
+
+
+# === 4. Hierarchie (100 m -> 1 km -> 10 km) ===
+
+def eltern_schluessel(schluessel, stufen=1):
+    """Schlüssel der umgebenden Zelle, die stufen-mal 10-fach gröber ist."""
+    return np.asarray(schluessel, dtype="int64") // 100 ** stufen
+
+
+def kinder_bereich(schluessel, stufen=1):
+    """
+    Schlüsselbereich [start, ende) aller Unterzellen, die stufen-mal 10-fach feiner sind.
+
+    Durch die Verschränkung der Ziffern liegen alle Unterzellen einer Zelle in
+    einem zusammenhängenden Schlüsselbereich.
+    """
+    faktor = 100 ** stufen
+    start = np.asarray(schluessel, dtype="int64") * faktor
+    return start, start + faktor
+
+
+# === 5. Dichtes Raster aus Zellwerten ===
+
+def gitter_raster(schluessel, werte, aufloesung=100, fuellwert=0):
+    """
+    Zellwerte als dichtes 2D-Array über die Ausdehnung der Schlüssel (Norden oben).
+
+    Rückgabe: (Array, Zeile und Spalte je Schlüssel, Affine-Transformation in EPSG:3035).
+    """
+    nord, ost = _entschraenke(schluessel)
+    nord_max, ost_min = nord.max(), ost.min()
+    zeile = nord_max - nord
+    spalte = ost - ost_min
+    werte = np.asarray(werte)
+    raster = np.full((zeile.max() + 1, spalte.max() + 1), fuellwert, dtype=werte.dtype)
+    raster[zeile, spalte] = werte
+    transform = Affine(aufloesung, 0, ost_min * aufloesung, 0, -aufloesung, (nord_max + 1) * aufloesung)
+    return raster, (zeile, spalte), transform
@@ -0,0 +1,121 @@
+# Zusammenfassung von Zellwerten (Einwohner, Ü65, Gebäude, Klassenanzahlen) auf
+# mehreren Gitterstufen: 100 m -> 1 km -> 10 km.
+#
+# Der Gitter-Schlüssel (werkzeuge/gitter.py) der 10-fach gröberen Zelle ist
+# schluessel // 100. Sind die Zeilen nach Schlüssel sortiert, liegen alle
+# Unterzellen einer groben Zelle direkt hintereinander; jede Stufe entsteht dann
+# mit einem np.add.reduceat über die Gruppenanfänge, ohne räumliche Operationen.
+#
+# Jede Stufe wird als nach Schlüssel sortierte Parquet-Datei gespeichert. Weil die
+# Unterzellen einer Zelle einen zusammenhängenden Schlüsselbereich bilden, kann
+# beim Laden einer feinen Stufe über einen Bereichsfilter nur der benötigte
+# Ausschnitt gelesen werden.
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from werkzeuge.gitter import SCHLUESSEL_SPALTE, eltern_schluessel, kinder_bereich
+
+# Name -> Zellgröße in m
+STUFEN = {"100m": 100, "1km": 1000, "10km": 10000}
+
+
+def stufen_pfad(ordner, stufe):
+    return os.path.join(ordner, f"gitter_{stufe}.parquet")
+
+
+# === 1. Zellsummen auf der feinsten Stufe ===
+
+def zell_summen(schluessel, werte):
+    """
+    Summen je Zelle für mehrere Wertespalten (Dict Name -> Array).
+
+    Die Schlüssel dürfen mehrfach vorkommen (z. B. ein Eintrag je Gebäude).
+    Rückgabe: DataFrame mit gitter_key (aufsteigend sortiert) und den Summen.
+    """
+    eindeutig, zellen = np.unique(np.asarray(schluessel, dtype="int64"), return_inverse=True)
+    tabelle = pd.DataFrame({SCHLUESSEL_SPALTE: eindeutig})
+    for name, spalte in werte.items():
+        tabelle[name] = np.bincount(zellen, weights=np.asarray(spalte, dtype="float64"), minlength=len(eindeutig))
+    return tabelle
+
+
+def verbinde(*tabellen):
+    """Mehrere Zelltabellen über gitter_key zusammenführen; fehlende Werte werden 0."""
+    ergebnis = tabellen[0]
+    for tabelle in tabellen[1:]:
+        ergebnis = ergebnis.merge(tabelle, on=SCHLUESSEL_SPALTE, how="outer")
+    return ergebnis.fillna(0).sort_values(SCHLUESSEL_SPALTE, ignore_index=True)
+
+
+# === 2. Vergröbern ===
+
+def vergroebere(tabelle, stufen=1):
+    """
+    Zelltabelle (nach gitter_key sortiert) auf die stufen-mal 10-fach gröbere Stufe summieren.
+
+    Alle Spalten außer gitter_key werden summiert.
+    """
+    schluessel = tabelle[SCHLUESSEL_SPALTE].to_numpy()
+    if len(schluessel) and np.any(np.diff(schluessel) < 0):
+        raise ValueError("Die Zelltabelle muss nach gitter_key sortiert sein.")
+
+    eltern = eltern_schluessel(schluessel, stufen)
+    anfang = np.flatnonzero(np.r_[True, eltern[1:] != eltern[:-1]]) if len(eltern) else np.array([], dtype="int64")
+    grob = pd.DataFrame({SCHLUESSEL_SPALTE: eltern[anfang]})
+    for name in tabelle.columns.drop(SCHLUESSEL_SPALTE):
+        werte = tabelle[name].to_numpy()
+        grob[name] = np.add.reduceat(werte, anfang) if len(anfang) else werte[:0]
+    return grob
+
+
+def alle_stufen(tabelle_100m):
+    """Dict Stufenname -> Tabelle für 100 m, 1 km und 10 km."""
+    stufen = {"100m": tabelle_100m}
+    stufen["1km"] = vergroebere(tabelle_100m)
+    stufen["10km"] = vergroebere(stufen["1km"])
+    return stufen
+
+
+# === 3. Speichern und Laden ===
+
+def _kompakt(tabelle):
+    """Ganzzahlige Spalten als int32, übrige Werte als float32."""
+    tabelle = tabelle.copy()
+    for name in tabelle.columns.drop(SCHLUESSEL_SPALTE):
+        werte = tabelle[name].to_numpy()
+        if np.all(werte == np.round(werte)) and np.abs(werte).max(initial=0) < 2 ** 31:
+            tabelle[name] = werte.astype("int32")
+        else:
+            tabelle[name] = werte.astype("float32")
+    return tabelle
+
+
+def schreibe_stufen(stufen, ordner, row_group_size=50_000):
+    """Schreibt jede Stufe nach <ordner>/gitter_<Stufe>.parquet (nach Schlüssel sortiert)."""
+    os.makedirs(ordner, exist_ok=True)
+    for name, tabelle in stufen.items():
+        _kompakt(tabelle).to_parquet(stufen_pfad(ordner, name), index=False, row_group_size=row_group_size)
+
+
+def lade_stufe(ordner, stufe, innerhalb=None, spalten=None):
+    """
+    Lädt eine Stufe; optional nur die Unterzellen einer gröberen Zelle.
+
+    innerhalb: (Stufenname, Schlüssel) der gröberen Zelle, z. B. ("10km", 24939).
+    Gelesen wird dann nur der zusammenhängende Schlüsselbereich ihrer Unterzellen.
+    """
+    filter_ = None
+    if innerhalb is not None:
+        grob, schluessel = innerhalb
+        verhaeltnis = STUFEN[grob] // STUFEN[stufe]
+        anzahl = len(str(verhaeltnis)) - 1
+        if verhaeltnis < 10 or 10 ** anzahl != verhaeltnis:
+            raise ValueError(f"{grob} ist keine gröbere Stufe als {stufe}.")
+        start, ende = kinder_bereich(schluessel, anzahl)
+        filter_ = [(SCHLUESSEL_SPALTE, ">=", int(start)), (SCHLUESSEL_SPALTE, "<", int(ende))]
+    if spalten is not None:
+        spalten = [SCHLUESSEL_SPALTE] + [s for s in spalten if s != SCHLUESSEL_SPALTE]
+    return pd.read_parquet(stufen_pfad(ordner, stufe), columns=spalten, filters=filter_)
@@ -0,0 +1,117 @@
+# Hochwasserexposition je Gebäude über die ganze Grundfläche statt über den Zentroid.
+#
+# Für jedes Gebäude werden alle Rasterpixel im umgebenden Rechteck als Paare
+# (Gebäude, Pixel) erzeugt, stapelweise und ohne Python-Schleife über die Gebäude.
+# Die Schnittfläche Grundriss/Pixel berechnet shapely vektorisiert; daraus folgen
+# maximaler und flächengewichteter mittlerer WoE-Wert sowie der Flächenanteil je
+# Risikoklasse. Das Raster muss nordausgerichtet sein (ohne Rotation).
+
+import numpy as np
+import pandas as pd
+import shapely
+
+from werkzeuge.risiko import bins_risiko, labels_risiko, risiko_codes
+
+# Spaltennamen der Ergebnistabelle
+SPALTE_MAX = "Risiko_max"
+SPALTE_MITTEL = "Risiko_mittel"
+SPALTE_FLAECHE = "flaeche_gueltig"
+
+
+def anteil_spalten(labels=labels_risiko):
+    """Spaltennamen der Flächenanteile je Risikoklasse, z. B. "anteil_sehr_hoch"."""
+    return [f"anteil_{label.replace(' ', '_')}" for label in labels]
+
+
+# === 1. Paare Gebäude/Pixel ===
+
+def _pixel_paare(grenzen, raster):
+    """
+    Alle Pixel im umgebenden Rechteck jedes Gebäudes.
+
+    Rückgabe: (Gebäude-Index, Zeile, Spalte) je Paar, nach Gebäude sortiert.
+    """
+    transform = raster.transform
+    hoehe, breite = raster.shape
+    leer = np.isnan(grenzen).any(axis=1)  # fehlende oder leere Geometrie
+    grenzen = np.where(leer[:, None], 0.0, grenzen)
+    spalte0, zeile0 = ~transform * (grenzen[:, 0], grenzen[:, 3])
+    spalte1, zeile1 = ~transform * (grenzen[:, 2], grenzen[:, 1])
+    zeile0 = np.clip(np.floor(zeile0), 0, hoehe).astype("int64")
+    spalte0 = np.clip(np.floor(spalte0), 0, breite).astype("int64")
+    zeile1 = np.clip(np.ceil(zeile1), 0, hoehe).astype("int64")
+    spalte1 = np.clip(np.ceil(spalte1), 0, breite).astype("int64")
+
+    n_spalten = np.maximum(spalte1 - spalte0, 0)
+    anzahl = np.maximum(zeile1 - zeile0, 0) * n_spalten
+    anzahl[leer] = 0
+    gebaeude = np.repeat(np.arange(len(grenzen)), anzahl)
+    # laufende Nummer des Pixels innerhalb des Rechtecks
+    lokal = np.arange(len(gebaeude)) - np.repeat(np.cumsum(anzahl) - anzahl, anzahl)
+    zeile = zeile0[gebaeude] + lokal // n_spalten[gebaeude]
+    spalte = spalte0[gebaeude] + lokal % n_spalten[gebaeude]
+    return gebaeude, zeile, spalte
+
+
+# === 2. Exposition je Gebäude ===
+
+def _exposition_block(geometrien, raster, bins):
+    n = len(geometrien)
+    anzahl_klassen = len(bins) - 1
+    transform = raster.transform
+
+    gebaeude, zeile, spalte = _pixel_paare(shapely.bounds(geometrien), raster)
+    x0, y0 = transform * (spalte, zeile)
+    x1, y1 = transform * (spalte + 1, zeile + 1)
+    pixel = shapely.box(np.minimum(x0, x1), np.minimum(y0, y1), np.maximum(x0, x1), np.maximum(y0, y1))
+    flaeche = shapely.area(shapely.intersection(geometrien[gebaeude], pixel))
+
+    werte = raster.daten[zeile, spalte].astype("float64")
+    if raster.nodata is not None:
+        werte[werte == raster.nodata] = np.nan
+    gueltig = (flaeche > 0) & ~np.isnan(werte)
+    gebaeude, flaeche, werte = gebaeude[gueltig], flaeche[gueltig], werte[gueltig]
+
+    gesamt = np.bincount(gebaeude, weights=flaeche, minlength=n)
+    summe = np.bincount(gebaeude, weights=flaeche * werte, minlength=n)
+    codes = risiko_codes(werte, bins).astype("int64")
+    innen = codes < anzahl_klassen
+    klassen = np.bincount(gebaeude[innen] * anzahl_klassen + codes[innen], weights=flaeche[innen],
+                          minlength=n * anzahl_klassen).reshape(n, anzahl_klassen)
+
+    # Maximum je Gebäude: Paare sind nach Gebäude sortiert -> reduceat über die Abschnitte
+    maximum = np.full(n, np.nan)
+    vorhanden, start = np.unique(gebaeude, return_index=True)
+    if len(vorhanden):
+        maximum[vorhanden] = np.maximum.reduceat(werte, start)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mittel = summe / gesamt
+        anteile = klassen / gesamt[:, None]
+    return maximum, mittel, anteile, gesamt
+
+
+def grundriss_exposition(geometrien, raster, bins=bins_risiko, labels=labels_risiko, batch_size=50_000):
+    """
+    Exposition je Grundriss (Geometrien im CRS des Rasters).
+
+    Rückgabe: DataFrame mit Risiko_max, Risiko_mittel (flächengewichtet), den
+    Flächenanteilen je Risikoklasse und der Grundfläche mit gültigem Rasterwert
+    (flaeche_gueltig). Gebäude ohne gültige Pixel erhalten NaN. Ungültige
+    Grundrisse werden vorher mit shapely.make_valid repariert.
+    """
+    # ungültige Grundrisse (z. B. Selbstüberschneidung) würden die Schnittberechnung abbrechen
+    geometrien = shapely.make_valid(np.asarray(geometrien, dtype=object))
+    teile = [
+        _exposition_block(geometrien[start:start + batch_size], raster, bins)
+        for start in range(0, len(geometrien), batch_size)
+    ]
+    if not teile:
+        return pd.DataFrame(columns=[SPALTE_MAX, SPALTE_MITTEL, *anteil_spalten(labels), SPALTE_FLAECHE])
+
+    maximum, mittel, anteile, gesamt = (np.concatenate(t) for t in zip(*teile))
+    df = pd.DataFrame(anteile.astype("float32"), columns=anteil_spalten(labels))
+    df.insert(0, SPALTE_MAX, maximum.astype("float32"))
+    df.insert(1, SPALTE_MITTEL, mittel.astype("float32"))
+    df[SPALTE_FLAECHE] = gesamt.astype("float32")
+    return df
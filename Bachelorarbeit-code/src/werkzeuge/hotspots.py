@@ -0,0 +1,111 @@
+# Hotspot-Analyse (Getis-Ord Gi*) auf dem 100-m-Gitter.
+#
+# Die Zellwerte liegen als dichtes Raster vor (werkzeuge/gitter.py: gitter_raster).
+# Die Nachbarschaftssummen für alle Zellen entstehen mit einer FFT-Faltung mit einem
+# binären Kreiskern (alle Zellen, deren Mittelpunkt höchstens radius Zellen entfernt
+# ist, einschließlich der Zelle selbst). Nur Zellen des Untersuchungsgebiets (maske)
+# zählen als Nachbarn und gehen in Mittelwert und Streuung ein.
+
+import numpy as np
+import pandas as pd
+from scipy import ndimage, signal, stats
+
+# Konfidenzstufen für die Einteilung in Hot- und Coldspots (wie Gi_Bin in ArcGIS)
+KONFIDENZ = (0.90, 0.95, 0.99)
+
+
+# === 1. Gi* ===
+
+def kreiskern(radius):
+    """Binärer Kreiskern mit Radius in Zellen."""
+    r = int(np.floor(radius))
+    y, x = np.mgrid[-r:r + 1, -r:r + 1]
+    return (x ** 2 + y ** 2 <= radius ** 2).astype("float64")
+
+
+def gi_stern(werte, maske, radius):
+    """
+    Gi*-z-Werte je Zelle (NaN außerhalb der Maske).
+
+    werte: 2D-Array der Zellwerte; maske: 2D-Bool-Array des Untersuchungsgebiets;
+    radius: Nachbarschaftsradius in Zellen.
+    """
+    maske = np.asarray(maske, dtype=bool)
+    x = np.where(maske, np.asarray(werte, dtype="float64"), 0.0)
+    n = maske.sum()
+    mittel = x[maske].mean()
+    streuung = np.sqrt((x[maske] ** 2).mean() - mittel ** 2)
+
+    kern = kreiskern(radius)
+    summe = signal.fftconvolve(x, kern, mode="same")
+    # Gewichtssumme je Zelle = Anzahl gültiger Nachbarn (binäre Gewichte: Summe w² = Summe w)
+    gewichte = np.rint(signal.fftconvolve(maske.astype("float64"), kern, mode="same"))
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        nenner = streuung * np.sqrt((n * gewichte - gewichte ** 2) / (n - 1))
+        z = (summe - mittel * gewichte) / nenner
+    z[~maske | (nenner <= 0)] = np.nan
+    return z
+
+
+def p_werte(z):
+    """Zweiseitige p-Werte zu z-Werten."""
+    return 2 * stats.norm.sf(np.abs(z))
+
+
+def fdr_schwelle(p, alpha):
+    """Größter p-Wert, der nach Benjamini-Hochberg bei Fehlerrate alpha noch signifikant ist (0 wenn keiner)."""
+    p = np.sort(p[~np.isnan(p)])
+    if len(p) == 0:
+        return 0.0
+    grenze = alpha * np.arange(1, len(p) + 1) / len(p)
+    treffer = np.flatnonzero(p <= grenze)
+    return p[treffer[-1]] if len(treffer) else 0.0
+
+
+def gi_klassen(z, fdr=True):
+    """
+    Einteilung in -3..3 (Coldspot/Hotspot mit 99, 95, 90 % Konfidenz; 0 = nicht signifikant).
+
+    Mit fdr=True werden die Schwellen je Konfidenzstufe nach Benjamini-Hochberg
+    für die Anzahl der Tests angepasst.
+    """
+    p = p_werte(z)
+    klassen = np.zeros(z.shape, dtype="int8")
+    for stufe, konfidenz in enumerate(KONFIDENZ, start=1):
+        alpha = 1 - konfidenz
+        schwelle = fdr_schwelle(p, alpha) if fdr else alpha
+        with np.errstate(invalid="ignore"):
+            signifikant = p <= schwelle
+        klassen[signifikant] = (np.sign(z[signifikant]) * stufe).astype("int8")
+    return klassen
+
+
+# === 2. Cluster ===
+
+def cluster(klassen, werte, z, transform, mindeststufe=2):
+    """
+    Zusammenhängende Hotspot-Zellen (8er-Nachbarschaft) ab einer Konfidenzstufe.
+
+    Rückgabe: (Label-Raster, Tabelle je Cluster mit Zellen, Summe der Werte,
+    maximalem z-Wert und Schwerpunkt in Rasterkoordinaten), nach Summe absteigend.
+    """
+    labels, anzahl = ndimage.label(klassen >= mindeststufe, structure=np.ones((3, 3)))
+    if anzahl == 0:
+        return labels, pd.DataFrame(columns=["cluster", "zellen", "summe", "z_max", "x", "y"])
+
+    index = np.arange(1, anzahl + 1)
+    zeilen, spalten = np.indices(labels.shape)
+    zellen = ndimage.sum_labels(np.ones(labels.shape), labels, index)
+    zeile_mittel = ndimage.mean(zeilen + 0.5, labels, index)
+    spalte_mittel = ndimage.mean(spalten + 0.5, labels, index)
+    x, y = transform * (spalte_mittel, zeile_mittel)
+    tabelle = pd.DataFrame({
+        "cluster": index,
+        "zellen": zellen.astype("int64"),
+        "summe": ndimage.sum_labels(np.nan_to_num(werte), labels, index),
+        "z_max": ndimage.maximum(np.nan_to_num(z, nan=-np.inf), labels, index),
+        "x": x,
+        "y": y,
+    })
+    return labels, tabelle.sort_values("summe", ascending=False, ignore_index=True)
@@ -0,0 +1,242 @@
+# Kachelpyramide (Web Mercator, XYZ) für die interaktive Kartenansicht.
+#
+# Alle Kacheln liegen in einer einzigen SQLite-Datei im MBTiles-Schema
+# (Tabellen metadata und tiles, Zeilen im TMS-Schema). Der Inhalt einer Kachel
+# ist gzip-komprimiertes JSON mit drei Ebenen, Koordinaten als ganze Zahlen im
+# Kachelraster 0..EXTENT (y nach unten):
+#   gebaeude:  Punkte mit Risikoklasse, unterhalb der höchsten Zoomstufe je
+#              Bildpixel und Klasse zu einem Punkt mit Anzahl ausgedünnt
+#   gitter:    Zensuszellen (10 km, 1 km oder 100 m je nach Zoomstufe) als Vierecke
+#   gemeinden: je Zoomstufe vereinfachte und auf die Kachel zugeschnittene Polygone
+# Die Kennzahlen je Gemeinde stehen einmal in den Metadaten, nicht in jeder Kachel.
+
+import gzip
+import json
+import math
+import os
+import sqlite3
+
+import numpy as np
+import shapely
+
+# Halber Umfang der Erde in EPSG:3857 (m)
+UMFANG = 20037508.342789244
+# Auflösung der Kachelkoordinaten und Pixel je Kachel auf dem Bildschirm
+EXTENT = 4096
+KACHEL_PIXEL = 256
+# Rand um die Kachel (in Kachelkoordinaten), damit Linien an den Kanten nicht abreißen
+RAND = 64
+
+
+# === 1. Kachelgeometrie ===
+
+def kachel_groesse(z):
+    """Kantenlänge einer Kachel der Zoomstufe z in m (EPSG:3857)."""
+    return 2 * UMFANG / 2 ** z
+
+
+def kachel_indizes(x, y, z):
+    """Kachelspalte und -zeile (XYZ, Zeile 0 oben) zu EPSG:3857-Koordinaten."""
+    groesse = kachel_groesse(z)
+    tx = np.floor((np.asarray(x) + UMFANG) / groesse).astype("int64")
+    ty = np.floor((UMFANG - np.asarray(y)) / groesse).astype("int64")
+    return tx, ty
+
+
+def kachel_grenzen(z, tx, ty):
+    """(xmin, ymin, xmax, ymax) einer Kachel in EPSG:3857."""
+    groesse = kachel_groesse(z)
+    xmin = -UMFANG + tx * groesse
+    ymax = UMFANG - ty * groesse
+    return xmin, ymax - groesse, xmin + groesse, ymax
+
+
+def kachel_koordinaten(x, y, z, tx, ty):
+    """EPSG:3857-Koordinaten -> ganzzahlige Kachelkoordinaten (0..EXTENT, y nach unten)."""
+    xmin, _, _, ymax = kachel_grenzen(z, tx, ty)
+    faktor = EXTENT / kachel_groesse(z)
+    return (np.round((np.asarray(x) - xmin) * faktor).astype("int64"),
+            np.round((ymax - np.asarray(y)) * faktor).astype("int64"))
+
+
+def rechteck_kacheln(xmin, ymin, xmax, ymax, z):
+    """
+    Alle Kacheln, die von den Rechtecken (Arrays, EPSG:3857) berührt werden.
+
+    Rückgabe: (Index des Rechtecks, tx, ty) je Paar aus Rechteck und Kachel.
+    """
+    tx0, ty0 = kachel_indizes(xmin, ymax, z)
+    tx1, ty1 = kachel_indizes(xmax, ymin, z)
+    breite, hoehe = tx1 - tx0 + 1, ty1 - ty0 + 1
+    anzahl = breite * hoehe
+    idx = np.repeat(np.arange(len(tx0)), anzahl)
+    versatz = np.arange(anzahl.sum()) - np.repeat(np.cumsum(anzahl) - anzahl, anzahl)
+    return idx, tx0[idx] + versatz % breite[idx], ty0[idx] + versatz // breite[idx]
+
+
+def gitter_stufe(z):
+    """Gitterstufe der Zensuszellen für eine Zoomstufe."""
+    if z <= 9:
+        return "10km"
+    if z <= 12:
+        return "1km"
+    return "100m"
+
+
+def gruppiere_nach_kachel(tx, ty):
+    """
+    Gruppiert Einträge nach Kachel.
+
+    Rückgabe: Liste von (tx, ty, Indizes der Einträge in dieser Kachel).
+    """
+    if len(tx) == 0:
+        return []
+    reihenfolge = np.lexsort((ty, tx))
+    tx, ty = tx[reihenfolge], ty[reihenfolge]
+    anfang = np.flatnonzero(np.r_[True, (tx[1:] != tx[:-1]) | (ty[1:] != ty[:-1])])
+    ende = np.r_[anfang[1:], len(tx)]
+    return [(int(tx[a]), int(ty[a]), reihenfolge[a:e]) for a, e in zip(anfang, ende)]
+
+
+# === 2. Ebenen einer Kachel ===
+
+def punkte_ebene(x, y, codes, z, tx, ty, ausduennen=True):
+    """
+    Punkte einer Kachel als {"x", "y", "k", "n"} (k = Klasse, n = Anzahl).
+
+    Beim Ausdünnen bleibt je Bildpixel und Klasse ein Punkt (Pixelmitte) mit
+    der Anzahl der zusammengefassten Punkte.
+    """
+    kx, ky = kachel_koordinaten(x, y, z, tx, ty)
+    codes = np.asarray(codes, dtype="int64")
+    if not ausduennen:
+        return {"x": kx.tolist(), "y": ky.tolist(), "k": codes.tolist(), "n": [1] * len(kx)}
+
+    pixel = EXTENT // KACHEL_PIXEL
+    px = np.clip(kx // pixel, 0, KACHEL_PIXEL - 1)
+    py = np.clip(ky // pixel, 0, KACHEL_PIXEL - 1)
+    anzahl_codes = max(int(codes.max()) + 2, 1) if len(codes) else 1
+    schluessel = (py * KACHEL_PIXEL + px) * anzahl_codes + (codes + 1)
+    eindeutig, anzahl = np.unique(schluessel, return_counts=True)
+    codes = eindeutig % anzahl_codes - 1
+    pixel_id = eindeutig // anzahl_codes
+    return {
+        "x": ((pixel_id % KACHEL_PIXEL) * pixel + pixel // 2).tolist(),
+        "y": ((pixel_id // KACHEL_PIXEL) * pixel + pixel // 2).tolist(),
+        "k": codes.tolist(),
+        "n": anzahl.tolist(),
+    }
+
+
+def zellen_ebene(ecken_x, ecken_y, werte, z, tx, ty):
+    """
+    Zellen einer Kachel als {"p": [x0, y0, ... x3, y3 je Zelle], <Wert>: [...]}.
+
+    ecken_x, ecken_y: Arrays (Zellen, 4) in EPSG:3857; werte: Dict Name -> Array.
+    """
+    kx, ky = kachel_koordinaten(ecken_x, ecken_y, z, tx, ty)
+    ebene = {"p": np.stack([kx, ky], axis=-1).reshape(len(kx), -1).ravel().tolist()}
+    for name, spalte in werte.items():
+        ebene[name] = np.asarray(spalte).tolist()
+    return ebene
+
+
+def _ringe(geometrie):
+    for teil in getattr(geometrie, "geoms", [geometrie]):
+        if teil.geom_type == "Polygon":
+            yield teil.exterior
+            yield from teil.interiors
+        elif teil.geom_type in ("MultiPolygon", "GeometryCollection"):
+            yield from _ringe(teil)
+
+
+def polygon_ebene(geometrien, ags, z, tx, ty):
+    """
+    Auf die Kachel (plus Rand) zugeschnittene Polygone als {"ags": [...], "r": [[Ring, ...], ...]}.
+
+    Jeder Ring ist eine flache Liste [x0, y0, x1, y1, ...]; Löcher und Teilflächen
+    werden beim Zeichnen mit der Even-Odd-Regel gefüllt.
+    """
+    xmin, ymin, xmax, ymax = kachel_grenzen(z, tx, ty)
+    rand = RAND * kachel_groesse(z) / EXTENT
+    ebene = {"ags": [], "r": []}
+    for geometrie, schluessel in zip(geometrien, ags):
+        zugeschnitten = shapely.clip_by_rect(geometrie, xmin - rand, ymin - rand, xmax + rand, ymax + rand)
+        ringe = []
+        for ring in _ringe(zugeschnitten):
+            koordinaten = shapely.get_coordinates(ring)
+            kx, ky = kachel_koordinaten(koordinaten[:, 0], koordinaten[:, 1], z, tx, ty)
+            punkte = np.stack([kx, ky], axis=1)
+            neu = np.r_[True, np.any(punkte[1:] != punkte[:-1], axis=1)]
+            punkte = punkte[neu]
+            if len(punkte) >= 4:
+                ringe.append(punkte.ravel().tolist())
+        if ringe:
+            ebene["ags"].append(int(schluessel))
+            ebene["r"].append(ringe)
+    return ebene
+
+
+def kodiere_kachel(ebenen):
+    """Ebenen-Dict -> gzip-komprimiertes JSON (leere Ebenen entfallen), None bei leerer Kachel."""
+    ebenen = {name: ebene for name, ebene in ebenen.items() if ebene and len(next(iter(ebene.values())))}
+    if not ebenen:
+        return None
+    return gzip.compress(json.dumps(ebenen, separators=(",", ":")).encode("utf-8"), compresslevel=6)
+
+
+# === 3. MBTiles-Datei ===
+
+def neue_mbtiles(pfad):
+    """Legt eine neue, leere MBTiles-Datei an (eine vorhandene Datei wird vorher gelöscht)."""
+    if os.path.exists(pfad):
+        os.remove(pfad)
+    verbindung = sqlite3.connect(pfad)
+    verbindung.executescript("""
+        CREATE TABLE metadata (name TEXT PRIMARY KEY, value TEXT);
+        CREATE TABLE tiles (zoom_level INTEGER, tile_column INTEGER, tile_row INTEGER, tile_data BLOB);
+        PRAGMA journal_mode = OFF;
+        PRAGMA synchronous = OFF;
+    """)
+    return verbindung
+
+
+def schreibe_kacheln(verbindung, kacheln):
+    """Speichert (z, x, y, Daten)-Tupel; y wird ins TMS-Schema der MBTiles umgerechnet."""
+    verbindung.executemany(
+        "INSERT INTO tiles VALUES (?, ?, ?, ?)",
+        [(z, x, 2 ** z - 1 - y, daten) for z, x, y, daten in kacheln],
+    )
+
+
+def schliesse_mbtiles(verbindung, metadaten):
+    """Metadaten schreiben, Index anlegen und die Datei verdichten."""
+    verbindung.executemany(
+        "INSERT OR REPLACE INTO metadata VALUES (?, ?)",
+        [(name, wert if isinstance(wert, str) else json.dumps(wert, ensure_ascii=False))
+         for name, wert in metadaten.items()],
+    )
+    verbindung.execute("CREATE UNIQUE INDEX tile_index ON tiles (zoom_level, tile_column, tile_row)")
+    verbindung.commit()
+    verbindung.execute("VACUUM")
+    verbindung.close()
+
+
+def lies_kachel(verbindung, z, x, y):
+    """Gzip-Daten einer XYZ-Kachel oder None."""
+    zeile = verbindung.execute(
+        "SELECT tile_data FROM tiles WHERE zoom_level = ? AND tile_column = ? AND tile_row = ?",
+        (z, x, 2 ** z - 1 - y),
+    ).fetchone()
+    return None if zeile is None else zeile[0]
+
+
+def lies_metadaten(verbindung):
+    return dict(verbindung.execute("SELECT name, value FROM metadata").fetchall())
+
+
+def grad_aus_mercator(x, y):
+    """EPSG:3857 -> (Länge, Breite) in Grad, für die MBTiles-Metadaten."""
+    laenge = x / UMFANG * 180
+    breite = math.degrees(2 * math.atan(math.exp(y / UMFANG * math.pi)) - math.pi / 2)
+    return laenge, breite
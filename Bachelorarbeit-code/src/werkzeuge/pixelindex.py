@@ -0,0 +1,102 @@
+# Persistenter Pixelindex (Zeile/Spalte) je Punkt für ein Rastergitter.
+#
+# Die Zuordnung Gebäude- bzw. Zellkoordinate -> Rasterpixel hängt nur von den Punkten
+# und vom Gitter des Rasters (CRS, Transformation, Größe) ab. Sie wird einmal berechnet
+# und als int32-Arrays neben der Quelldatei gespeichert. Jedes weitere Raster auf
+# demselben Gitter (andere WoE-Variante, neu klassifiziertes Raster) wird dann mit
+# einem einzigen NumPy-Gather ausgelesen.
+
+import hashlib
+import os
+from functools import lru_cache
+
+import numpy as np
+from pyproj import CRS, Transformer
+
+# Unterordner neben der Quelldatei
+INDEX_ORDNER = "pixelindex"
+
+
+# === 1. Gitterkennung ===
+
+def gitter_kennung(raster):
+    """Kurze Kennung aus CRS, Transformation und Größe eines Rasters."""
+    text = "|".join([
+        CRS.from_user_input(raster.crs).to_wkt(),
+        ",".join(f"{v:.9f}" for v in list(raster.transform)[:6]),
+        f"{raster.shape[0]}x{raster.shape[1]}",
+    ])
+    return hashlib.sha1(text.encode()).hexdigest()[:16]
+
+
+def _index_pfad(quelle_pfad, raster, name):
+    ordner = os.path.join(os.path.dirname(os.path.abspath(quelle_pfad)), INDEX_ORDNER)
+    stamm = os.path.splitext(os.path.basename(quelle_pfad))[0]
+    return os.path.join(ordner, f"{stamm}__{name}__{gitter_kennung(raster)}.npz")
+
+
+# === 2. Koordinatentransformation ===
+
+@lru_cache(maxsize=32)
+def _transformer(von_wkt, nach_wkt):
+    return Transformer.from_crs(von_wkt, nach_wkt, always_xy=True)
+
+
+def transformer(von, nach):
+    """Transformer von einem CRS in ein anderes (always_xy), je CRS-Paar gecacht."""
+    return _transformer(CRS.from_user_input(von).to_wkt(), CRS.from_user_input(nach).to_wkt())
+
+
+def transformiere_punkte(x, y, von, nach):
+    """Koordinaten als float64-Arrays von einem CRS in ein anderes; gleiche CRS bleiben unverändert."""
+    x = np.asarray(x, dtype="float64")
+    y = np.asarray(y, dtype="float64")
+    if CRS.from_user_input(von).equals(CRS.from_user_input(nach)):
+        return x, y
+    return transformer(von, nach).transform(x, y)
+
+
+# === 3. Index berechnen / laden ===
+
+def gespeicherter_index(quelle_pfad, raster, anzahl, name="punkte"):
+    """Gespeicherter Pixelindex, falls noch gültig, sonst None."""
+    pfad = _index_pfad(quelle_pfad, raster, name)
+    if not os.path.exists(pfad):
+        return None
+    gespeichert = np.load(pfad)
+    if (int(gespeichert["quelle_mtime_ns"]) != os.stat(quelle_pfad).st_mtime_ns
+            or len(gespeichert["zeile"]) != anzahl):
+        return None
+    return gespeichert["zeile"], gespeichert["spalte"]
+
+
+def pixel_index(quelle_pfad, raster, x, y, crs, name="punkte"):
+    """
+    Pixelindex (Zeile, Spalte) als int32 für die Punkte einer Quelldatei.
+
+    x, y liegen im CRS crs und werden bei Bedarf ins Raster-CRS transformiert.
+    Der Index wird unter pixelindex/<Datei>__<name>__<Gitterkennung>.npz gespeichert
+    und wiederverwendet, solange Quelldatei (Änderungszeit) und Punktanzahl gleich
+    bleiben. Punkte außerhalb des Rasters erhalten -1.
+    """
+    index = gespeicherter_index(quelle_pfad, raster, len(x), name)
+    if index is not None:
+        return index
+
+    pfad = _index_pfad(quelle_pfad, raster, name)
+    mtime = os.stat(quelle_pfad).st_mtime_ns
+    x, y = transformiere_punkte(x, y, crs, raster.crs)
+    zeile, spalte = raster.zeilen_spalten(x, y)
+    zeile = zeile.astype("int32")
+    spalte = spalte.astype("int32")
+
+    os.makedirs(os.path.dirname(pfad), exist_ok=True)
+    tmp = pfad + ".tmp.npz"
+    np.savez(tmp, zeile=zeile, spalte=spalte, quelle_mtime_ns=np.int64(mtime))
+    os.replace(tmp, pfad)
+    return zeile, spalte
+
+
+def sammle(raster, index):
+    """Liest ein Raster über einen vorberechneten Pixelindex aus (nodata -> NaN)."""
+    return raster.werte_an_index(*index)
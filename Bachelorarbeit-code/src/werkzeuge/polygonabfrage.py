@@ -0,0 +1,156 @@
+# Exposition innerhalb beliebiger Polygone (z. B. geplante Rückhalteflächen,
+# Puffer um Gewässerabschnitte).
+#
+# Gebäudepunkte und Mittelpunkte der 100-m-Zensuszellen werden einmal geladen,
+# klassifiziert und je in einem STRtree indiziert. Eine Abfrage transformiert nur
+# das Polygon in das CRS des jeweiligen Index, fragt die Bäume ab und summiert die
+# Treffer je Risikoklasse mit np.bincount. Die Instanz bleibt zwischen den
+# Abfragen im Speicher, sodass jede weitere Abfrage nur noch Millisekunden dauert.
+
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import shapely
+from pyproj import CRS
+
+from werkzeuge.gebaeude import lade_gebaeude_mit_risiko
+from werkzeuge.gebaeudetabelle import koordinaten
+from werkzeuge.gitter import SCHLUESSEL_SPALTE, gitter_schluessel, zellmittelpunkte
+from werkzeuge.pixelindex import transformer, transformiere_punkte
+from werkzeuge.raster_speicher import oeffne_raster
+from werkzeuge.risiko import labels_risiko, risiko_codes
+from werkzeuge.tabellen import lade_tabelle
+
+gebaeude_path = "data/shapefiles/buildings_unterfranken_clipped.shp"
+zensus_path = "outputs/tables/unterfranken_ueber65_absolut.parquet"
+raster_path = "data/raster/HSM_WoE_C.tif"
+
+ZENSUS_CRS = "EPSG:3035"
+
+
+# === 1. Polygon einlesen ===
+
+def lese_polygon(text):
+    """
+    Polygon aus WKT oder GeoJSON (Geometry, Feature oder FeatureCollection),
+    als Text oder Dateipfad. Mehrere Geometrien werden vereinigt.
+    """
+    if os.path.isfile(text):
+        with open(text, encoding="utf-8") as f:
+            text = f.read()
+    text = text.strip()
+
+    if text.startswith("{"):
+        daten = json.loads(text)
+        if daten.get("type") == "FeatureCollection":
+            geometrien = [shapely.geometry.shape(f["geometry"]) for f in daten["features"]]
+        elif daten.get("type") == "Feature":
+            geometrien = [shapely.geometry.shape(daten["geometry"])]
+        else:
+            geometrien = [shapely.geometry.shape(daten)]
+        polygon = shapely.union_all(geometrien)
+    else:
+        polygon = shapely.from_wkt(text)
+
+    if polygon.is_empty or polygon.geom_type not in ("Polygon", "MultiPolygon"):
+        raise ValueError(f"Erwartet Polygon oder MultiPolygon, erhalten: {polygon.geom_type}")
+    return polygon
+
+
+def transformiere(geometrie, von, nach):
+    """Geometrie von einem CRS in ein anderes umrechnen (Transformer werden gecacht)."""
+    if CRS.from_user_input(von).equals(CRS.from_user_input(nach)):
+        return geometrie
+    umrechnung = transformer(von, nach)
+    return shapely.transform(
+        geometrie, lambda k: np.column_stack(umrechnung.transform(k[:, 0], k[:, 1]))
+    )
+
+
+# === 2. Klassensummen ===
+
+def _klassen_summen(codes, gewichte=None):
+    """Summe je Risikoklasse 0..4 (nodata und Werte außerhalb der Grenzen entfallen)."""
+    anzahl = len(labels_risiko)
+    summen = np.bincount(codes.astype("int64") + 1, weights=gewichte, minlength=anzahl + 2)
+    return summen[1:anzahl + 1]
+
+
+def _aufschluesselung(summen, ganzzahlig=False):
+    """Klassensummen als Dict mit Gesamtsumme und Anteilen in %."""
+    gesamt = summen.sum()
+    umwandeln = int if ganzzahlig else float
+    return {
+        "klassen": {k: umwandeln(s) for k, s in zip(labels_risiko, summen)},
+        "gesamt": umwandeln(gesamt),
+        "anteile_pct": {k: (float(s / gesamt * 100) if gesamt else None) for k, s in zip(labels_risiko, summen)},
+    }
+
+
+# === 3. Abfrage-Index ===
+
+class PolygonAbfrage:
+    """Gebäude und Zensuszellen mit Risikoklasse in STRtrees für Polygonabfragen."""
+
+    def __init__(self, gebaeude_pfad=gebaeude_path, zensus_pfad=zensus_path, raster_pfad=raster_path):
+        # Gebäude im CRS des Shapefiles
+        gdf = lade_gebaeude_mit_risiko(gebaeude_pfad, raster_pfad)
+        x, y, self.gebaeude_crs = koordinaten(gdf)
+        self.gebaeude_codes = risiko_codes(gdf["Risiko"].values)
+        self.gebaeude_bewohner = (
+            pd.to_numeric(gdf["geb_bewohn"], errors="coerce").fillna(0).to_numpy()
+            if "geb_bewohn" in gdf.columns else None
+        )
+        self.gebaeude_baum = shapely.STRtree(shapely.points(x, y))
+
+        # Zensuszellen über ihren Mittelpunkt (EPSG:3035), Klasse wie in Gemeinde_Statistik.py
+        df = lade_tabelle(zensus_pfad)
+        if SCHLUESSEL_SPALTE not in df.columns:
+            df[SCHLUESSEL_SPALTE] = gitter_schluessel(df["GITTER_ID_100m"])
+        x, y = zellmittelpunkte(df[SCHLUESSEL_SPALTE].values)
+        raster = oeffne_raster(raster_pfad)
+        x_raster, y_raster = transformiere_punkte(x, y, ZENSUS_CRS, raster.crs)
+        self.zensus_codes = risiko_codes(raster.werte(x_raster, y_raster))
+        self.einwohner = pd.to_numeric(df["Einwohner"], errors="coerce").fillna(0).clip(lower=0).to_numpy()
+        self.ueber65 = (
+            pd.to_numeric(df["Ueber65_Absolut"], errors="coerce").fillna(0).clip(lower=0).to_numpy()
+            if "Ueber65_Absolut" in df.columns else None
+        )
+        self.zensus_baum = shapely.STRtree(shapely.points(x, y))
+
+    def abfrage(self, polygon, crs=None):
+        """
+        Gebäude, Bewohner, Einwohner und Ü65 je Risikoklasse innerhalb des Polygons.
+
+        polygon: shapely-Geometrie oder WKT/GeoJSON-Text; crs: CRS des Polygons
+        (Standard: CRS der Gebäude). Gebäude zählen, wenn ihr Punkt im Polygon liegt,
+        Zensuszellen, wenn ihr Mittelpunkt im Polygon liegt.
+        """
+        if isinstance(polygon, str):
+            polygon = lese_polygon(polygon)
+        crs = self.gebaeude_crs if crs is None else crs
+
+        # Flächenangabe in EPSG:3035 (flächentreu)
+        zensus_flaeche = transformiere(polygon, crs, ZENSUS_CRS)
+        gebaeude_flaeche = transformiere(polygon, crs, self.gebaeude_crs)
+        shapely.prepare(zensus_flaeche)
+        shapely.prepare(gebaeude_flaeche)
+
+        treffer = self.gebaeude_baum.query(gebaeude_flaeche, predicate="intersects")
+        codes = self.gebaeude_codes[treffer]
+        ergebnis = {
+            "flaeche_km2": float(zensus_flaeche.area / 1e6),
+            "gebaeude": _aufschluesselung(_klassen_summen(codes), ganzzahlig=True),
+        }
+        if self.gebaeude_bewohner is not None:
+            ergebnis["bewohner"] = _aufschluesselung(_klassen_summen(codes, self.gebaeude_bewohner[treffer]))
+
+        treffer = self.zensus_baum.query(zensus_flaeche, predicate="intersects")
+        codes = self.zensus_codes[treffer]
+        ergebnis["zensuszellen"] = int(len(treffer))
+        ergebnis["einwohner"] = _aufschluesselung(_klassen_summen(codes, self.einwohner[treffer]))
+        if self.ueber65 is not None:
+            ergebnis["ueber65"] = _aufschluesselung(_klassen_summen(codes, self.ueber65[treffer]))
+        return ergebnis
@@ -0,0 +1,92 @@
+# Risikowert, Risikoklasse und Zensuswerte der 100-m-Zelle für beliebige Koordinaten
+# (z. B. Adresslisten), stapelweise für viele Punkte auf einmal.
+#
+# Die Zensuszellen liegen als dichtes int32-Gitter (Zeile/Spalte = Nord-/Ostindex
+# der Zelle, Wert = Zeile in der Zensustabelle) im Speicher. Eine Abfrage
+# transformiert die Koordinaten mit gecachten Transformern, liest das Raster über
+# die Pixelindizes aus der memmap und holt die Zellwerte mit einem Gather aus
+# dem Gitter, ohne Join oder Suche.
+
+import numpy as np
+import pandas as pd
+
+from werkzeuge.gitter import SCHLUESSEL_SPALTE, gitter_schluessel, zell_indizes, zell_schluessel
+from werkzeuge.pixelindex import transformiere_punkte
+from werkzeuge.raster_speicher import oeffne_raster
+from werkzeuge.risiko import CODE_AUSSERHALB, CODE_FEHLT, labels_risiko, risiko_codes
+from werkzeuge.tabellen import lade_tabelle
+
+zensus_path = "outputs/tables/unterfranken_ueber65_absolut.parquet"
+raster_path = "data/raster/HSM_WoE_C.tif"
+
+ZENSUS_CRS = "EPSG:3035"
+ZELLGROESSE = 100
+
+# Zensusspalten, die je Punkt übernommen werden (sofern in der Tabelle vorhanden)
+ZENSUS_SPALTEN = ("Einwohner", "Ueber65_Absolut")
+
+
+class PunktAbfrage:
+    """Raster und Zensusgitter im Speicher für stapelweise Koordinatenabfragen."""
+
+    def __init__(self, raster_pfad=raster_path, zensus_pfad=zensus_path, spalten=ZENSUS_SPALTEN):
+        self.raster = oeffne_raster(raster_pfad)
+
+        df = lade_tabelle(zensus_pfad)
+        if SCHLUESSEL_SPALTE not in df.columns:
+            df[SCHLUESSEL_SPALTE] = gitter_schluessel(df["GITTER_ID_100m"])
+        self.spalten = [s for s in spalten if s in df.columns]
+        self.werte = {
+            s: pd.to_numeric(df[s], errors="coerce").to_numpy(dtype="float64") for s in self.spalten
+        }
+
+        # Dichtes Gitter über die Ausdehnung der Tabelle: Zellindex -> Tabellenzeile (-1 = keine Zelle)
+        nord, ost = zell_indizes(df[SCHLUESSEL_SPALTE].to_numpy())
+        self.nord_min, self.ost_min = nord.min(), ost.min()
+        self.zellen = np.full((nord.max() - self.nord_min + 1, ost.max() - self.ost_min + 1), -1, dtype="int32")
+        self.zellen[nord - self.nord_min, ost - self.ost_min] = np.arange(len(df), dtype="int32")
+
+    def zeilen(self, x, y):
+        """Tabellenzeile der Zensuszelle je EPSG:3035-Koordinate (-1 ohne Zelle)."""
+        with np.errstate(invalid="ignore"):
+            nord = np.floor(y / ZELLGROESSE).astype("int64") - self.nord_min
+            ost = np.floor(x / ZELLGROESSE).astype("int64") - self.ost_min
+        innen = (np.isfinite(x) & np.isfinite(y)
+                 & (nord >= 0) & (nord < self.zellen.shape[0]) & (ost >= 0) & (ost < self.zellen.shape[1]))
+        zeilen = np.full(len(nord), -1, dtype="int32")
+        zeilen[innen] = self.zellen[nord[innen], ost[innen]]
+        return zeilen
+
+    def abfrage(self, x, y, crs="EPSG:4326"):
+        """
+        Ergebnis je Punkt als DataFrame (Reihenfolge wie x/y):
+        Risiko (Rasterwert, nodata -> NaN), Risiko_Klasse, gitter_key der 100-m-Zelle
+        und die Zensusspalten der Zelle (NaN, wenn die Zelle nicht in der Tabelle steht).
+        Ungültige Koordinaten (NaN) erhalten gitter_key -1.
+        """
+        x = np.asarray(x, dtype="float64")
+        y = np.asarray(y, dtype="float64")
+
+        x_raster, y_raster = transformiere_punkte(x, y, crs, self.raster.crs)
+        risiko = self.raster.werte(x_raster, y_raster)
+        codes = risiko_codes(risiko)
+        klassen = np.where((codes == CODE_FEHLT) | (codes == CODE_AUSSERHALB), -1, codes)
+
+        x_zensus, y_zensus = transformiere_punkte(x, y, crs, ZENSUS_CRS)
+        gueltig = np.isfinite(x_zensus) & np.isfinite(y_zensus)
+        schluessel = np.full(len(x), -1, dtype="int64")
+        schluessel[gueltig] = zell_schluessel(
+            np.floor(y_zensus[gueltig] / ZELLGROESSE), np.floor(x_zensus[gueltig] / ZELLGROESSE)
+        )
+        ergebnis = pd.DataFrame({
+            "Risiko": risiko.astype("float32"),
+            "Risiko_Klasse": pd.Categorical.from_codes(klassen, categories=labels_risiko),
+            SCHLUESSEL_SPALTE: schluessel,
+        })
+        zeilen = self.zeilen(x_zensus, y_zensus)
+        vorhanden = zeilen >= 0
+        for spalte in self.spalten:
+            werte = np.full(len(x), np.nan)
+            werte[vorhanden] = self.werte[spalte][zeilen[vorhanden]]
+            ergebnis[spalte] = werte
+        return ergebnis
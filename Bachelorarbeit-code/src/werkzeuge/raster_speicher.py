@@ -0,0 +1,131 @@
+# Risikoraster als schreibgeschützte np.memmap.
+#
+# Band 1 von HSM_WoE_C.tif wird einmalig als .npy-Datei exportiert (mit Transformation,
+# CRS und nodata in einer .json daneben). Alle Prozesse öffnen die Datei mit
+# np.load(mmap_mode="r") und teilen sich damit eine Kopie im Page-Cache des
+# Betriebssystems, statt das Raster jeweils über GDAL in eigenen Speicher zu lesen.
+
+import json
+import os
+
+import numpy as np
+import rasterio
+from affine import Affine
+
+
+# === 1. Export ===
+
+def exportiere_raster(tif_pfad, npy_pfad=None):
+    """
+    Schreibt Band 1 blockweise in eine .npy-Datei und die Metadaten in <npy>.json.
+
+    Ein vorhandener Export wird nur neu geschrieben, wenn sich das GeoTIFF
+    seit dem letzten Export geändert hat. Rückgabe: Pfad der .npy-Datei.
+    """
+    if npy_pfad is None:
+        npy_pfad = os.path.splitext(tif_pfad)[0] + ".npy"
+    meta_pfad = npy_pfad + ".json"
+    mtime = os.stat(tif_pfad).st_mtime_ns
+
+    if os.path.exists(npy_pfad) and os.path.exists(meta_pfad):
+        with open(meta_pfad, encoding="utf-8") as f:
+            if json.load(f).get("quelle_mtime_ns") == mtime:
+                return npy_pfad
+
+    with rasterio.open(tif_pfad) as src:
+        tmp = npy_pfad + ".tmp.npy"
+        band = np.lib.format.open_memmap(tmp, mode="w+", dtype=src.dtypes[0], shape=(src.height, src.width))
+        for _, fenster in src.block_windows(1):
+            zeilen, spalten = fenster.toslices()
+            band[zeilen, spalten] = src.read(1, window=fenster)
+        band.flush()
+        del band
+        os.replace(tmp, npy_pfad)
+
+        meta = {
+            "transform": list(src.transform)[:6],
+            "crs": src.crs.to_wkt(),
+            "nodata": src.nodata,
+            "quelle": os.path.abspath(tif_pfad),
+            "quelle_mtime_ns": mtime,
+        }
+    with open(meta_pfad, "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+    print(f"Raster als memmap exportiert: {npy_pfad}")
+    return npy_pfad
+
+
+# === 2. Zugriff ===
+
+class RasterSpeicher:
+    """Band 1 als np.memmap mit Transformation, CRS und nodata."""
+
+    def __init__(self, npy_pfad):
+        with open(npy_pfad + ".json", encoding="utf-8") as f:
+            meta = json.load(f)
+        self.pfad = npy_pfad
+        self.daten = np.load(npy_pfad, mmap_mode="r")
+        self.transform = Affine(*meta["transform"])
+        self.crs = meta["crs"]
+        self.nodata = meta["nodata"]
+
+    @property
+    def shape(self):
+        return self.daten.shape
+
+    def zeilen_spalten(self, x, y):
+        """Pixelindizes (Zeile, Spalte) als int64; außerhalb liegende Punkte erhalten -1."""
+        spalte, zeile = ~self.transform * (np.asarray(x, dtype="float64"), np.asarray(y, dtype="float64"))
+        zeile = np.floor(zeile)
+        spalte = np.floor(spalte)
+        innen = (zeile >= 0) & (zeile < self.shape[0]) & (spalte >= 0) & (spalte < self.shape[1])
+        zeile = np.where(innen, zeile, -1).astype("int64")
+        spalte = np.where(innen, spalte, -1).astype("int64")
+        return zeile, spalte
+
+    def werte_an_index(self, zeile, spalte):
+        """Rasterwerte an Pixelindizes; nodata und Indizes -1 werden zu NaN."""
+        innen = zeile >= 0
+        werte = np.full(len(zeile), np.nan, dtype="float64")
+        werte[innen] = self.daten[zeile[innen], spalte[innen]]
+        if self.nodata is not None:
+            werte[werte == self.nodata] = np.nan
+        return werte
+
+    def werte(self, x, y):
+        """Rasterwerte an Koordinaten im Raster-CRS (nodata und außerhalb -> NaN)."""
+        return self.werte_an_index(*self.zeilen_spalten(x, y))
+
+
+def oeffne_raster(tif_pfad):
+    """Öffnet das Raster als RasterSpeicher und exportiert es bei Bedarf vorher."""
+    return RasterSpeicher(exportiere_raster(tif_pfad))
+
+
+# === 3. GeoTIFF schreiben ===
+
+def schreibe_geotiff(pfad, baender, transform, crs, nodata=None, beschreibungen=None):
+    """
+    Schreibt ein oder mehrere 2D-Arrays (gleiche Form und Datentyp) als gekacheltes, komprimiertes GeoTIFF.
+
+    beschreibungen: optionale Bandnamen (z. B. Risikoklassen).
+    """
+    baender = np.asarray(baender)
+    if baender.ndim == 2:
+        baender = baender[None]
+    profil = {
+        "driver": "GTiff",
+        "height": baender.shape[1],
+        "width": baender.shape[2],
+        "count": baender.shape[0],
+        "dtype": baender.dtype,
+        "crs": crs,
+        "transform": transform,
+        "nodata": nodata,
+        "compress": "deflate",
+        "tiled": True,
+    }
+    with rasterio.open(pfad, "w", **profil) as ziel:
+        ziel.write(baender)
+        for i, beschreibung in enumerate(beschreibungen or [], start=1):
+            ziel.set_band_description(i, beschreibung)
@@ -0,0 +1,156 @@
+# Räumliche Sortierung und Zeilengruppen mit Ausdehnung für Parquet-Tabellen.
+#
+# Punkte (Gebäude) werden entlang einer Hilbert-Kurve sortiert: benachbarte Zeilen
+# liegen auch räumlich nah beieinander. Das Auslesen eines Rasters über den
+# Pixelindex läuft dann Block für Block durch die memmap statt kreuz und quer.
+# Zensuszellen liegen über den Gitter-Schlüssel (verschränkte Ziffern, werkzeuge/gitter.py)
+# bereits in einer Z-Ordnung und werden einfach nach dem Schlüssel sortiert.
+#
+# Beim Schreiben wird die Ausdehnung (xmin, ymin, xmax, ymax) jeder Zeilengruppe in den
+# Parquet-Metadaten abgelegt. Ein Ausschnitt (z. B. eine Stadt) liest dann nur die
+# Zeilengruppen, deren Ausdehnung ihn schneidet.
+
+import json
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from werkzeuge.pixelindex import transformiere_punkte
+
+# Gitter der Hilbert-Kurve: 2^ORDNUNG x 2^ORDNUNG Zellen über die Ausdehnung der Punkte
+# (für Unterfranken rund 3 m je Zelle)
+ORDNUNG = 16
+ZEILEN_JE_GRUPPE = 16_384
+
+META_SCHLUESSEL = b"zeilengruppen_bbox"
+
+
+# === 1. Hilbert-Schlüssel ===
+
+def hilbert_schluessel(x, y, ausdehnung=None, ordnung=ORDNUNG):
+    """
+    Position der Punkte auf einer Hilbert-Kurve (int64).
+
+    ausdehnung: (xmin, ymin, xmax, ymax) des Gitters, sonst die der Punkte.
+    NaN-Koordinaten erhalten den Schlüssel -1.
+    """
+    x = np.asarray(x, dtype="float64")
+    y = np.asarray(y, dtype="float64")
+    gueltig = np.isfinite(x) & np.isfinite(y)
+    if ausdehnung is None:
+        if not gueltig.any():
+            return np.full(x.shape, -1, dtype="int64")
+        ausdehnung = (x[gueltig].min(), y[gueltig].min(), x[gueltig].max(), y[gueltig].max())
+    xmin, ymin, xmax, ymax = ausdehnung
+    n = 1 << ordnung
+    breite = max(xmax - xmin, ymax - ymin) or 1.0
+    xi = np.clip(np.nan_to_num((x - xmin) / breite * n), 0, n - 1).astype("int64")
+    yi = np.clip(np.nan_to_num((y - ymin) / breite * n), 0, n - 1).astype("int64")
+
+    schluessel = np.zeros(x.shape, dtype="int64")
+    s = n >> 1
+    while s > 0:
+        rx = (xi & s) > 0
+        ry = (yi & s) > 0
+        schluessel += s * s * ((3 * rx.astype("int64")) ^ ry.astype("int64"))
+        # Quadrant drehen, damit die Kurve im Teilquadrat richtig weiterläuft
+        spiegeln = ~ry & rx
+        xi = np.where(spiegeln, n - 1 - xi, xi)
+        yi = np.where(spiegeln, n - 1 - yi, yi)
+        xi, yi = np.where(~ry, yi, xi), np.where(~ry, xi, yi)
+        s >>= 1
+    schluessel[~gueltig] = -1
+    return schluessel
+
+
+def raeumliche_reihenfolge(x, y, ausdehnung=None):
+    """Zeilenreihenfolge entlang der Hilbert-Kurve (stabil, ungültige Punkte zuerst)."""
+    return np.argsort(hilbert_schluessel(x, y, ausdehnung), kind="stable")
+
+
+# === 2. Schreiben mit Ausdehnung je Zeilengruppe ===
+
+def schreibe_zeilengruppen(df, pfad, x, y, crs, metadaten=None, zeilen_je_gruppe=ZEILEN_JE_GRUPPE):
+    """
+    Schreibt df als Parquet mit Zeilengruppen fester Größe.
+
+    x, y: Koordinaten je Zeile im CRS crs (df ist bereits räumlich sortiert).
+    Die Ausdehnung jeder Zeilengruppe steht unter "zeilengruppen_bbox" in den
+    Metadaten, weitere Einträge (bytes -> bytes) kommen aus metadaten.
+    """
+    x = np.asarray(x, dtype="float64")
+    y = np.asarray(y, dtype="float64")
+    boxen = []
+    for start in range(0, len(df), zeilen_je_gruppe):
+        gx, gy = x[start:start + zeilen_je_gruppe], y[start:start + zeilen_je_gruppe]
+        gueltig = np.isfinite(gx) & np.isfinite(gy)
+        if gueltig.any():
+            boxen.append([float(gx[gueltig].min()), float(gy[gueltig].min()),
+                          float(gx[gueltig].max()), float(gy[gueltig].max())])
+        else:
+            boxen.append(None)
+
+    daten = pa.Table.from_pandas(df, preserve_index=False)
+    alle = dict(daten.schema.metadata or {})
+    alle.update(metadaten or {})
+    alle[META_SCHLUESSEL] = json.dumps({"crs": str(crs), "zeilen_je_gruppe": zeilen_je_gruppe,
+                                        "bbox": boxen}).encode()
+    pq.write_table(daten.replace_schema_metadata(alle), pfad, row_group_size=zeilen_je_gruppe)
+
+
+# === 3. Ausschnitte lesen ===
+
+def zeilengruppen_bbox(pfad):
+    """(CRS, Liste der Ausdehnungen je Zeilengruppe) oder None, wenn die Datei keine hat."""
+    datei = pq.ParquetFile(pfad)
+    eintrag = (datei.schema_arrow.metadata or {}).get(META_SCHLUESSEL)
+    if eintrag is None:
+        return None
+    info = json.loads(eintrag)
+    if len(info["bbox"]) != datei.num_row_groups:
+        return None
+    return info["crs"], info["bbox"]
+
+
+def transformiere_bbox(bbox, von, nach, punkte=21):
+    """Ausdehnung in ein anderes CRS (Ränder mit punkte Stützstellen je Seite)."""
+    xmin, ymin, xmax, ymax = bbox
+    t = np.linspace(0, 1, punkte)
+    xs = xmin + t * (xmax - xmin)
+    ys = ymin + t * (ymax - ymin)
+    x = np.concatenate([xs, np.full(punkte, xmax), xs, np.full(punkte, xmin)])
+    y = np.concatenate([np.full(punkte, ymin), ys, np.full(punkte, ymax), ys])
+    x, y = transformiere_punkte(x, y, von, nach)
+    return x.min(), y.min(), x.max(), y.max()
+
+
+def lade_zeilengruppen(pfad, bbox=None, crs=None, spalten=None):
+    """
+    Liest nur die Zeilengruppen, deren Ausdehnung bbox schneidet.
+
+    bbox (xmin, ymin, xmax, ymax) im CRS crs (Standard: CRS der Datei). Die Zeilen
+    sind nicht exakt gefiltert; das übernimmt der Aufrufer mit seinen Koordinaten.
+    Ohne bbox oder ohne Ausdehnungen in der Datei wird alles gelesen.
+    """
+    info = zeilengruppen_bbox(pfad) if bbox is not None else None
+    if info is None:
+        return pd.read_parquet(pfad, columns=spalten)
+    datei_crs, boxen = info
+    if crs is not None:
+        bbox = transformiere_bbox(bbox, crs, datei_crs)
+    xmin, ymin, xmax, ymax = bbox
+    gruppen = [i for i, b in enumerate(boxen)
+               if b is not None and b[0] <= xmax and b[2] >= xmin and b[1] <= ymax and b[3] >= ymin]
+    datei = pq.ParquetFile(pfad)
+    if not gruppen:
+        leer = datei.schema_arrow.empty_table()
+        return (leer.select(spalten) if spalten is not None else leer).to_pandas()
+    return datei.read_row_groups(gruppen, columns=spalten).to_pandas()
+
+
+def in_bbox(x, y, bbox):
+    """Maske der Punkte innerhalb von bbox (Ränder eingeschlossen)."""
+    xmin, ymin, xmax, ymax = bbox
+    return (x >= xmin) & (x <= xmax) & (y >= ymin) & (y <= ymax)
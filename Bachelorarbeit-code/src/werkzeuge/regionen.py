@@ -0,0 +1,97 @@
+# Zuordnung von Zensus-Gitterzellen zu Regionen (z. B. Regierungsbezirke).
+#
+# Für jede 1-km-Zelle wird einmal bestimmt, ob sie vollständig in einer Region liegt.
+# Die 100-m-Zellen einer Tabelle werden dann über ihren Gitter-Schlüssel
+# (Division durch 100 = übergeordnete 1-km-Zelle) nachgeschlagen; nur Zellen in
+# 1-km-Zellen auf einer Regionsgrenze werden exakt per Punkt-in-Polygon geprüft.
+
+import geopandas as gpd
+import numpy as np
+import shapely
+
+from werkzeuge.gitter import zell_schluessel
+
+# Kennungen in der Nachschlagetabelle
+REGION_KEINE = -1
+REGION_GRENZE = -2
+
+
+# === 1. Regionen laden ===
+
+def lade_regionen(pfad, namen=None, name_spalte="GEN"):
+    """Lädt Regionspolygone in EPSG:3035, optional nur die angegebenen Namen."""
+    gdf = gpd.read_file(pfad, columns=[name_spalte]).to_crs("EPSG:3035")
+    if namen:
+        fehlend = sorted(set(namen) - set(gdf[name_spalte]))
+        if fehlend:
+            raise ValueError(f"Regionen nicht gefunden: {fehlend}")
+        gdf = gdf[gdf[name_spalte].isin(namen)]
+    # Mehrteilige Regionen zu einem Polygon zusammenfassen
+    gdf = gdf.dissolve(by=name_spalte, as_index=False)
+    return gdf.rename(columns={name_spalte: "name"})[["name", "geometry"]].reset_index(drop=True)
+
+
+# === 2. Nachschlagetabelle auf 1-km-Ebene ===
+
+def baue_lookup(regionen):
+    """
+    Nachschlagetabelle 1-km-Schlüssel -> Regionsindex.
+
+    Rückgabe: (sortierte int64-Schlüssel, int16-Werte). Werte sind der Index der
+    Region, wenn die 1-km-Zelle vollständig in ihr liegt, sonst REGION_GRENZE.
+    Zellen ohne Überschneidung mit einer Region sind nicht enthalten.
+    """
+    polygone = np.asarray(regionen.geometry.values)
+    shapely.prepare(polygone)
+
+    schluessel_liste, werte_liste = [], []
+    for i, polygon in enumerate(polygone):
+        minx, miny, maxx, maxy = polygon.bounds
+        ost, nord = np.meshgrid(
+            np.arange(np.floor(minx / 1000), np.ceil(maxx / 1000), dtype="int64"),
+            np.arange(np.floor(miny / 1000), np.ceil(maxy / 1000), dtype="int64"),
+        )
+        ost, nord = ost.ravel(), nord.ravel()
+        zellen = shapely.box(ost * 1000, nord * 1000, ost * 1000 + 1000, nord * 1000 + 1000)
+
+        schneidet = shapely.intersects(polygon, zellen)
+        innen = shapely.contains_properly(polygon, zellen)
+        schluessel_liste.append(zell_schluessel(nord[schneidet], ost[schneidet]))
+        werte_liste.append(np.where(innen[schneidet], i, REGION_GRENZE).astype("int16"))
+
+    schluessel = np.concatenate(schluessel_liste)
+    werte = np.concatenate(werte_liste)
+
+    # Zellen, die in mehreren Regionen vorkommen, liegen auf einer Grenze
+    reihenfolge = np.argsort(schluessel, kind="stable")
+    schluessel, werte = schluessel[reihenfolge], werte[reihenfolge]
+    eindeutig, erste, anzahl = np.unique(schluessel, return_index=True, return_counts=True)
+    werte = werte[erste]
+    werte[anzahl > 1] = REGION_GRENZE
+    return eindeutig, werte
+
+
+# === 3. Zellen zuordnen ===
+
+def region_ids(gitter_keys, x, y, lookup, regionen):
+    """
+    Regionsindex je 100-m-Zelle (REGION_KEINE = außerhalb aller Regionen).
+
+    x, y sind die Zellmittelpunkte in EPSG:3035 und werden nur für Zellen
+    auf einer Regionsgrenze benötigt.
+    """
+    lookup_schluessel, lookup_werte = lookup
+    km = np.asarray(gitter_keys, dtype="int64") // 100
+    pos = np.searchsorted(lookup_schluessel, km).clip(max=len(lookup_schluessel) - 1)
+    treffer = lookup_schluessel[pos] == km
+    ids = np.where(treffer, lookup_werte[pos], REGION_KEINE).astype("int16")
+
+    grenze = np.flatnonzero(ids == REGION_GRENZE)
+    if len(grenze):
+        ids[grenze] = REGION_KEINE
+        x = np.asarray(x, dtype="float64")[grenze]
+        y = np.asarray(y, dtype="float64")[grenze]
+        for i, polygon in enumerate(regionen.geometry.values):
+            innen = shapely.contains_xy(polygon, x, y)
+            ids[grenze[innen]] = i
+    return ids
@@ -0,0 +1,51 @@
+# Risikoklassen des Hochwasser-Suszeptibilitätsrasters (HSM_WoE_C.tif)
+# und Auslesen der Rasterwerte an Punktkoordinaten.
+
+import numpy as np
+
+# === 1. Klassengrenzen und Beschriftungen ===
+bins_risiko = [-18.459, -10.999, -6.982, -2.62, 2.546, 10.81]
+labels_risiko = ["sehr gering", "gering", "mittel", "hoch", "sehr hoch"]
+
+farben = {
+    "sehr gering": "darkgreen",
+    "gering": "green",
+    "mittel": "gold",
+    "hoch": "orange",
+    "sehr hoch": "red",
+}
+schriftfarben = {
+    "sehr gering": "white",
+    "gering": "white",
+    "mittel": "black",
+    "hoch": "black",
+    "sehr hoch": "black",
+}
+
+# Code für gültige Rasterwerte außerhalb der Klassengrenzen
+# (bei pd.cut wären das NaN-Klassen, die Werte zählen aber zur Gesamtsumme)
+CODE_AUSSERHALB = len(labels_risiko)
+# Code für fehlende Rasterwerte (nodata)
+CODE_FEHLT = -1
+
+
+# === 2. Klassifizierung ===
+
+def risiko_codes(werte, bins=bins_risiko):
+    """
+    Ordnet Rasterwerte ganzzahligen Risikoklassen 0..len(bins)-2 zu.
+
+    Entspricht pd.cut(..., right=True, include_lowest=True), liefert aber
+    int8-Codes statt einer Kategorie-Spalte. Werte außerhalb der Grenzen
+    erhalten CODE_AUSSERHALB, NaN-Werte CODE_FEHLT.
+    """
+    werte = np.asarray(werte, dtype="float64")
+    bins = np.asarray(bins, dtype="float64")
+    anzahl_klassen = len(bins) - 1
+
+    codes = np.searchsorted(bins, werte, side="left") - 1
+    codes[werte == bins[0]] = 0  # include_lowest
+    codes[(codes < 0) | (codes >= anzahl_klassen)] = anzahl_klassen
+    codes[np.isnan(werte)] = CODE_FEHLT
+    return codes.astype("int8")
+
@@ -0,0 +1,125 @@
+# Sensitivität der Klassenanteile gegenüber den Grenzen der Risikoklassen.
+#
+# Die Risikowerte werden einmal je Gruppe (Gemeinde) sortiert und die Gewichte
+# (Gebäude, Einwohner) kumuliert. Der Anteil einer Klasse (a, b] ist dann die
+# Differenz zweier kumulierter Summen an den per np.searchsorted gefundenen
+# Positionen. Tausende Grenzvarianten kosten so nur je ein searchsorted.
+
+import numpy as np
+import pandas as pd
+
+from werkzeuge.risiko import bins_risiko
+
+# Gruppenname für die Gesamtauswertung
+GESAMT = "gesamt"
+
+
+# === 1. Grenzvarianten erzeugen ===
+
+def zufaellige_bins(basis=bins_risiko, streuung=1.0, anzahl=1000, seed=0):
+    """
+    Grenzvarianten mit gleichverteilt verschobenen inneren Grenzen (±streuung).
+
+    Die äußeren Grenzen bleiben fest, die inneren werden aufsteigend sortiert.
+    Zeile 0 ist die unveränderte Basis. Ergebnis: Array (anzahl + 1, len(basis)).
+    """
+    basis = np.asarray(basis, dtype="float64")
+    rng = np.random.default_rng(seed)
+    varianten = np.repeat(basis[None, :], anzahl + 1, axis=0)
+    varianten[1:, 1:-1] += rng.uniform(-streuung, streuung, size=(anzahl, len(basis) - 2))
+    varianten[:, 1:-1] = np.sort(np.clip(varianten[:, 1:-1], basis[0], basis[-1]), axis=1)
+    return varianten
+
+
+def verschobene_grenze(basis=bins_risiko, grenze=4, werte=(0.0,)):
+    """Varianten, in denen nur die Grenze mit Index grenze auf die angegebenen Werte gesetzt wird."""
+    basis = np.asarray(basis, dtype="float64")
+    varianten = np.repeat(basis[None, :], len(werte), axis=0)
+    varianten[:, grenze] = werte
+    if np.any(np.diff(varianten, axis=1) < 0):
+        raise ValueError("Die verschobene Grenze verletzt die Reihenfolge der Klassen!")
+    return varianten
+
+
+# === 2. Sortierte, kumulierte Gewichte ===
+
+def sortiere_gewichtet(werte, gewichte=None, gruppen=None):
+    """
+    Sortiert die Risikowerte je Gruppe und kumuliert die Gewichte.
+
+    NaN-Werte entfallen. Liefert ein Dict mit den Gruppen (Reihenfolge wie in
+    np.unique) sowie je Gruppe den sortierten Werten und kumulierten Gewichten
+    (mit führender 0).
+    """
+    werte = np.asarray(werte, dtype="float64")
+    gewichte = np.ones(len(werte)) if gewichte is None else np.asarray(gewichte, dtype="float64")
+    gruppen = np.zeros(len(werte), dtype="int64") if gruppen is None else np.asarray(gruppen)
+
+    gueltig = ~np.isnan(werte)
+    werte, gewichte, gruppen = werte[gueltig], gewichte[gueltig], gruppen[gueltig]
+
+    reihenfolge = np.lexsort((werte, gruppen))
+    werte, gewichte, gruppen = werte[reihenfolge], gewichte[reihenfolge], gruppen[reihenfolge]
+    namen, start = np.unique(gruppen, return_index=True)
+    grenzen = np.append(start, len(werte))
+
+    return {
+        "gruppen": namen,
+        "werte": [werte[a:b] for a, b in zip(grenzen[:-1], grenzen[1:])],
+        "kumuliert": [
+            np.concatenate(([0.0], np.cumsum(gewichte[a:b]))) for a, b in zip(grenzen[:-1], grenzen[1:])
+        ],
+    }
+
+
+# === 3. Klassenanteile für alle Varianten ===
+
+def _klassen_summen(werte, kumuliert, varianten):
+    """Gewichtssummen je Variante und Klasse (wie pd.cut mit right=True, include_lowest=True)."""
+    # Gewicht aller Werte <= Grenze
+    bis = kumuliert[np.searchsorted(werte, varianten, side="right")]
+    # Untere Grenze der ersten Klasse ist eingeschlossen
+    bis[:, 0] = kumuliert[np.searchsorted(werte, varianten[:, 0], side="left")]
+    return np.diff(bis, axis=1)
+
+
+def klassen_anteile(sortiert, varianten):
+    """
+    Klassenanteile (%) für alle Grenzvarianten und Gruppen.
+
+    Liefert ein Array (Gruppen, Varianten, Klassen); Gruppen ohne gültige Werte
+    in den Klassen ergeben NaN.
+    """
+    varianten = np.atleast_2d(np.asarray(varianten, dtype="float64"))
+    summen = np.zeros((len(sortiert["gruppen"]), len(varianten), varianten.shape[1] - 1))
+    for i, (werte, kumuliert) in enumerate(zip(sortiert["werte"], sortiert["kumuliert"])):
+        summen[i] = _klassen_summen(werte, kumuliert, varianten)
+    gesamt = summen.sum(axis=2, keepdims=True)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(gesamt > 0, summen / gesamt * 100, np.nan)
+
+
+def gesamt_anteile(sortiert, varianten):
+    """Klassenanteile (%) über alle Gruppen zusammen, Array (Varianten, Klassen)."""
+    varianten = np.atleast_2d(np.asarray(varianten, dtype="float64"))
+    summen = np.zeros((len(varianten), varianten.shape[1] - 1))
+    for werte, kumuliert in zip(sortiert["werte"], sortiert["kumuliert"]):
+        summen += _klassen_summen(werte, kumuliert, varianten)
+    gesamt = summen.sum(axis=1, keepdims=True)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(gesamt > 0, summen / gesamt * 100, np.nan)
+
+
+# === 4. Tabellen ===
+
+def band_tabelle(anteile, gruppen, labels, quantile=(0.05, 0.5, 0.95)):
+    """Basis (Variante 0) und Quantile der Anteile über alle Varianten je Gruppe und Klasse."""
+    q = np.nanquantile(anteile, quantile, axis=1)  # (Quantile, Gruppen, Klassen)
+    tabelle = pd.DataFrame({
+        "Gruppe": np.repeat(gruppen, len(labels)),
+        "Klasse": np.tile(labels, len(gruppen)),
+        "Basis_pct": anteile[:, 0, :].ravel(),
+    })
+    for i, qi in enumerate(quantile):
+        tabelle[f"q{round(qi * 100):02d}_pct"] = q[i].ravel()
+    return tabelle
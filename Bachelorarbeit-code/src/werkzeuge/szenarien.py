@@ -0,0 +1,141 @@
+# Mehrere Gefahrenraster (WoE-Varianten, HQ100/HQextrem-Tiefen ...) für dieselben
+# Punkte in einem Durchlauf auslesen.
+#
+# Teure Schritte werden nur einmal ausgeführt:
+# - Koordinatentransformation: einmal je Ziel-CRS
+# - Pixelindex: einmal je Rastergitter (werkzeuge/pixelindex.py)
+# - Sortierung nach Pixelposition: einmal je Rastergitter
+# Pro Raster bleibt nur ein sortierter Gather auf der memmap übrig.
+
+import os
+
+import numpy as np
+import pandas as pd
+from pyproj import CRS
+
+from werkzeuge.pixelindex import gespeicherter_index, gitter_kennung, pixel_index, transformiere_punkte
+from werkzeuge.raster_speicher import oeffne_raster
+from werkzeuge.risiko import CODE_FEHLT, bins_risiko, labels_risiko, risiko_codes
+
+SZENARIO_SPALTE = "Szenario"
+OBJEKT_SPALTE = "objekt"
+
+
+# === 1. Szenarien benennen ===
+
+def szenario_namen(raster_pfade):
+    """
+    Name -> Rasterpfad.
+
+    Akzeptiert ein Dict oder eine Liste aus Pfaden bzw. "name=pfad"-Angaben;
+    ohne Namen wird der Dateiname ohne Endung verwendet.
+    """
+    if isinstance(raster_pfade, dict):
+        return dict(raster_pfade)
+
+    szenarien = {}
+    for angabe in raster_pfade:
+        if "=" in angabe:
+            name, pfad = angabe.split("=", 1)
+        else:
+            name, pfad = os.path.splitext(os.path.basename(angabe))[0], angabe
+        if name in szenarien:
+            raise ValueError(f"Szenario '{name}' ist doppelt angegeben!")
+        szenarien[name] = pfad
+    return szenarien
+
+
+def szenario_bins(angaben):
+    """
+    Name -> Klassengrenzen aus "name=woe" (WoE-Klassen aus werkzeuge/risiko.py) oder
+    "name=g0,g1,...,g5" (eigene Grenzen, z. B. Wassertiefen in Metern).
+
+    Szenarien ohne Angabe erhalten keine Risikoklasse.
+    """
+    bins = {}
+    for angabe in angaben or []:
+        if "=" not in angabe:
+            raise ValueError(f"Klassengrenzen '{angabe}' nicht im Format name=woe oder name=g0,g1,...")
+        name, werte = angabe.split("=", 1)
+        if werte.strip().lower() == "woe":
+            bins[name] = list(bins_risiko)
+        else:
+            bins[name] = [float(w) for w in werte.split(",")]
+        if len(bins[name]) != len(labels_risiko) + 1 or np.any(np.diff(bins[name]) <= 0):
+            raise ValueError(f"Szenario '{name}': {len(labels_risiko) + 1} aufsteigende Klassengrenzen erwartet.")
+    return bins
+
+
+# === 2. Alle Raster auslesen ===
+
+def sample_szenarien(quelle_pfad, x, y, crs, raster_pfade, name="punkte"):
+    """
+    Rasterwerte aller Szenarien für die Punkte einer Quelldatei.
+
+    Liefert einen breiten DataFrame (eine float32-Spalte je Szenario, Zeilen in
+    der Reihenfolge von x/y); nodata und Punkte außerhalb eines Rasters sind NaN.
+    """
+    szenarien = szenario_namen(raster_pfade)
+    x = np.asarray(x, dtype="float64")
+    y = np.asarray(y, dtype="float64")
+
+    transformiert = {}  # Ziel-CRS (WKT) -> (x, y)
+    gitter = {}         # Gitterkennung -> (Zeilen, Spalten, Reihenfolge)
+    werte = {}
+
+    for szenario, pfad in szenarien.items():
+        raster = oeffne_raster(pfad)
+        kennung = gitter_kennung(raster)
+
+        if kennung not in gitter:
+            index = gespeicherter_index(quelle_pfad, raster, len(x), name)
+            if index is None:
+                wkt = CRS.from_user_input(raster.crs).to_wkt()
+                if wkt not in transformiert:
+                    transformiert[wkt] = transformiere_punkte(x, y, crs, raster.crs)
+                index = pixel_index(quelle_pfad, raster, *transformiert[wkt], raster.crs, name)
+            zeile, spalte = index
+            # Zeilenweise Reihenfolge -> die memmap wird nahezu sequenziell gelesen
+            reihenfolge = np.lexsort((spalte, zeile))
+            gitter[kennung] = (zeile[reihenfolge], spalte[reihenfolge], reihenfolge)
+
+        zeile, spalte, reihenfolge = gitter[kennung]
+        spalte_werte = np.empty(len(x), dtype="float32")
+        spalte_werte[reihenfolge] = raster.werte_an_index(zeile, spalte)
+        werte[szenario] = spalte_werte
+        print(f"Szenario {szenario}: {len(x)} Punkte ausgelesen.")
+
+    return pd.DataFrame(werte)
+
+
+# === 3. Langes Format ===
+
+def szenarien_lang(breit, bins=bins_risiko, objekt_ids=None):
+    """
+    Szenario × Objekt-Tabelle im langen Format.
+
+    Spalten: objekt, Szenario (Kategorie), Risiko (float32), Risiko_Klasse
+    (int8-Code aus risiko_codes). objekt_ids ersetzt die laufende Nummer.
+
+    bins gilt für alle Szenarien oder ist ein Dict Szenario -> Klassengrenzen
+    (szenario_bins); Szenarien ohne Eintrag erhalten CODE_FEHLT als Klasse.
+    """
+    anzahl = len(breit)
+    objekte = np.arange(anzahl) if objekt_ids is None else np.asarray(objekt_ids)
+    risiko = breit.to_numpy(dtype="float32").T.ravel()
+    if isinstance(bins, dict):
+        klassen = np.full(len(risiko), CODE_FEHLT, dtype="int8")
+        for i, szenario in enumerate(breit.columns):
+            if bins.get(szenario) is not None:
+                teil = slice(i * anzahl, (i + 1) * anzahl)
+                klassen[teil] = risiko_codes(risiko[teil], bins[szenario])
+    else:
+        klassen = risiko_codes(risiko, bins)
+    return pd.DataFrame({
+        OBJEKT_SPALTE: np.tile(objekte, breit.shape[1]),
+        SZENARIO_SPALTE: pd.Categorical.from_codes(
+            np.repeat(np.arange(breit.shape[1]), anzahl), categories=list(breit.columns)
+        ),
+        "Risiko": risiko,
+        "Risiko_Klasse": klassen,
+    })
@@ -0,0 +1,180 @@
+# Einlesen der Zensus-Tabellen (Excel, Parquet, CSV).
+#
+# Excel-Arbeitsblätter werden einmalig in einen typisierten Parquet-Spiegel
+# umgewandelt; alle weiteren Lesezugriffe laufen über Parquet. Große Tabellen
+# können außerdem in Chunks gelesen werden, damit der Speicherbedarf
+# unabhängig von der Gittergröße bleibt.
+#
+# Zelltabellen (mit Gitter-ID oder Gitter-Schlüssel) werden nach dem Schlüssel
+# sortiert gespeichert, mit der Ausdehnung jeder Zeilengruppe in den Metadaten
+# (werkzeuge/raumordnung.py); lade_tabelle(..., bbox=...) liest dann nur die
+# Zeilengruppen, die den Ausschnitt schneiden.
+
+import hashlib
+import os
+
+import numpy as np
+import pandas as pd
+
+from werkzeuge.gitter import SCHLUESSEL_SPALTE, gitter_schluessel, zellmittelpunkte
+from werkzeuge.raumordnung import in_bbox, lade_zeilengruppen, schreibe_zeilengruppen, transformiere_bbox
+
+# Spalten, die im Zensus-Export mit Dezimalkomma als Text vorliegen
+KOMMA_SPALTEN = ("AnteilUeber65",)
+
+# Unterordner neben der Arbeitsmappe für die Parquet-Spiegel
+CACHE_ORDNER = "parquet_cache"
+
+ZENSUS_CRS = "EPSG:3035"
+ID_SPALTE = "GITTER_ID_100m"
+
+
+# === 1. Parquet-Spiegel für Excel-Arbeitsblätter ===
+
+def parquet_spiegel(pfad, sheet_name=0):
+    """
+    Gibt den Pfad des Parquet-Spiegels zu einem Excel-Arbeitsblatt zurück.
+
+    Der Spiegel wird beim ersten Zugriff erzeugt und ist über Änderungszeit
+    und Größe der Arbeitsmappe verschlüsselt; ändert sich die Arbeitsmappe,
+    wird er neu geschrieben und der veraltete Spiegel gelöscht.
+    """
+    ziel = _spiegel_pfad(pfad, sheet_name)
+    if os.path.exists(ziel):
+        return ziel
+
+    ordner = os.path.dirname(ziel)
+    praefix = os.path.basename(ziel).rsplit("__", 1)[0] + "__"
+    os.makedirs(ordner, exist_ok=True)
+    for alt in os.listdir(ordner):
+        if alt.startswith(praefix):
+            os.remove(os.path.join(ordner, alt))
+
+    df = _typisiere(pd.read_excel(pfad, sheet_name=sheet_name))
+    tmp = ziel + ".tmp"
+    try:
+        speichere_zellen(df, tmp)
+    except ValueError:
+        # keine (gültigen) Gitter-IDs: unsortiert speichern
+        df.to_parquet(tmp, index=False)
+    os.replace(tmp, ziel)
+    print(f"Parquet-Spiegel erstellt: {ziel}")
+    return ziel
+
+
+def _spiegel_pfad(pfad, sheet_name):
+    stat = os.stat(pfad)
+    schluessel = hashlib.sha1(f"{stat.st_mtime_ns}:{stat.st_size}".encode()).hexdigest()[:16]
+    name = os.path.splitext(os.path.basename(pfad))[0]
+    return os.path.join(
+        os.path.dirname(os.path.abspath(pfad)), CACHE_ORDNER,
+        f"{name}__{sheet_name}__{schluessel}.parquet",
+    )
+
+
+def lade_tabelle(pfad, sheet_name=0, spalten=None, bbox=None, crs=ZENSUS_CRS):
+    """
+    Liest eine Tabelle; Excel-Dateien werden über den Parquet-Spiegel gelesen.
+
+    bbox (xmin, ymin, xmax, ymax) im CRS crs: nur Zellen, deren Mittelpunkt darin
+    liegt (braucht eine Zelltabelle mit Gitter-ID oder Gitter-Schlüssel). Aus
+    Parquet werden dann nur die Zeilengruppen gelesen, die die bbox schneiden.
+    """
+    endung = os.path.splitext(pfad)[1].lower()
+    if endung in (".xlsx", ".xlsm"):
+        pfad = parquet_spiegel(pfad, sheet_name)
+    elif endung == ".csv":
+        if bbox is None:
+            return pd.read_csv(pfad, sep=";", usecols=spalten)
+        df = pd.read_csv(pfad, sep=";")
+    if bbox is None:
+        return pd.read_parquet(pfad, columns=spalten)
+    bbox = transformiere_bbox(bbox, crs, ZENSUS_CRS)
+    if endung != ".csv":
+        df = lade_zeilengruppen(pfad, bbox, spalten=_mit_schluessel(pfad, spalten))
+    df = _zellen_in_bbox(df, bbox)
+    return df if spalten is None else df[list(spalten)]
+
+
+def _mit_schluessel(pfad, spalten):
+    """Spaltenauswahl plus Schlüssel- bzw. ID-Spalte (für die Lage der Zellen)."""
+    import pyarrow.parquet as pq
+
+    if spalten is None or SCHLUESSEL_SPALTE in spalten or ID_SPALTE in spalten:
+        return spalten
+    vorhanden = pq.read_schema(pfad).names
+    return list(spalten) + [SCHLUESSEL_SPALTE if SCHLUESSEL_SPALTE in vorhanden else ID_SPALTE]
+
+
+def speichere_zellen(df, pfad):
+    """
+    Schreibt eine Zelltabelle nach Gitter-Schlüssel sortiert als Parquet, mit der
+    Ausdehnung (EPSG:3035) jeder Zeilengruppe in den Metadaten.
+    """
+    schluessel = _schluessel(df)
+    reihenfolge = np.argsort(schluessel, kind="stable")
+    df = df.iloc[reihenfolge].reset_index(drop=True)
+    x, y = zellmittelpunkte(schluessel[reihenfolge])
+    schreibe_zeilengruppen(df, pfad, x, y, ZENSUS_CRS)
+
+
+def _schluessel(df):
+    if SCHLUESSEL_SPALTE in df.columns:
+        return df[SCHLUESSEL_SPALTE].to_numpy(dtype="int64")
+    if ID_SPALTE in df.columns:
+        return gitter_schluessel(df[ID_SPALTE])
+    raise ValueError(f"Keine Spalte {SCHLUESSEL_SPALTE} oder {ID_SPALTE} gefunden.")
+
+
+def _zellen_in_bbox(df, bbox):
+    x, y = zellmittelpunkte(_schluessel(df))
+    return df[in_bbox(x, y, bbox)].reset_index(drop=True)
+
+
+def _typisiere(df):
+    """Dezimalkomma-Spalten und als Text gespeicherte Zahlen in numerische Typen umwandeln."""
+    for spalte in df.columns:
+        if spalte in KOMMA_SPALTEN:
+            df[spalte] = pd.to_numeric(
+                df[spalte].astype(str).str.replace(",", ".", regex=False), errors="coerce"
+            )
+        elif df[spalte].dtype == object or pd.api.types.is_string_dtype(df[spalte]):
+            try:
+                df[spalte] = pd.to_numeric(df[spalte])
+            except (ValueError, TypeError):
+                df[spalte] = df[spalte].astype("string")
+        # Ganzzahlen als int32 speichern, sofern der Wertebereich es zulässt
+        if pd.api.types.is_integer_dtype(df[spalte]) and df[spalte].abs().max() < 2**31:
+            df[spalte] = df[spalte].astype("int32")
+    return df
+
+
+# === 2. Chunkweises Einlesen ===
+
+def lies_in_chunks(pfad, spalten=None, chunk_size=100_000, sheet_name=0):
+    """
+    Liefert die Tabelle als Folge von DataFrames mit höchstens chunk_size Zeilen.
+
+    Unterstützt .parquet (pyarrow, Zeilengruppen-Batches), .xlsx und .csv
+    (Trennzeichen ';'). Arbeitsmappen werden immer über den Parquet-Spiegel gelesen
+    (beim ersten Zugriff erzeugt), damit Typen und Dezimalkomma-Spalten dieselben
+    sind wie bei lade_tabelle.
+    """
+    endung = os.path.splitext(pfad)[1].lower()
+    if endung == ".parquet":
+        yield from _parquet_chunks(pfad, spalten, chunk_size)
+    elif endung in (".xlsx", ".xlsm"):
+        yield from _parquet_chunks(parquet_spiegel(pfad, sheet_name), spalten, chunk_size)
+    elif endung == ".csv":
+        for chunk in pd.read_csv(pfad, sep=";", usecols=spalten, chunksize=chunk_size):
+            yield chunk
+    else:
+        raise ValueError(f"Nicht unterstütztes Dateiformat: {pfad}")
+
+
+def _parquet_chunks(pfad, spalten, chunk_size):
+    import pyarrow.parquet as pq
+
+    datei = pq.ParquetFile(pfad)
+    for batch in datei.iter_batches(batch_size=chunk_size, columns=spalten):
+        yield batch.to_pandas()
@@ -0,0 +1,211 @@
+# Rasterwerte je 100-m-Zensuszelle (Mittel, Maximum, Klassenanteile) statt des
+# einzelnen Werts am Zellmittelpunkt.
+#
+# Liegt das Raster in EPSG:3035 und passt sein Pixelraster in das 100-m-Gitter
+# (Pixelgröße teilt 100 m, Ursprung auf dem Pixelraster), wird es streifenweise
+# in Blöcke von faktor x faktor Pixeln umgeformt (reshape) und je Block reduziert.
+# Sonst wird jedes Pixel über seinen Mittelpunkt einer Zelle zugeordnet und je
+# Zelle summiert. Beide Wege rechnen fensterweise und liefern dieselbe Tabelle,
+# die über den Gitter-Schlüssel an jede Zelltabelle angehängt wird.
+
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from pyproj import CRS
+
+from werkzeuge.gitter import SCHLUESSEL_SPALTE, schluessel_aus_koordinaten, zell_schluessel
+from werkzeuge.pixelindex import transformiere_punkte
+from werkzeuge.risiko import bins_risiko, labels_risiko, risiko_codes
+
+ZELL_CRS = "EPSG:3035"
+
+# Spaltennamen der Ergebnistabelle
+SPALTE_MITTEL = "Risiko_mittel"
+SPALTE_MAX = "Risiko_max"
+SPALTE_PIXEL = "pixel"
+
+# Parquet-Metadaten: Quellraster (Pfad und Änderungszeit) der Zelltabelle
+META_SCHLUESSEL = b"zellrisiko_quelle"
+
+
+def anteil_spalten(labels=labels_risiko):
+    """Spaltennamen der Pixelanteile je Risikoklasse, z. B. "anteil_sehr_hoch"."""
+    return [f"anteil_{label.replace(' ', '_')}" for label in labels]
+
+
+# === 1. Teilsummen je Zelle ===
+
+def _werte(raster, zeilen):
+    werte = raster.daten[zeilen].astype("float64")
+    if raster.nodata is not None:
+        werte[werte == raster.nodata] = np.nan
+    return werte
+
+
+def _teilsummen(schluessel, werte, anzahl_klassen, bins):
+    """Anzahl, Summe, Maximum und Anzahl je Klasse der gültigen Werte je Schlüssel."""
+    gueltig = ~np.isnan(werte)
+    schluessel, werte = schluessel[gueltig], werte[gueltig]
+    if len(werte) == 0:
+        return None
+    zellen, inverse = np.unique(schluessel, return_inverse=True)
+    n = len(zellen)
+    maximum = np.full(n, -np.inf)
+    np.maximum.at(maximum, inverse, werte)
+    codes = risiko_codes(werte, bins).astype("int64")
+    innen = codes < anzahl_klassen
+    klassen = np.bincount(inverse[innen] * anzahl_klassen + codes[innen],
+                          minlength=n * anzahl_klassen).reshape(n, anzahl_klassen)
+    return zellen, np.bincount(inverse, minlength=n), np.bincount(inverse, weights=werte, minlength=n), \
+        maximum, klassen
+
+
+def _ausrichtung(raster, aufloesung):
+    """(faktor, Spaltenversatz, Zeilenversatz), wenn das Raster ins Zellgitter passt, sonst None."""
+    t = raster.transform
+    if not CRS.from_user_input(raster.crs).equals(CRS.from_user_input(ZELL_CRS)):
+        return None
+    if t.b != 0 or t.d != 0 or t.a <= 0 or t.e >= 0 or not np.isclose(t.a, -t.e):
+        return None
+    faktor = aufloesung / t.a
+    versatz_spalte = (t.c % aufloesung) / t.a
+    versatz_zeile = (-t.f % aufloesung) / t.a
+    werte = np.array([faktor, versatz_spalte, versatz_zeile])
+    if not np.allclose(werte, np.round(werte), atol=1e-6):
+        return None
+    return tuple(int(round(w)) for w in werte)
+
+
+def _teile_ausgerichtet(raster, aufloesung, ausrichtung, zellen_je_fenster, anzahl_klassen, bins):
+    """Streifen aus ganzen Zellzeilen: reshape (Zellen, faktor, Zellen, faktor) und Reduktion je Block."""
+    faktor, versatz_spalte, versatz_zeile = ausrichtung
+    t = raster.transform
+    hoehe, breite = raster.shape
+    # Nord-/Ostindex der Zelle, in der das Pixel (0, 0) liegt
+    nord_oben = int(np.floor((t.f - t.a / 2) / aufloesung))
+    ost_links = int(np.floor((t.c + t.a / 2) / aufloesung))
+    n_spalten = -(-(breite + versatz_spalte) // faktor)
+    ost = ost_links + np.arange(n_spalten)
+
+    # Pixelzeile p liegt in Zellzeile (p + versatz_zeile) // faktor
+    n_zeilen = -(-(hoehe + versatz_zeile) // faktor)
+    for zelle0 in range(0, n_zeilen, zellen_je_fenster):
+        zelle1 = min(zelle0 + zellen_je_fenster, n_zeilen)
+        p0 = max(zelle0 * faktor - versatz_zeile, 0)
+        p1 = min(zelle1 * faktor - versatz_zeile, hoehe)
+        block = np.full(((zelle1 - zelle0) * faktor, n_spalten * faktor), np.nan)
+        ziel0 = p0 - (zelle0 * faktor - versatz_zeile)
+        block[ziel0:ziel0 + p1 - p0, versatz_spalte:versatz_spalte + breite] = _werte(raster, slice(p0, p1))
+
+        form = (zelle1 - zelle0, faktor, n_spalten, faktor)
+        gueltig = ~np.isnan(block)
+        anzahl = gueltig.reshape(form).sum(axis=(1, 3))
+        summe = np.where(gueltig, block, 0.0).reshape(form).sum(axis=(1, 3))
+        maximum = np.where(gueltig, block, -np.inf).reshape(form).max(axis=(1, 3))
+        codes = risiko_codes(block, bins).reshape(form)
+        klassen = np.stack([(codes == k).sum(axis=(1, 3)) for k in range(anzahl_klassen)], axis=-1)
+
+        nord = nord_oben - np.arange(zelle0, zelle1)
+        schluessel = zell_schluessel(nord[:, None], ost[None, :])
+        belegt = anzahl > 0
+        yield schluessel[belegt], anzahl[belegt], summe[belegt], maximum[belegt], klassen[belegt]
+
+
+def _teile_allgemein(raster, aufloesung, zeilen_je_fenster, anzahl_klassen, bins):
+    """Pixelstreifen: Mittelpunkte nach EPSG:3035 transformieren und je Zelle summieren."""
+    t = raster.transform
+    hoehe, breite = raster.shape
+    spalten = np.arange(breite) + 0.5
+    for p0 in range(0, hoehe, zeilen_je_fenster):
+        p1 = min(p0 + zeilen_je_fenster, hoehe)
+        zeilen = np.arange(p0, p1) + 0.5
+        x, y = t * (np.broadcast_to(spalten, (p1 - p0, breite)), zeilen[:, None])
+        x, y = transformiere_punkte(x.ravel(), y.ravel(), raster.crs, ZELL_CRS)
+        teil = _teilsummen(schluessel_aus_koordinaten(x, y, aufloesung), _werte(raster, slice(p0, p1)).ravel(),
+                           anzahl_klassen, bins)
+        if teil is not None:
+            yield teil
+
+
+# === 2. Zelltabelle ===
+
+def zell_risiko(raster, aufloesung=100, bins=bins_risiko, labels=labels_risiko, fenster_pixel=512):
+    """
+    Mittlerer und maximaler Rasterwert sowie Pixelanteil je Risikoklasse für jede 100-m-Zelle.
+
+    Ein Pixel gehört zu der Zelle, in der sein Mittelpunkt liegt; nodata-Pixel
+    zählen nicht. Rückgabe: DataFrame mit gitter_key, Risiko_mittel, Risiko_max,
+    anteil_<Klasse> und pixel (Anzahl gültiger Pixel), nach Schlüssel sortiert.
+    """
+    anzahl_klassen = len(bins) - 1
+    ausrichtung = _ausrichtung(raster, aufloesung)
+    if ausrichtung is not None:
+        zellen_je_fenster = max(fenster_pixel // ausrichtung[0], 1)
+        teile = list(_teile_ausgerichtet(raster, aufloesung, ausrichtung, zellen_je_fenster, anzahl_klassen, bins))
+    else:
+        teile = list(_teile_allgemein(raster, aufloesung, fenster_pixel, anzahl_klassen, bins))
+
+    spalten = anteil_spalten(labels)
+    if not teile:
+        return pd.DataFrame(columns=[SCHLUESSEL_SPALTE, SPALTE_MITTEL, SPALTE_MAX, *spalten, SPALTE_PIXEL])
+
+    schluessel, anzahl, summe, maximum, klassen = (np.concatenate(t) for t in zip(*teile))
+    df = pd.DataFrame(klassen, columns=spalten)
+    df.insert(0, SCHLUESSEL_SPALTE, schluessel)
+    df[SPALTE_PIXEL] = anzahl
+    df["summe"] = summe
+    df[SPALTE_MAX] = maximum
+    # Zellen, die mehrere Fenster schneiden, zusammenführen
+    df = df.groupby(SCHLUESSEL_SPALTE, sort=True).agg(
+        {**{s: "sum" for s in spalten}, SPALTE_PIXEL: "sum", "summe": "sum", SPALTE_MAX: "max"}
+    ).reset_index()
+
+    ergebnis = pd.DataFrame({SCHLUESSEL_SPALTE: df[SCHLUESSEL_SPALTE].to_numpy()})
+    ergebnis[SPALTE_MITTEL] = (df["summe"] / df[SPALTE_PIXEL]).astype("float32")
+    ergebnis[SPALTE_MAX] = df[SPALTE_MAX].astype("float32")
+    for s in spalten:
+        ergebnis[s] = (df[s] / df[SPALTE_PIXEL]).astype("float32")
+    ergebnis[SPALTE_PIXEL] = df[SPALTE_PIXEL].astype("int32")
+    return ergebnis
+
+
+# === 3. Speichern und Anhängen an Zelltabellen ===
+
+def _quelle(raster_pfad):
+    return {"quelle": os.path.abspath(raster_pfad), "quelle_mtime_ns": os.stat(raster_pfad).st_mtime_ns}
+
+
+def speichere_zellrisiko(zellen, pfad, raster_pfad):
+    """Schreibt die Zelltabelle als Parquet, Pfad und Änderungszeit des Rasters in den Metadaten."""
+    daten = pa.Table.from_pandas(zellen, preserve_index=False)
+    metadaten = dict(daten.schema.metadata or {})
+    metadaten[META_SCHLUESSEL] = json.dumps(_quelle(raster_pfad)).encode()
+    pq.write_table(daten.replace_schema_metadata(metadaten), pfad)
+
+
+def lade_zellrisiko(pfad, raster_pfad, spalte=SPALTE_MITTEL):
+    """
+    Eine Spalte der gespeicherten Zelltabelle als Series mit dem Gitter-Schlüssel als Index.
+
+    None, wenn die Datei fehlt oder nicht aus dem Raster raster_pfad in seinem
+    aktuellen Stand berechnet wurde; der Aufrufer nimmt dann den Wert am Zellmittelpunkt.
+    """
+    if not pfad or not os.path.exists(pfad):
+        print(f"Keine Zelltabelle gefunden ({pfad}), Zellen werden am Mittelpunkt klassifiziert.")
+        return None
+    eintrag = (pq.read_schema(pfad).metadata or {}).get(META_SCHLUESSEL)
+    if eintrag is None or json.loads(eintrag) != _quelle(raster_pfad):
+        print(f"Zelltabelle {pfad} passt nicht zu {raster_pfad} (neu mit main_zellrisiko.py erzeugen), "
+              f"Zellen werden am Mittelpunkt klassifiziert.")
+        return None
+    df = pd.read_parquet(pfad, columns=[SCHLUESSEL_SPALTE, spalte])
+    return df.set_index(SCHLUESSEL_SPALTE)[spalte]
+
+
+def zellwerte(zellrisiko, schluessel):
+    """Werte je Schlüssel aus lade_zellrisiko (float64, NaN für Zellen ohne Rasterwert)."""
+    return zellrisiko.reindex(np.asarray(schluessel)).to_numpy(dtype="float64")
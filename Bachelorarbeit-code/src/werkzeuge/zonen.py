@@ -0,0 +1,48 @@
+# Zonenstatistik (Pixel je Risikoklasse pro Polygon) direkt auf dem memmap-Raster.
+#
+# Ersetzt rasterstats.zonal_stats(categorical=True) auf einem zwischengespeicherten
+# klassifizierten GeoTIFF: pro Polygon wird nur das umgebende Fenster aus der memmap
+# gelesen, per Pixelmittelpunkt maskiert und klassifiziert.
+
+import numpy as np
+from affine import Affine
+from rasterio.features import geometry_mask
+from rasterio.windows import from_bounds
+
+from werkzeuge.risiko import bins_risiko
+
+
+def zonen_klassen_anteile(raster, geometrien, bins=bins_risiko):
+    """
+    Anzahl der Pixel je Klasse 1..len(bins)-1 für jedes Polygon.
+
+    Die Klassen entsprechen np.digitize(werte, bins) wie im bisherigen
+    klassifizierten Raster; nodata und Werte außerhalb der Grenzen werden nicht
+    gezählt. Rückgabe: int64-Array (Anzahl Polygone x Anzahl Klassen).
+    """
+    anzahl_klassen = len(bins) - 1
+    ergebnis = np.zeros((len(geometrien), anzahl_klassen), dtype="int64")
+    hoehe, breite = raster.shape
+
+    for i, geom in enumerate(geometrien):
+        if geom is None or geom.is_empty:
+            continue
+        fenster = from_bounds(*geom.bounds, transform=raster.transform)
+        zeile0 = max(int(np.floor(fenster.row_off)), 0)
+        spalte0 = max(int(np.floor(fenster.col_off)), 0)
+        zeile1 = min(int(np.ceil(fenster.row_off + fenster.height)), hoehe)
+        spalte1 = min(int(np.ceil(fenster.col_off + fenster.width)), breite)
+        if zeile1 <= zeile0 or spalte1 <= spalte0:
+            continue
+
+        werte = raster.daten[zeile0:zeile1, spalte0:spalte1]
+        innen = ~geometry_mask(
+            [geom], out_shape=werte.shape,
+            transform=raster.transform * Affine.translation(spalte0, zeile0),
+        )
+        auswahl = werte[innen]
+        if raster.nodata is not None:
+            auswahl = auswahl[auswahl != raster.nodata]
+        klassen = np.digitize(auswahl, bins)
+        ergebnis[i] = np.bincount(klassen, minlength=anzahl_klassen + 2)[1:anzahl_klassen + 1]
+    return ergebnis